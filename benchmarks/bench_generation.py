@@ -0,0 +1,86 @@
+from pathlib import Path
+from .common import SAMPLE_INVOICE, get_qapplication, time_call, summarize, metric
+
+
+def fill_editor(app, fields: dict) -> None:
+    """
+    Escribe `fields` en los widgets del editor de `app`, como lo haría el usuario.
+    """
+    for key, value in fields.items():
+        widget = app._editor_inputs.get(key)
+        if widget is None:
+            continue
+        if isinstance(value, bool):
+            widget.setChecked(value)
+        else:
+            widget.setText(value)
+
+
+def run(app, output_dir: Path, count: int = 200) -> dict:
+    """
+    Mide la generación de facturas:
+    - `generation.worker`: el camino de `_on_generate_pdf_btn_pressed` (copiar el formulario,
+      generar el PDF y registrarlo en la base de datos), ejecutado `count` veces.
+    - `generation.gui_roundtrip_ms`: desde el click en "Generar" hasta que la factura
+      nueva aparece seleccionada en el Visualizador.
+    - `generation.batch_per_s`: generación por lotes en paralelo (`src.invoice.batch`).
+
+    Args:
+        app (App): Ventana principal ya construida.
+        output_dir (Path): Carpeta donde escribir las facturas.
+        count (int): `Opcional` Cantidad de facturas a generar. Default: 200
+
+    Returns:
+        metrics (dict): Métricas por nombre.
+    """
+    from PyQt6.QtCore import QThreadPool
+    from src.gui.workers import GenerateInvoiceWorker
+    from src.invoice.batch import render_batch
+
+    qt_app = get_qapplication()
+    settings = app._settings
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fill_editor(app, SAMPLE_INVOICE)
+    layout = app._get_inputs_layout('benchmarks')
+    store = app._get_invoice_store()
+
+    worker_dir = output_dir / "worker"
+    worker_dir.mkdir(exist_ok=True)
+    counter = iter(range(count + 1))
+
+    def generate_one():
+        worker = GenerateInvoiceWorker(
+            str(worker_dir), app._form.snapshot(), layout, store,
+            optimize=settings.OPTIMIZE_PDF, linearize=settings.LINEARIZE_PDF,
+            filename=f"factura_{next(counter):05d}.pdf"
+        )
+        worker.run()
+
+    durations = time_call(generate_one, repeat=count, warmup=1)
+
+    # Ida y vuelta completa por el GUI: hilo de trabajo, signals, índice y Visualizador
+    settings.prints_path = str(output_dir)
+    app._update_prints_in_prints_path()
+
+    def gui_roundtrip():
+        app._on_generate_pdf_btn_pressed()
+        QThreadPool.globalInstance().waitForDone()
+        qt_app.processEvents()
+
+    roundtrip = time_call(gui_roundtrip, repeat=5)
+
+    batch_dir = output_dir / "batch"
+    batch_dir.mkdir(exist_ok=True)
+    result = render_batch(
+        [dict(SAMPLE_INVOICE) for _ in range(count)], str(batch_dir), settings.INPUTS_GEOMETRY_JSON_FILE,
+        settings.INVOICE_WIDTH, settings.INVOICE_HEIGHT
+    )
+
+    worker_stats = summarize(durations)
+    roundtrip_stats = summarize(roundtrip)
+    return {
+        "generation.worker_per_s": metric(count / (sum(durations) / 1000), "facturas/s", "higher"),
+        "generation.worker_ms": metric(worker_stats["median"], "ms", "lower", **worker_stats),
+        "generation.gui_roundtrip_ms": metric(roundtrip_stats["median"], "ms", "lower", **roundtrip_stats),
+        "generation.batch_per_s": metric(result.throughput, "facturas/s", "higher", failures=len(result.failures)),
+    }
@@ -0,0 +1,40 @@
+from pathlib import Path
+from .common import make_synthetic_prints_folder, time_call, summarize, metric
+
+
+def _size_label(count: int) -> str:
+    return f"{count // 1000}k" if count % 1000 == 0 else str(count)
+
+
+def run(app, listing_dir: Path, template_pdf: Path, sizes: list[int], repeat: int = 5) -> dict:
+    """
+    Mide el listado de facturas en carpetas sintéticas de `sizes` PDFs:
+    - `listing.get_invoices_in_prints_path.<n>`: lectura de la carpeta.
+    - `listing.update_prints_in_prints_path.<n>`: reconstrucción del índice y la lista del GUI,
+      incluida la selección de la primera factura.
+
+    Args:
+        app (App): Ventana principal ya construida.
+        listing_dir (Path): Carpeta donde crear (o reutilizar) las carpetas sintéticas.
+        template_pdf (Path): Factura real que se enlaza con cada nombre sintético.
+        sizes (list[int]): Cantidades de facturas por carpeta.
+        repeat (int): `Opcional` Repeticiones por medición. Default: 5
+
+    Returns:
+        metrics (dict): Métricas por nombre.
+    """
+    settings = app._settings
+    metrics = {}
+    for count in sizes:
+        folder = make_synthetic_prints_folder(listing_dir / str(count), count, template_pdf)
+        settings.prints_path = str(folder)
+        label = _size_label(count)
+
+        durations = time_call(settings.get_invoices_in_prints_path, repeat=repeat, warmup=1)
+        stats = summarize(durations)
+        metrics[f"listing.get_invoices_in_prints_path.{label}"] = metric(stats["median"], "ms", "lower", **stats)
+
+        durations = time_call(app._update_prints_in_prints_path, repeat=repeat, warmup=1)
+        stats = summarize(durations)
+        metrics[f"listing.update_prints_in_prints_path.{label}"] = metric(stats["median"], "ms", "lower", **stats)
+    return metrics
@@ -0,0 +1,77 @@
+import statistics
+import time
+from .common import ROOT_DIR, get_qapplication, summarize, metric
+
+
+def _show_and_wait_for_paint(window, timeout_s: float = 10.0) -> None:
+    from PyQt6.QtCore import QObject, QEvent
+
+    class _PaintFilter(QObject):
+        def __init__(self, parent):
+            super().__init__(parent)
+            self.painted = False
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                self.painted = True
+            return False
+
+    paint_filter = _PaintFilter(window)
+    window.installEventFilter(paint_filter)
+    window.show()
+    window.update()
+    qt_app = get_qapplication()
+    deadline = time.perf_counter() + timeout_s
+    while not paint_filter.painted and time.perf_counter() < deadline:
+        qt_app.processEvents()
+    window.removeEventFilter(paint_filter)
+
+
+def run(settings, repeat: int = 5, cold_runs: int = 3) -> dict:
+    """
+    Mide el arranque de la ventana principal:
+    - `startup.app_init_ms`: `App.__init__` en un proceso con los módulos ya importados.
+    - `startup.time_to_show_ms`: `App.__init__` + `show()` hasta el primer paint.
+    - `startup.cold_first_paint_ms`: proceso nuevo de `main.py` hasta el primer paint
+      (importaciones incluidas), con `--startup-probe`.
+
+    Args:
+        settings (SettingsManager): Configuración del programa.
+        repeat (int): `Opcional` Ventanas a construir en el proceso. Default: 5
+        cold_runs (int): `Opcional` Procesos nuevos a lanzar. Default: 3
+
+    Returns:
+        metrics (dict): Métricas por nombre.
+    """
+    from src.gui.app import App
+    from src.utils.startup_profile import probe_startup
+
+    qt_app = get_qapplication()
+    init_durations = []
+    show_durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        window = App(settings)
+        init_durations.append((time.perf_counter() - start) * 1000)
+        _show_and_wait_for_paint(window)
+        show_durations.append((time.perf_counter() - start) * 1000)
+        window.close()
+        window.deleteLater()
+        qt_app.processEvents()
+
+    metrics = {}
+    stats = summarize(init_durations)
+    metrics["startup.app_init_ms"] = metric(stats["median"], "ms", "lower", **stats)
+    stats = summarize(show_durations)
+    metrics["startup.time_to_show_ms"] = metric(stats["median"], "ms", "lower", **stats)
+
+    first_paints = []
+    for _ in range(cold_runs):
+        timings, _ = probe_startup(str(ROOT_DIR / "main.py"))
+        if timings and "first_paint" in timings:
+            first_paints.append(timings["first_paint"])
+    if first_paints:
+        metrics["startup.cold_first_paint_ms"] = metric(
+            statistics.median(first_paints), "ms", "lower", runs=len(first_paints)
+        )
+    return metrics
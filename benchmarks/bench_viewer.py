@@ -0,0 +1,56 @@
+from pathlib import Path
+import os
+import shutil
+import time
+from .common import summarize, metric
+
+
+def _time_selections(app, names: list[str], preload: bool = False) -> list[float]:
+    durations = []
+    for name in names:
+        if preload:
+            app._on_invoice_selected(name, skip_tab_switch=True)
+        start = time.perf_counter()
+        app._on_invoice_selected(name, skip_tab_switch=True)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def run(app, prints_dir: Path, cache_dir: Path) -> dict:
+    """
+    Mide la latencia de seleccionar una factura en el Visualizador:
+    - `viewer.select_cold_ms`: sin cache, el PDF se rasteriza.
+    - `viewer.select_disk_cache_ms`: el raster se lee del cache en disco.
+    - `viewer.select_memory_ms`: el raster ya está en memoria.
+
+    Args:
+        app (App): Ventana principal ya construida.
+        prints_dir (Path): Carpeta con facturas reales (distintas entre sí).
+        cache_dir (Path): Carpeta para el cache de rasters del benchmark.
+
+    Returns:
+        metrics (dict): Métricas por nombre.
+    """
+    from PyQt6.QtCore import QSize
+    from src.gui.pdf_raster import PdfRasterizer
+
+    settings = app._settings
+    settings.prints_path = str(prints_dir)
+    names = sorted(name for name in os.listdir(prints_dir) if name.lower().endswith(".pdf"))
+    size = QSize(settings.INVOICE_WIDTH, settings.INVOICE_HEIGHT)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    app._pdf_rasterizer = PdfRasterizer(cache_dir, size)
+    cold = _time_selections(app, names)
+    # Cada factura se vuelve a seleccionar justo después de cargarla, para no depender del límite del LRU
+    memory = _time_selections(app, names, preload=True)
+
+    # Rasterizador nuevo sobre el mismo cache en disco, como al reiniciar la app
+    app._pdf_rasterizer = PdfRasterizer(cache_dir, size)
+    disk = _time_selections(app, names)
+
+    metrics = {}
+    for name, durations in (("cold", cold), ("disk_cache", disk), ("memory", memory)):
+        stats = summarize(durations)
+        metrics[f"viewer.select_{name}_ms"] = metric(stats["median"], "ms", "lower", **stats)
+    return metrics
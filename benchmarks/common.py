@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import json
+import os
+import statistics
+import time
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Factura de ejemplo con las claves de `json/inputs_geometry.json`
+SAMPLE_INVOICE = {
+    "fecha_dia": "17",
+    "fecha_mes": "10",
+    "fecha_ano": "2025",
+    "nombre_razon_social": "Distribuidora Ejemplo C.A.",
+    "numero_rif": "J-12345678-9",
+    "domicilio_fiscal": "Av. Principal, Edif. Centro, Piso 3, Caracas",
+    "telefono": "0212-5551234",
+    "condiciones_pago": "Contado",
+    "item1-cantidad": "2",
+    "item1-concepto": "Botellón de agua 20 L",
+    "item1-pu": "50,00",
+    "item1-total": "100,00",
+    "item2-cantidad": "1",
+    "item2-concepto": "Dispensador",
+    "item2-pu": "250,00",
+    "item2-total": "250,00",
+    "sub_total": "350,00",
+    "iva": "16",
+    "iva_total": "56,00",
+    "sub_total_mas_iva": "406,00",
+    "total_pagar": "406,00",
+    "forma_pago_efectivo": True,
+}
+
+
+def prepare_environment(work_dir: Path, prints_path: Path) -> None:
+    """
+    Prepara un entorno aislado para los benchmarks: carpeta de configuración,
+    cache, base de datos y logs propios, sin tocar los del usuario.
+
+    Debe llamarse antes de importar cualquier módulo de `src`.
+
+    Args:
+        work_dir (Path): Carpeta temporal del benchmark (se usa como HOME/APPDATA).
+        prints_path (Path): Ruta de facturas inicial para `settings.json`.
+    """
+    work_dir.mkdir(parents=True, exist_ok=True)
+    prints_path.mkdir(parents=True, exist_ok=True)
+    os.environ["HOME"] = str(work_dir)
+    os.environ["APPDATA"] = str(work_dir)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    if os.name == "nt":
+        config_dir = work_dir / "FacturacionAwaa"
+    else:
+        config_dir = work_dir / ".config" / "facturacion_awaa"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    with open(config_dir / "settings.json", "w", encoding="utf-8") as f:
+        json.dump({"debug": False, "update_time": 1, "prints_path": str(prints_path)}, f, indent=4)
+
+
+def get_qapplication():
+    """
+    Retorna la `QApplication` del proceso, creándola si no existe.
+    """
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def time_call(func, repeat: int = 5, warmup: int = 0) -> list[float]:
+    """
+    Ejecuta `func` varias veces y retorna la duración de cada llamada en ms.
+    """
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def summarize(durations_ms: list[float]) -> dict:
+    """
+    Resume una lista de duraciones en ms (mediana, mínimo y p95).
+    """
+    ordered = sorted(durations_ms)
+    p95_index = min(len(ordered) - 1, max(0, round(0.95 * len(ordered)) - 1))
+    return {
+        "median": round(statistics.median(ordered), 3),
+        "min": round(ordered[0], 3),
+        "p95": round(ordered[p95_index], 3),
+        "runs": len(ordered),
+    }
+
+
+def metric(value: float, unit: str, better: str, **extra) -> dict:
+    """
+    Crea una métrica para el JSON de resultados.
+
+    Args:
+        value (float): Valor a comparar entre versiones.
+        unit (str): Unidad (`ms`, `facturas/s`, ...).
+        better (str): `lower` o `higher`, según qué dirección es una mejora.
+    """
+    return {"value": round(value, 3), "unit": unit, "better": better, **extra}
+
+
+def make_synthetic_prints_folder(folder: Path, count: int, template_pdf: Path) -> Path:
+    """
+    Crea `folder` con `count` facturas con nombres `factura_YYYYMMDD_HHMMSS.pdf`.
+
+    Los archivos son enlaces duros a `template_pdf` (o copias si el sistema de
+    archivos no los permite), para que carpetas de 100k facturas no ocupen espacio.
+    Si la carpeta ya tiene la cantidad pedida, se reutiliza.
+
+    Returns:
+        folder (Path): Carpeta creada.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    with os.scandir(folder) as entries:
+        existing = sum(1 for _ in entries)
+    if existing == count:
+        return folder
+
+    data = template_pdf.read_bytes()
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        name = f"factura_{(start + timedelta(seconds=i)).strftime('%Y%m%d_%H%M%S')}.pdf"
+        target = folder / name
+        if target.exists():
+            continue
+        try:
+            os.link(template_pdf, target)
+        except OSError:
+            target.write_bytes(data)
+    return folder
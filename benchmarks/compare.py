@@ -0,0 +1,105 @@
+import argparse
+import json
+import sys
+
+# Cambios menores a este valor (en ms) se consideran ruido aunque superen el umbral relativo
+DEFAULT_MIN_DELTA_MS = 0.5
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.10,
+                    min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> list[dict]:
+    """
+    Compara las métricas de dos resultados de `benchmarks.run`.
+
+    Una métrica es una regresión si empeora (según su campo `better`) más que
+    `threshold` en proporción y, si está en ms, más que `min_delta_ms` en valor absoluto.
+
+    Args:
+        baseline (dict): Resultados de referencia.
+        current (dict): Resultados nuevos.
+        threshold (float): `Opcional` Empeoramiento relativo permitido. Default: 0.10
+        min_delta_ms (float): `Opcional` Diferencia mínima en ms para contar como regresión. Default: 0.5
+
+    Returns:
+        rows (list[dict]): Una fila por métrica presente en ambos resultados, con
+        `name`, `baseline`, `current`, `change` (relativo) y `regression`.
+    """
+    rows = []
+    base_metrics = baseline.get("metrics", {})
+    for name, current_metric in current.get("metrics", {}).items():
+        base_metric = base_metrics.get(name)
+        if base_metric is None:
+            continue
+        old = base_metric["value"]
+        new = current_metric["value"]
+        change = (new - old) / old if old else 0.0
+        if current_metric.get("better") == "higher":
+            worse = change < -threshold
+        else:
+            worse = change > threshold
+            if current_metric.get("unit") == "ms" and abs(new - old) < min_delta_ms:
+                worse = False
+        rows.append({
+            "name": name,
+            "unit": current_metric.get("unit", ""),
+            "baseline": old,
+            "current": new,
+            "change": change,
+            "regression": worse,
+        })
+    return rows
+
+
+def print_comparison(rows: list[dict], baseline_label: str = "", current_label: str = "") -> int:
+    """
+    Imprime la tabla de `compare_results`.
+
+    Returns:
+        regressions (int): Cantidad de métricas con regresión.
+    """
+    print(f"\n📊 Comparación {baseline_label} -> {current_label}")
+    for row in rows:
+        mark = "❌" if row["regression"] else "  "
+        print(
+            f"{mark} {row['name']:<52} {row['baseline']:>12.3f} -> {row['current']:>12.3f} "
+            f"{row['unit']:<11} {row['change'] * 100:>+7.1f}%"
+        )
+    regressions = sum(1 for row in rows if row["regression"])
+    if regressions:
+        print(f"\n{regressions} métricas empeoraron más del umbral.")
+    else:
+        print("\nSin regresiones.")
+    return regressions
+
+
+def _label(results: dict) -> str:
+    meta = results.get("meta", {})
+    return meta.get("commit") or meta.get("date", "")
+
+
+def main(argv: list[str]) -> int:
+    """
+    Punto de entrada por consola:
+    `python -m benchmarks.compare base.json nuevo.json [--threshold 0.1]`
+
+    Returns:
+        exit_code (int): 1 si hay alguna regresión.
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks.compare", description="Compara dos resultados de benchmarks.")
+    parser.add_argument("baseline", help="JSON de referencia")
+    parser.add_argument("current", help="JSON nuevo")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Empeoramiento relativo permitido (default 0.10)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help=f"Diferencia mínima en ms para contar como regresión (default {DEFAULT_MIN_DELTA_MS})")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare_results(baseline, current, args.threshold, args.min_delta_ms)
+    return 1 if print_comparison(rows, _label(baseline), _label(current)) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,133 @@
+from datetime import datetime
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from .common import ROOT_DIR, SAMPLE_INVOICE, prepare_environment, get_qapplication
+from .compare import compare_results, print_comparison, DEFAULT_MIN_DELTA_MS
+
+BENCHMARKS = ("generation", "listing", "viewer", "startup")
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def _git_commit() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT_DIR, timeout=10
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return completed.stdout.strip() or None
+
+
+def _render_fixtures(settings, folder: Path, count: int) -> list[Path]:
+    """
+    Genera `count` facturas reales (distintas entre sí) para el Visualizador
+    y como plantilla de las carpetas sintéticas.
+    """
+    from src.invoice.layout import get_layout
+    from src.invoice.renderer import render_invoice
+
+    layout = get_layout(settings.INPUTS_GEOMETRY_JSON_FILE, settings.INVOICE_WIDTH, settings.INVOICE_HEIGHT)
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = folder / f"factura_20250101_{i // 60:04d}{i % 60:02d}.pdf"
+        render_invoice(str(path), dict(SAMPLE_INVOICE, telefono=f"0212-{i:07d}"), layout)
+        paths.append(path)
+    return paths
+
+
+def main(argv: list[str]) -> int:
+    """
+    Punto de entrada por consola:
+    `python -m benchmarks.run [-o resultados.json] [--compare base.json] [--threshold 0.1]`
+
+    Returns:
+        exit_code (int): 1 si `--compare` encontró alguna regresión.
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks.run", description="Benchmarks de la app (sin ventana visible).")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="JSON de resultados")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Benchmarks a ejecutar (default: todos)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="Cantidad de PDFs de las carpetas sintéticas (default: 1000 10000 100000)")
+    parser.add_argument("--invoices", type=int, default=200, help="Facturas a generar (default 200)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición (default 5)")
+    parser.add_argument("--work-dir", help="Carpeta de trabajo (default: carpeta temporal del sistema)")
+    parser.add_argument("--compare", metavar="BASE_JSON", help="Comparar con un resultado anterior")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Empeoramiento relativo permitido (default 0.10)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help=f"Diferencia mínima en ms para contar como regresión (default {DEFAULT_MIN_DELTA_MS})")
+    args = parser.parse_args(argv)
+    selected = args.only or BENCHMARKS
+
+    work_dir = Path(args.work_dir or Path(tempfile.gettempdir()) / "facturacion_benchmarks").resolve()
+    # Las carpetas sintéticas de `listing` se reutilizan entre ejecuciones; el resto se regenera
+    for name in ("home", "prints", "fixtures", "raster_cache"):
+        shutil.rmtree(work_dir / name, ignore_errors=True)
+    prepare_environment(work_dir / "home", work_dir / "prints")
+
+    qt_app = get_qapplication()
+    from src.gui.app import App
+    from src.settings.settings import get_settings
+
+    settings = get_settings()
+    fixtures = _render_fixtures(settings, work_dir / "fixtures", 30)
+    app = App(settings)
+
+    metrics = {}
+    if "generation" in selected:
+        from . import bench_generation
+        print("⏱  Generación de facturas...")
+        metrics.update(bench_generation.run(app, work_dir / "prints", args.invoices))
+    if "listing" in selected:
+        from . import bench_listing
+        print(f"⏱  Listado de facturas ({', '.join(str(size) for size in args.sizes)})...")
+        metrics.update(bench_listing.run(app, work_dir / "listing", fixtures[0], args.sizes, args.repeat))
+    if "viewer" in selected:
+        from . import bench_viewer
+        print("⏱  Selección en el Visualizador...")
+        metrics.update(bench_viewer.run(app, work_dir / "fixtures", work_dir / "raster_cache"))
+    app.close()
+    qt_app.processEvents()
+    if "startup" in selected:
+        from . import bench_startup
+        print("⏱  Arranque...")
+        settings.prints_path = str(work_dir / "fixtures")
+        metrics.update(bench_startup.run(settings, args.repeat))
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "metrics": metrics,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4, ensure_ascii=False)
+
+    print(f"\n📄 Resultados en {args.output}")
+    for name, values in metrics.items():
+        print(f"  {name:<52} {values['value']:>12.3f} {values['unit']}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_results(baseline, results, args.threshold, args.min_delta_ms)
+        label = baseline.get("meta", {}).get("commit") or args.compare
+        if print_comparison(rows, label, results["meta"]["commit"] or args.output):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,9 +1,33 @@
+import time
+_STARTUP_T0 = time.perf_counter()
 
-from src.gui.app import App
-from src.settings.settings import settings_instance
+import os
 import sys
-from PyQt6.QtWidgets import QApplication
 
-app = QApplication(sys.argv)
-window = App(settings_instance)
-sys.exit(app.exec())
\ No newline at end of file
+
+def main() -> int:
+    # --profile-startup[=resultados.json]: mide el arranque en un proceso hijo
+    for arg in sys.argv[1:]:
+        if arg == "--profile-startup" or arg.startswith("--profile-startup="):
+            from src.utils.startup_profile import run_startup_profile
+            output_path = arg.split("=", 1)[1] if "=" in arg else None
+            return run_startup_profile(os.path.abspath(__file__), output_path)
+
+    from PyQt6.QtWidgets import QApplication
+    from src.gui.app import App
+    from src.settings.settings import get_settings
+    marks = {"imports": time.perf_counter()}
+
+    app = QApplication(sys.argv)
+    marks["qapplication"] = time.perf_counter()
+    window = App(get_settings())
+    marks["window"] = time.perf_counter()
+
+    if "--startup-probe" in sys.argv:
+        from src.utils.startup_profile import install_first_paint_probe
+        install_first_paint_probe(window, marks, _STARTUP_T0)
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
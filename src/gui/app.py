@@ -1,17 +1,32 @@
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from datetime import datetime
 import os
-from PyQt6.QtWidgets import *
+import time
+from pathlib import Path
+from PyQt6.QtWidgets import (
+    QApplication, QWidget, QHBoxLayout, QVBoxLayout, QLabel, QPushButton, QLineEdit,
+    QTextEdit, QComboBox, QSpinBox, QCheckBox, QRadioButton, QButtonGroup, QSlider,
+    QScrollArea, QStackedWidget, QListView, QProgressBar, QDialog, QAbstractItemView
+)
 from PyQt6.QtGui import QPixmap, QIcon
-from PyQt6.QtCore import Qt, QTimer
-import json
+from PyQt6.QtCore import Qt, QTimer, QThreadPool, QSize, QModelIndex, QFileSystemWatcher
 from src.utils.log import create_log
-from src.utils.modal import *
+from src.utils import trace
+from src.utils.modal import InfoModal, ConfirmModal, DirectoryModal
 from ..settings.settings import SettingsManager
 from .styles import APP_GLOBAL_STYLES
-import platform
-import subprocess
+from .workers import GenerateInvoiceWorker, CompactArchiveWorker, LoadClientsWorker
+from .client_completer import ClientCompleter
+from .product_completer import ProductCompleter
+from .pdf_raster import PdfRasterizer
+from .image_cache import ImageCache
+from .opacity_label import OpacityPixmapLabel
+from .invoice_index import InvoiceIndex
+from .invoice_list_model import InvoiceListModel
+from ..invoice.layout import get_layout, diff_layouts, CompiledLayout
+from ..invoice.numbering import InvoiceNumberAllocator, counter_path_for
+from ..invoice.totals import TotalsEngine, format_amount
+from ..invoice.form import InvoiceForm
+from ..invoice.drafts import DraftJournal
+from ..invoice.clients import Client
 
 class App(QWidget):
 
@@ -21,6 +36,40 @@ class App(QWidget):
         self._settings = settings_instance
         self._selected_invoice = ""
         self._editor_inputs = {}
+        self._inputs_layout = None
+        self._form = None
+        self._totals = None
+        self._client_directory = None
+        self._client_completers = {}
+        self._geometry_watcher = None
+        self._geometry_change_started_at = None
+        self._generation_worker = None
+        self._generation_span = None
+        self._print_queue = None
+        self._thread_pool = QThreadPool.globalInstance()
+        self._pdf_rasterizer = PdfRasterizer(
+            self._settings.CACHE_DIR / "rasters",
+            QSize(self._settings.INVOICE_WIDTH, self._settings.INVOICE_HEIGHT)
+        )
+        self._invoice_store = None
+        self._product_catalog = None
+        self._product_catalog_failed = False
+        self._invoice_numbers = None
+        self._image_cache = ImageCache(self._settings.CACHE_DIR / "images")
+        self._invoice_index = InvoiceIndex(self._settings, parent=self)
+        self._invoice_index.reset.connect(self._on_invoices_reset)
+        self._invoice_index.added.connect(self._on_invoices_added)
+        self._invoice_index.removed.connect(self._on_invoices_removed)
+
+        # Autoguardado del borrador: los cambios se agrupan y se escriben en segundo plano
+        self._drafts = DraftJournal(self._settings.DRAFTS_DIR) if self._settings.AUTOSAVE_DELAY_MS > 0 else None
+        self._draft_changes = {}
+        self._draft_payment = ...
+        self._draft_timer = QTimer(self)
+        self._draft_timer.setSingleShot(True)
+        self._draft_timer.setInterval(max(1, self._settings.AUTOSAVE_DELAY_MS))
+        self._draft_timer.timeout.connect(self._flush_draft)
+
         self._openUI()
         self.setStyleSheet(APP_GLOBAL_STYLES)
         self.setWindowIcon(QIcon(self._settings.ICON_FILEPATH))
@@ -43,9 +92,23 @@ class App(QWidget):
         label_generated_invoices.setProperty('class', 'main-text')
         generated_invoices_layout.addWidget(label_generated_invoices)
 
-        self._generated_invoices_list_widget = QListWidget()
-        self._generated_invoices_list_widget.setFixedWidth(300)
-        generated_invoices_layout.addWidget(self._generated_invoices_list_widget)
+        self._invoice_search_input = QLineEdit()
+        self._invoice_search_input.setPlaceholderText('Buscar por cliente, RIF o fecha (AAAA-MM-DD)')
+        self._invoice_search_input.setClearButtonEnabled(True)
+        self._invoice_search_input.setFixedWidth(300)
+        generated_invoices_layout.addWidget(self._invoice_search_input)
+
+        self._invoice_search_timer = QTimer(self)
+        self._invoice_search_timer.setSingleShot(True)
+        self._invoice_search_timer.setInterval(150)
+
+        self._invoice_list_model = InvoiceListModel(parent=self)
+        self._generated_invoices_list_view = QListView()
+        self._generated_invoices_list_view.setModel(self._invoice_list_model)
+        self._generated_invoices_list_view.setUniformItemSizes(True)
+        self._generated_invoices_list_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self._generated_invoices_list_view.setFixedWidth(300)
+        generated_invoices_layout.addWidget(self._generated_invoices_list_view)
 
         self.selected_prints_path_label = QLabel(f'Ruta seleccionada: {self._settings.prints_path}')
         self.selected_prints_path_label.setFixedWidth(300)
@@ -99,12 +162,11 @@ class App(QWidget):
             self._settings.INVOICE_HEIGHT
         )
 
-        self._editor_invoice_label = QLabel(editor_invoice_background_container)
-        self._editor_invoice_label.setPixmap(QPixmap(self._settings.INVOICE_BACKGROUND_PATH).scaled(
+        self._editor_invoice_label = OpacityPixmapLabel(editor_invoice_background_container)
+        self._editor_invoice_label.setPixmap(self._image_cache.get_scaled(
+            self._settings.INVOICE_BACKGROUND_PATH,
             self._settings.INVOICE_WIDTH,
-            self._settings.INVOICE_HEIGHT,
-            Qt.AspectRatioMode.IgnoreAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
+            self._settings.INVOICE_HEIGHT
         ))
         self._editor_invoice_label.setGeometry(0, 0, self._settings.INVOICE_WIDTH, self._settings.INVOICE_HEIGHT)
 
@@ -121,9 +183,15 @@ class App(QWidget):
 
         editor_action_buttons_bar = QHBoxLayout()
         clear_all_inputs_btn = QPushButton('Vaciar todos los campos')
-        generate_pdf_btn = QPushButton('Generar PDF')
+        self._generate_pdf_btn = QPushButton('Generar PDF')
+        self._generation_progress_bar = QProgressBar()
+        self._generation_progress_bar.setVisible(False)
+        self._cancel_generation_btn = QPushButton('Cancelar')
+        self._cancel_generation_btn.setVisible(False)
         editor_action_buttons_bar.addWidget(clear_all_inputs_btn)
-        editor_action_buttons_bar.addWidget(generate_pdf_btn)
+        editor_action_buttons_bar.addWidget(self._generate_pdf_btn)
+        editor_action_buttons_bar.addWidget(self._generation_progress_bar)
+        editor_action_buttons_bar.addWidget(self._cancel_generation_btn)
         editor_layout.addLayout(editor_action_buttons_bar)
 
         self.stack.addWidget(editor_container)
@@ -160,12 +228,11 @@ class App(QWidget):
         image_holder = QWidget()
         image_holder.setFixedSize(self._settings.INVOICE_WIDTH, self._settings.INVOICE_HEIGHT)
 
-        self._viewer_invoice_background_label = QLabel(image_holder)
-        self._viewer_invoice_background_label.setPixmap(QPixmap(self._settings.INVOICE_BACKGROUND_PATH).scaled(
+        self._viewer_invoice_background_label = OpacityPixmapLabel(image_holder)
+        self._viewer_invoice_background_label.setPixmap(self._image_cache.get_scaled(
+            self._settings.INVOICE_BACKGROUND_PATH,
             self._settings.INVOICE_WIDTH,
-            self._settings.INVOICE_HEIGHT,
-            Qt.AspectRatioMode.IgnoreAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
+            self._settings.INVOICE_HEIGHT
         ))
         self._viewer_invoice_background_label.setGeometry(0, 0, self._settings.INVOICE_WIDTH, self._settings.INVOICE_HEIGHT)
 
@@ -187,8 +254,10 @@ class App(QWidget):
         viewer_action_buttons_bar = QHBoxLayout()
         delete_invoice_btn = QPushButton('Eliminar Factura')
         print_invoice_btn = QPushButton('Imprimir Factura')
+        self._print_status_label = QLabel('')
         viewer_action_buttons_bar.addWidget(delete_invoice_btn)
         viewer_action_buttons_bar.addWidget(print_invoice_btn)
+        viewer_action_buttons_bar.addWidget(self._print_status_label)
         viewer_layout.addLayout(viewer_action_buttons_bar)
 
         self.stack.addWidget(viewer_container)
@@ -210,12 +279,15 @@ class App(QWidget):
         editor_invoice_opacity_slider.valueChanged.connect(self._on_invoice_opacity_changed)
         viewer_invoice_opacity_slider.valueChanged.connect(self._on_viewer_invoice_opacity_changed)
         clear_all_inputs_btn.clicked.connect(self._on_clear_all_inputs_btn_pressed)
-        generate_pdf_btn.clicked.connect(self._on_generate_pdf_btn_pressed)
+        self._generate_pdf_btn.clicked.connect(self._on_generate_pdf_btn_pressed)
+        self._cancel_generation_btn.clicked.connect(self._on_cancel_generation_btn_pressed)
         delete_invoice_btn.clicked.connect(self._on_delete_invoice_btn_pressed)
         print_invoice_btn.clicked.connect(self._on_print_invoice_btn_pressed)
         change_prints_path_btn.clicked.connect(self._on_change_prints_path_btn_pressed)
         open_prints_path_folder_btn.clicked.connect(self._on_open_prints_path_folder_btn_pressed)
-        self._generated_invoices_list_widget.itemClicked.connect(self._on_invoice_selected)
+        self._generated_invoices_list_view.clicked.connect(self._on_invoice_index_clicked)
+        self._invoice_search_input.textChanged.connect(self._invoice_search_timer.start)
+        self._invoice_search_timer.timeout.connect(self._apply_invoice_filter)
 
         main_layout.addLayout(generated_invoices_layout)
         main_layout.addLayout(invoices_viewer_layout)
@@ -224,11 +296,108 @@ class App(QWidget):
         self.show()
 
         if self._settings.DEBUG:
-            self._geometry_update_timer = QTimer(self)
-            self._geometry_update_timer.timeout.connect(self._update_inputs_geometry)
-            self._geometry_update_timer.start(1000)
+            # Recarga de la geometría al guardar inputs_geometry.json
+            self._geometry_reload_timer = QTimer(self)
+            self._geometry_reload_timer.setSingleShot(True)
+            self._geometry_reload_timer.setInterval(100)
+            self._geometry_reload_timer.timeout.connect(self._update_inputs_geometry)
+            self._geometry_watcher = QFileSystemWatcher([self._settings.INPUTS_GEOMETRY_JSON_FILE], self)
+            self._geometry_watcher.fileChanged.connect(self._on_inputs_geometry_file_changed)
 
         self._update_prints_in_prints_path()
+        self._prune_print_extractions()
+
+        # El directorio de clientes se carga cuando la ventana ya está visible
+        QTimer.singleShot(300, self._start_client_directory_load)
+
+        if self._settings.ARCHIVE_AFTER_DAYS > 0:
+            # Se deja arrancar la app antes de archivar
+            QTimer.singleShot(2000, self._start_archive_compaction)
+
+    def _start_client_directory_load(self) -> None:
+        """
+        Construye en segundo plano el directorio de clientes usado por el autocompletado
+        de nombre y RIF (ver `ClientCompleter`).
+        """
+        invoice_store = self._get_invoice_store()
+        if invoice_store is None:
+            return
+        worker = LoadClientsWorker(invoice_store)
+        worker.signals.loaded.connect(self._on_client_directory_loaded)
+        worker.signals.failed.connect(lambda error: create_log('App', f"No se pudo cargar el directorio de clientes: {error}"))
+        self._thread_pool.start(worker)
+
+    def _on_client_directory_loaded(self, directory) -> None:
+        self._client_directory = directory
+        for completer in self._client_completers.values():
+            completer.set_directory(directory)
+        if self._settings.DEBUG:
+            print(f"👥 Directorio de clientes cargado: {len(directory)} clientes.")
+
+    def _on_client_selected(self, client: Client) -> None:
+        """
+        Llena nombre, RIF, domicilio y teléfono con los datos del cliente elegido.
+        Se hace después de que el completer inserte su texto, para no pisarlo.
+        """
+        def fill():
+            for key, value in client.to_fields().items():
+                widget = self._editor_inputs.get(key)
+                if isinstance(widget, QLineEdit):
+                    widget.setText(value)
+        QTimer.singleShot(0, fill)
+
+    def _on_product_selected(self, concept_key: str, product) -> None:
+        """
+        Llena el precio unitario de la fila con el del producto elegido y recalcula sus totales.
+        """
+        price_key = concept_key.replace("-concepto", "-pu")
+        widget = self._editor_inputs.get(price_key)
+        if product.precio is None or not isinstance(widget, QLineEdit):
+            return
+        price_text = format_amount(product.precio)
+        widget.setText(price_text)
+        self._on_editor_text_edited(price_key, price_text)
+
+    def _start_archive_compaction(self) -> None:
+        """
+        Archiva en segundo plano las facturas con más de `ARCHIVE_AFTER_DAYS` días
+        en un PDF por mes (ver `src/invoice/archive.py`).
+        """
+        if not self._settings.prints_path or not os.path.isdir(self._settings.prints_path):
+            return
+        worker = CompactArchiveWorker(self._settings.prints_path, self._settings.ARCHIVE_AFTER_DAYS)
+        worker.signals.finished.connect(self._on_archive_compaction_finished)
+        worker.signals.failed.connect(self._on_archive_compaction_failed)
+        worker.signals.warning.connect(self._on_generation_warning)
+        self._thread_pool.start(worker)
+
+    def _on_archive_compaction_finished(self, summary: str) -> None:
+        if self._settings.DEBUG:
+            print(f"🗄️ {summary}")
+        else:
+            create_log('App', f"Archivo mensual de facturas: {summary}")
+        self._invoice_index.refresh()
+
+    def _on_archive_compaction_failed(self, error: str) -> None:
+        if self._settings.DEBUG:
+            print(f"No se pudieron archivar las facturas antiguas: {error}")
+        else:
+            create_log('App', f"No se pudieron archivar las facturas antiguas: {error}")
+
+    def _resolve_invoice_pdf(self, filename: str) -> tuple[str, int]:
+        """
+        Retorna el PDF y la página donde está la factura `filename`: su propio
+        archivo en `prints_path` o, si fue archivada, el PDF mensual.
+
+        Returns:
+            location (tuple[str, int]): Ruta del PDF e índice de la página.
+        """
+        invoice_path = os.path.join(self._settings.prints_path, filename)
+        if not os.path.exists(invoice_path):
+            archived = self._invoice_index.lookup_archived(filename)
+            if archived is not None:
+                return archived.archive_path, archived.page
+        return invoice_path, 0
 
     def _on_open_prints_path_folder_btn_pressed(self)->None:
         """
@@ -241,6 +410,9 @@ class App(QWidget):
                 create_log('App', f'No se pudo abrir la carpeta especificada de las facturas porque no es una ruta valida. Ruta: {self._settings.prints_path}')
             return
 
+        import platform
+        import subprocess
+
         sistema = platform.system()
 
         try:
@@ -264,39 +436,46 @@ class App(QWidget):
                 create_log('App', f'Error al tratar de abrir la carpeta de la ruta de facturas: {e}')
 
     def _on_viewer_invoice_opacity_changed(self, value: int) -> None:
-        effect = QGraphicsOpacityEffect()
-        if value > 0:
-            opacity = value/100
-            if opacity < 0:
-                opacity = 0
-            elif opacity > 1:
-                opacity = 1
-            effect.setOpacity(opacity)
-        else:
-            effect.setOpacity(0.0)
-        self._viewer_invoice_background_label.setGraphicsEffect(effect)
+        """
+        Actualiza la opacidad de la plantilla en el Visualizador segun el valor
+        seleccionado en el slider de opacidad.
+        """
+        self._viewer_invoice_background_label.setOpacity(value / 100)
+
+    def _on_invoice_index_clicked(self, index: QModelIndex) -> None:
+        """
+        Signal `clicked` para la lista de facturas en el UI.
+        """
+        if index.isValid():
+            self._on_invoice_selected(self._invoice_list_model.name_at(index.row()))
 
-    def _on_invoice_selected(self, item: QListWidgetItem, skip_tab_switch=False) -> None:
+    @trace.traced("App.select_invoice")
+    def _on_invoice_selected(self, filename: str, skip_tab_switch=False) -> None:
         """
-        Signal `itemClicked` para la lista de facturas en el UI.
+        Muestra la factura `filename` en el Visualizador.
+
+        El PDF se rasteriza con `self._pdf_rasterizer`, que guarda el resultado en
+        memoria y en disco para que volver a seleccionarlo sea inmediato.
 
         Args:
-            item (QListWidgetItem): Item seleccionado.
+            filename (str): Nombre del archivo de la factura seleccionada.
             skip_tab_switch (bool): Se utiliza en el caso especifico en que se necesita
             omitir el cambio a la seccion de Visualizador de facturas.
         """
-        invoice_path = os.path.join(self._settings.prints_path, item.text())
-        pixmap = QPixmap(invoice_path).scaled(
-            self._settings.INVOICE_WIDTH,
-            self._settings.INVOICE_HEIGHT,
-            Qt.AspectRatioMode.IgnoreAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        self._viewer_invoice_overlay_label.setPixmap(pixmap)
-        self._viewer_invoice_file_name_label.setText(item.text())
+        invoice_path, page = self._resolve_invoice_pdf(filename)
+        try:
+            pixmap = self._pdf_rasterizer.get_pixmap(invoice_path, page)
+        except Exception as e:
+            pixmap = None
+            if self._settings.DEBUG:
+                print(f"Error al rasterizar la factura {invoice_path}: {e}")
+            else:
+                create_log('App', f"Error al rasterizar la factura {invoice_path}: {e}")
+        self._viewer_invoice_overlay_label.setPixmap(pixmap if pixmap is not None else QPixmap())
+        self._viewer_invoice_file_name_label.setText(filename)
         if not skip_tab_switch:
             self._btn_viewer.click()
-        self._selected_invoice = item.text()
+        self._selected_invoice = filename
 
     def _on_change_prints_path_btn_pressed(self)->None:
         """
@@ -372,6 +551,16 @@ class App(QWidget):
         if not hasattr(self, "_selected_invoice") or not self._selected_invoice\
             or self._selected_invoice == "":
             return
+        archived = None
+        if not os.path.exists(os.path.join(self._settings.prints_path, self._selected_invoice)):
+            archived = self._invoice_index.lookup_archived(self._selected_invoice)
+        if archived is not None:
+            self.setEnabled(False)
+            info_modal = InfoModal(self, 'Eliminar Factura',
+                f"La factura {self._selected_invoice} está archivada en {os.path.basename(archived.archive_path)} y no se puede eliminar.")
+            info_modal.exec()
+            self.setEnabled(True)
+            return
         self.setEnabled(False)
         confirm_modal = ConfirmModal(self, 'Eliminar Factura', 
         f"¿Estás seguro que deseas eliminar la factura {self._selected_invoice}? \n No podrás recuperar el documento luego de su eliminación.",
@@ -380,9 +569,14 @@ class App(QWidget):
         if confirm_result == QDialog.DialogCode.Accepted:
             self.setEnabled(True)
             invoice_path = os.path.join(self._settings.prints_path, self._selected_invoice)
+            delete_span = trace.span("App.delete", file=self._selected_invoice)
             try:
                 if os.path.exists(invoice_path):
+                    self._pdf_rasterizer.discard(invoice_path)
                     os.remove(invoice_path)
+                    invoice_store = self._get_invoice_store()
+                    if invoice_store is not None:
+                        invoice_store.remove_invoice(self._settings.prints_path, self._selected_invoice)
                     if self._settings.DEBUG:
                         print("✅ Factura eliminada correctamente.")
                     else:
@@ -397,60 +591,176 @@ class App(QWidget):
                     print(f"Se trato de eliminar la factura {invoice_path} pero hubo un error: {e}.")
                 else:
                     create_log('App', f"Se trato de eliminar la factura {invoice_path} pero hubo un error: {e}.")
+                delete_span.finish(error=str(e))
                 return
-            self._update_prints_in_prints_path()
+            self._invoice_index.notify_removed(self._selected_invoice)
+            delete_span.finish()
         else:
             self.setEnabled(True)
 
 
     def _on_print_invoice_btn_pressed(self) -> None:
         """
-        Abre el diálogo de impresión del sistema operativo para imprimir la factura seleccionada.
-        El archivo PDF se obtiene desde `self._settings.prints_path` + `self._selected_invoice`.
+        Envía a la cola de impresión las facturas seleccionadas en la lista
+        (o la factura del Visualizador, si no hay selección múltiple).
+
+        La impresión se hace en segundo plano con `PrintQueue`: las facturas se agrupan
+        en trabajos de varios archivos por llamada al comando de impresión, y el estado
+        de cada trabajo se muestra en `self._print_status_label`.
         """
-        if not hasattr(self, "_selected_invoice") or not self._selected_invoice:
+        filenames = self._get_selected_invoice_names()
+        if not filenames:
             self.setEnabled(False)
-            info_modal = InfoModal(self, f"Debe seleccionar una factura para imprimir.")
+            info_modal = InfoModal(self, "Imprimir PDF", "Debe seleccionar una factura para imprimir.")
             info_modal.exec()
             self.setEnabled(True)
             return
-        invoice_path = os.path.join(self._settings.prints_path, self._selected_invoice)
-        if not os.path.exists(invoice_path):
+
+        invoice_paths = []
+        missing = []
+        for filename in filenames:
+            invoice_path = self._get_printable_path(filename)
+            if invoice_path is not None:
+                invoice_paths.append(invoice_path)
+            else:
+                missing.append(os.path.join(self._settings.prints_path, filename))
+        if missing:
+            message = f"Error al imprimir los documentos {', '.join(missing)}: El archivo no fue encontrado."
             if self._settings.DEBUG:
-                print(f"Error al imprimir el documento {invoice_path}: El archivo no fue encontrado.")
+                print(message)
             else:
-                create_log('App', f"Error al imprimir el documento {invoice_path}: El archivo no fue encontrado.")
+                create_log('App', message)
             self.setEnabled(False)
-            info_modal = InfoModal(self, f"Error al imprimir el documento {invoice_path}: El archivo no fue encontrado. \n Por favor, contacte con un administrador.")
+            info_modal = InfoModal(self, "Imprimir PDF", f"{message} \n Por favor, contacte con un administrador.")
             info_modal.exec()
             self.setEnabled(True)
-            return
-        system = platform.system()
+            if not invoice_paths:
+                return
+
+        with trace.span("App.print", files=len(invoice_paths)):
+            jobs = self._get_print_queue().enqueue(invoice_paths)
+        self._print_status_label.setText(
+            f"🖨️ {len(invoice_paths)} factura(s) en cola de impresión ({len(jobs)} trabajo(s))."
+        )
+
+    def _get_printable_path(self, filename: str) -> str | None:
+        """
+        Retorna un PDF con solo la factura `filename`, listo para imprimir. Si la factura
+        fue archivada, se extraen sus páginas del PDF mensual a una carpeta del cache.
+
+        Returns:
+            invoice_path (str | None): Ruta del PDF, o None si la factura no se encontró.
+        """
+        invoice_path = os.path.join(self._settings.prints_path, filename)
+        if os.path.exists(invoice_path):
+            return invoice_path
+        archived = self._invoice_index.lookup_archived(filename)
+        if archived is None:
+            return None
+        from ..invoice.archive import extract_archived_invoice
+        self._prune_print_extractions()
+        # Una subcarpeta por extracción: la misma factura puede estar en dos trabajos a la vez,
+        # y el nombre del PDF (que la impresora muestra como título) no cambia
+        extract_dir = self._get_print_extractions_dir() / os.urandom(4).hex()
         try:
-            if system == "Windows":
-                # Usa el comando nativo de impresión
-                os.startfile(invoice_path, "print")
-            elif system == "Darwin":
-                # macOS: usa el comando 'open' con opción de impresión
-                subprocess.run(["open", "-a", "Preview", invoice_path])
-            elif system == "Linux":
-                # Linux: usa 'lp' o 'lpr' si están disponibles
-                subprocess.run(["lp", invoice_path])
-            else:
-                self.setEnabled(False)
-                info_modal = InfoModal(self, "Imprimir PDF", f'Tu sistema operativo ({system}) no esta soportado para impresion en nuestra App. \n Te invitamos a buscar el documento e imprimirlo manualmente.')
-                info_modal.exec()
-                self.setEnabled(True)
+            extract_dir.mkdir(parents=True)
+            return extract_archived_invoice(archived, str(extract_dir / filename))
         except Exception as e:
             if self._settings.DEBUG:
-                print(f'Error al imprimir el documento {invoice_path}: {e}')
+                print(f"Error extrayendo la factura archivada {filename}: {e}")
+            else:
+                create_log('App', f"Error extrayendo la factura archivada {filename}: {e}")
+            return None
+
+    def _get_print_extractions_dir(self) -> Path:
+        """
+        Carpeta del cache donde se extraen las facturas archivadas para imprimirlas.
+        """
+        return self._settings.CACHE_DIR / "impresion"
+
+    def _remove_print_extractions(self, files: list[str]) -> None:
+        """
+        Borra las facturas extraídas para imprimir de la lista `files` (las demás rutas
+        no se tocan).
+        """
+        print_dir = self._get_print_extractions_dir()
+        for path in map(Path, files):
+            if path.parent.parent != print_dir:
+                continue
+            try:
+                path.unlink(missing_ok=True)
+                path.parent.rmdir()
+            except OSError as e:
+                create_log('App', f"No se pudo borrar la factura extraída {path}: {e}")
+
+    def _prune_print_extractions(self) -> None:
+        """
+        Borra las facturas extraídas para imprimir hace más de un día. No se borran al
+        enviar el trabajo porque algunos comandos de impresión (la impresión nativa de
+        Windows, `open -a Preview`) leen el archivo después de terminar.
+        """
+        cutoff = time.time() - 24 * 60 * 60
+        try:
+            old_dirs = [entry for entry in self._get_print_extractions_dir().iterdir() if entry.stat().st_mtime < cutoff]
+        except OSError:
+            return
+        if old_dirs:
+            import shutil
+            for old_dir in old_dirs:
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+    def _get_selected_invoice_names(self) -> list[str]:
+        """
+        Retorna los nombres de las facturas seleccionadas en la lista, en el orden de la lista.
+        Si no hay ninguna, retorna la factura mostrada en el Visualizador.
+        """
+        rows = sorted(index.row() for index in self._generated_invoices_list_view.selectionModel().selectedIndexes())
+        filenames = [self._invoice_list_model.name_at(row) for row in rows]
+        if not filenames and self._selected_invoice:
+            filenames = [self._selected_invoice]
+        return filenames
+
+    def _get_print_queue(self):
+        """
+        Retorna la cola de impresión (`PrintQueue`), creándola en el primer uso.
+        """
+        if self._print_queue is None:
+            from .print_queue import PrintQueue, parse_spooler_command
+            self._print_queue = PrintQueue(parse_spooler_command(self._settings.PRINT_COMMAND), parent=self)
+            self._print_queue.job_updated.connect(self._on_print_job_updated)
+        return self._print_queue
+
+    def _on_print_job_updated(self, job) -> None:
+        """
+        Signal `job_updated` de la cola de impresión. Muestra el estado del trabajo.
+        """
+        from .print_queue import SENDING, SENT, FAILED
+
+        if job.status == SENDING and job.attempts > 1:
+            self._print_status_label.setText(f"🔁 Reintentando trabajo {job.job_id} (intento {job.attempts}).")
+        elif job.status == SENT:
+            pending = self._print_queue.pending_jobs()
+            text = f"✅ Trabajo {job.job_id} enviado a la impresora ({len(job.files)} factura(s))."
+            if pending:
+                text += f" Quedan {pending} trabajo(s)."
+            self._print_status_label.setText(text)
+            message = f"Trabajo de impresión {job.job_id} enviado: {', '.join(job.files)}. {job.output}"
+            if self._settings.DEBUG:
+                print(message)
+            else:
+                create_log('App', message)
+        elif job.status == FAILED:
+            # Nadie va a leer las facturas extraídas de un trabajo fallido
+            self._remove_print_extractions(job.files)
+            self._print_status_label.setText(f"❌ Falló el trabajo {job.job_id} ({len(job.files)} factura(s)).")
+            message = f"Error al imprimir los documentos {', '.join(job.files)} tras {job.attempts} intento(s): {job.error}"
+            if self._settings.DEBUG:
+                print(message)
             else:
-                create_log('App', f'Error al imprimir el documento {invoice_path}: {e}')
+                create_log('App', message)
             self.setEnabled(False)
-            info_modal = InfoModal(self, "Imprimir PDF", f'Error al imprimir el documento.\n Por favor, intente imprimirlo manualmente.')
+            info_modal = InfoModal(self, "Imprimir PDF", 'Error al imprimir el documento.\n Por favor, intente imprimirlo manualmente.')
             info_modal.exec()
-            ruta_pdf = os.path.join(self._settings.prints_path, self._selected_invoice)
-            subprocess.Popen(f'explorer /select,"{ruta_pdf}"')
             self.setEnabled(True)
 
     def _on_generate_pdf_btn_pressed(self) -> None:
@@ -461,114 +771,122 @@ class App(QWidget):
         Solo se genera el PDF si al menos un campo ha sido rellenado (texto ingresado o selección activa).
         También imprime el símbolo ✔ en el campo correspondiente a la forma de pago seleccionada.
 
-        El archivo se guarda en `self._settings.prints_path` con nombre basado en timestamp.
+        El archivo se guarda en `self._settings.prints_path` con nombre basado en timestamp
+        y un número de factura secuencial (ver `InvoiceNumberAllocator`), por lo que dos
+        facturas generadas en el mismo segundo nunca se sobrescriben. El número se reserva
+        en el worker cuando el PDF ya está escrito, así que el lock y el contador (que pueden
+        estar en una carpeta de red) nunca bloquean el GUI.
+        Los valores se toman de una copia inmutable del formulario (`InvoiceForm.snapshot`)
+        y el PDF se genera en un `GenerateInvoiceWorker` en el `QThreadPool`, para no bloquear el GUI.
         """
+        if self._generation_worker is not None:
+            return
         if not self._settings.prints_path or not os.path.isdir(self._settings.prints_path):
             info_modal = InfoModal(self, "Ruta inválida", "La ruta de guardado de facturas no está definida o no existe.")
             info_modal.exec()
             return
-        try:
-            width_pt = 8.5 * inch
-            height_pt = 11 * inch
-
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"factura_{timestamp}.pdf"
-            filepath = os.path.join(self._settings.prints_path, filename)
-
-            c = canvas.Canvas(filepath, pagesize=(width_pt, height_pt))
-            c.setFont("Helvetica", 10)
-
-            scale_x = width_pt / self._settings.INVOICE_WIDTH
-            scale_y = height_pt / self._settings.INVOICE_HEIGHT
 
-            try:
-                with open(self._settings.INPUTS_GEOMETRY_JSON_FILE, "r", encoding="utf-8") as f:
-                    inputs_data = json.load(f)
-            except Exception as e:
-                if self._settings.DEBUG:
-                    print("Error cargando inputs_geometry.json en _on_generate_pdf_btn_pressed:", e)
-                else:
-                    create_log('App', f"Error cargando inputs_geometry.json en _on_generate_pdf_btn_pressed: {e}")
-                return
+        layout = self._get_inputs_layout('_on_generate_pdf_btn_pressed')
+        if layout is None or self._form is None:
+            # Sin formulario no hay editor: el layout no se pudo cargar al iniciar
+            info_modal = InfoModal(self, "Generar PDF", "No se pudo cargar la geometría de los campos de la factura.\n Revise inputs_geometry.json e intente nuevamente.")
+            info_modal.exec()
+            return
 
-            campos_rellenados = 0
+        # El número de factura se reserva en el worker, al publicar el PDF
+        worker = GenerateInvoiceWorker(
+            self._settings.prints_path, self._form.snapshot(), layout, self._get_invoice_store(),
+            optimize=self._settings.OPTIMIZE_PDF, linearize=self._settings.LINEARIZE_PDF,
+            allocator=self._get_invoice_numbers()
+        )
+        worker.signals.progress.connect(self._on_generation_progress)
+        worker.signals.finished.connect(self._on_generation_finished)
+        worker.signals.failed.connect(self._on_generation_failed)
+        worker.signals.empty.connect(self._on_generation_empty)
+        worker.signals.cancelled.connect(self._on_generation_cancelled)
+        worker.signals.warning.connect(self._on_generation_warning)
+        worker.signals.optimized.connect(self._on_generation_optimized)
+
+        self._generation_worker = worker
+        self._generation_span = trace.span("App.generate")
+        self._set_generation_running(True)
+        self._thread_pool.start(worker)
+
+    def _on_cancel_generation_btn_pressed(self) -> None:
+        if self._generation_worker is not None:
+            self._generation_worker.cancel()
+
+    def _set_generation_running(self, running: bool) -> None:
+        """
+        Muestra u oculta los controles de progreso de la generación en curso.
+        """
+        self._generate_pdf_btn.setEnabled(not running)
+        self._generation_progress_bar.setValue(0)
+        self._generation_progress_bar.setVisible(running)
+        self._cancel_generation_btn.setVisible(running)
+        if not running:
+            self._generation_worker = None
+
+    def _finish_generation_span(self, outcome: str, **attrs) -> None:
+        if self._generation_span is not None:
+            self._generation_span.finish(outcome=outcome, **attrs)
+            self._generation_span = None
+
+    def _on_generation_progress(self, step: int, total: int) -> None:
+        self._generation_progress_bar.setMaximum(total)
+        self._generation_progress_bar.setValue(step)
+
+    def _on_generation_finished(self, filepath: str) -> None:
+        worker = self._generation_worker
+        self._set_generation_running(False)
+        if self._client_directory is not None and worker is not None:
+            client = Client.from_fields(worker.fields)
+            if client is not None:
+                self._client_directory.add(client)
+        if self._settings.DEBUG:
+            print(f"📄 Factura generada para impresión: {filepath}")
+        else:
+            create_log('App', f"📄 Factura generada para impresión: {filepath}")
+        filename = os.path.basename(filepath)
+        self._invoice_index.notify_added(filename)
+        self._select_invoice_by_name(filename)
+        self._finish_generation_span("ok", file=filename)
+
+    def _on_generation_failed(self, error: str) -> None:
+        self._finish_generation_span("failed")
+        self._set_generation_running(False)
+        if self._settings.DEBUG:
+            print(f"No se pudo generar el pdf. Error: {error}")
+        else:
+            modal = InfoModal(self, 'Generar PDF', f'Error al generar el PDF: {error}\n Por favor, pongase en contacto con un administrador.')
+            modal.exec()
+            create_log('App', f'No se pudo generar el pdf en {self._settings.prints_path}: {error}')
 
-            for key, values in inputs_data.items():
-                x, y, w, h, max_len, tipo, *rest = values
-                alignment = rest[0] if rest else "left"
+    def _on_generation_empty(self) -> None:
+        self._finish_generation_span("empty")
+        self._set_generation_running(False)
+        self.setEnabled(False)
+        info_modal = InfoModal(self, "Generar PDF", 'Debes llenar al menos un campo para generar un documento.')
+        info_modal.exec()
+        self.setEnabled(True)
 
-                widget = self._editor_inputs.get(key)
-                if widget is None:
-                    continue
-
-                # Forma de pago se maneja aparte
-                if tipo == "radio_button" and key.startswith("forma_pago_"):
-                    continue
-
-                if tipo == "radio_button":
-                    value = "✔" if widget.isChecked() else ""
-                elif tipo == "checkbox":
-                    value = "✔" if widget.isChecked() else ""
-                elif isinstance(widget, QLineEdit):
-                    value = widget.text().strip()
-                elif isinstance(widget, QTextEdit):
-                    value = widget.toPlainText().strip()
-                elif isinstance(widget, QComboBox):
-                    value = widget.currentText().strip()
-                elif isinstance(widget, QSpinBox):
-                    value = str(widget.value())
-                else:
-                    value = ""
-
-                if value:
-                    campos_rellenados += 1
-                    text_y = height_pt - ((y + 16) * scale_y)
-
-                    # Alineación horizontal
-                    if alignment == "center":
-                        text_x = (x + w / 2) * scale_x
-                        c.drawCentredString(text_x, text_y, value)
-                    elif alignment == "right":
-                        text_x = (x + w - 2) * scale_x
-                        c.drawRightString(text_x, text_y, value)
-                    else:  # left o default
-                        text_x = (x + 2) * scale_x
-                        c.drawString(text_x, text_y, value)
-
-            # ✔ Imprimir símbolo en forma de pago seleccionada
-            forma_pago = getattr(self, "forma_pago_selected", None)
-
-            if forma_pago:
-                key = f"forma_pago_{forma_pago}"
-                if key in inputs_data:
-                    x, y, w, h, *_ = inputs_data[key]
-                    text_x = (x + 1) * scale_x
-                    text_y = height_pt - ((y + 11) * scale_y)
-                    c.setFont("Helvetica-Bold", 14)
-                    c.drawString(text_x, text_y, "✔")
-                    campos_rellenados += 1
-
-            if campos_rellenados == 0:
-                self.setEnabled(False)
-                info_modal = InfoModal(self, "Generar PDF", 'Debes llenar al menos un campo para generar un documento.')
-                info_modal.exec()
-                self.setEnabled(True)
-                return
+    def _on_generation_optimized(self, message: str) -> None:
+        if self._settings.DEBUG:
+            print(f"📦 {message}")
+        else:
+            create_log('App', message)
 
-            c.save()
-            if self._settings.DEBUG:
-                print(f"📄 Factura generada para impresión: {filepath}")
-            else:
-                create_log('App', f"📄 Factura generada para impresión: {filepath}")
-            self._update_prints_in_prints_path()
-        except Exception as e:
-            if self._settings.DEBUG:
-                print(f"No se pudo generar el pdf. Error: {e}")
-            else:
-                modal = InfoModal(self, 'Generar PDF', f'Error al generar el PDF: {e}\n Por favor, pongase en contacto con un administrador.')
-                modal.exec()
-                create_log('App', f'No se pudo generar el pdf {filepath}: {e}')
+    def _on_generation_warning(self, message: str) -> None:
+        if self._settings.DEBUG:
+            print(message)
+        else:
+            create_log('App', message)
 
+    def _on_generation_cancelled(self) -> None:
+        self._finish_generation_span("cancelled")
+        self._set_generation_running(False)
+        if self._settings.DEBUG:
+            print("Generación de PDF cancelada.")
 
     def _on_clear_all_inputs_btn_pressed(self) -> None:
         self.setEnabled(False)
@@ -599,24 +917,24 @@ class App(QWidget):
                     for btn in child.buttons():
                         btn.setChecked(False)
                     child.setExclusive(True)
+            if self._totals is not None:
+                self._totals.clear()
+            if self._drafts is not None:
+                self._draft_timer.stop()
+                self._draft_changes = {}
+                self._draft_payment = ...
+                self._drafts.clear()
         self.setEnabled(True)
 
     def _on_invoice_opacity_changed(self, value:int)->None:
         """
         Actualiza la opacidad de la factura en el editor segun el valor seleccionado
         en el slider de opacidad.
+
+        La plantilla se pinta con `QPainter.setOpacity` y los cambios se agrupan
+        por frame (ver `OpacityPixmapLabel`), por lo que arrastrar el slider no crea efectos.
         """
-        opacity_effect = QGraphicsOpacityEffect()
-        if value > 0:
-            opacity = value/100
-            if opacity < 0:
-                opacity = 0
-            elif opacity > 1:
-                opacity = 1
-            opacity_effect.setOpacity(value/100)
-        else:
-            opacity_effect.setOpacity(0.0)
-        self._editor_invoice_label.setGraphicsEffect(opacity_effect)
+        self._editor_invoice_label.setOpacity(value / 100)
 
     def _on_tab_switched(self, tab_index:int)->None:
         """
@@ -624,28 +942,106 @@ class App(QWidget):
         """
         self.stack.setCurrentIndex(tab_index)
 
+    @trace.traced("App.list_refresh")
     def _update_prints_in_prints_path(self)->None:
         """
         Actualiza la lista de archivos en la ruta
         especificada en `self._settings.prints_path`
+
+        Reconstruye `self._invoice_index` desde cero; los cambios posteriores en la
+        carpeta llegan como diferencias por `_on_invoices_added`/`_on_invoices_removed`.
+        """
+        self._invoice_index.rebuild()
+
+    def _on_invoices_reset(self, archivos: list) -> None:
+        """
+        Signal `reset` del índice de facturas. Rellena la lista completa.
+        """
+        if self._invoice_search_input.text().strip():
+            self._apply_invoice_filter()
+            return
+        self._invoice_list_model.reset_names(archivos)
+        self._select_first_invoice()
+
+    def _on_invoices_added(self, archivos: list) -> None:
+        """
+        Signal `added` del índice de facturas. Agrega solo las facturas nuevas a la lista.
+        """
+        if self._invoice_search_input.text().strip():
+            self._apply_invoice_filter()
+            return
+        was_empty = self._invoice_list_model.total_count() == 0
+        self._invoice_list_model.add_names(archivos)
+        if was_empty:
+            self._select_first_invoice()
+
+    def _on_invoices_removed(self, archivos: list) -> None:
+        """
+        Signal `removed` del índice de facturas. Quita solo las facturas eliminadas de la lista.
+        """
+        self._invoice_list_model.remove_names(archivos)
+        if self._selected_invoice in archivos:
+            self._selected_invoice = ""
+            self._select_first_invoice()
+
+    def _apply_invoice_filter(self) -> None:
+        """
+        Filtra la lista de facturas con el texto del buscador.
+
+        Los datos de cliente, RIF y fecha se consultan en la base de datos de facturas,
+        sin abrir ningún PDF. También se incluyen las facturas cuyo nombre de
+        archivo contiene el texto.
         """
-        self._generated_invoices_list_widget.clear()
-        archivos = self._settings.get_invoices_in_prints_path()
-        self._generated_invoices_list_widget.addItems(archivos)
+        text = self._invoice_search_input.text().strip()
+        archivos = self._invoice_index.names()
+        if not text:
+            matches = list(archivos)
+        else:
+            found = set()
+            invoice_store = self._get_invoice_store()
+            if invoice_store is not None:
+                try:
+                    found.update(invoice_store.search(text, self._settings.prints_path))
+                except Exception as e:
+                    if self._settings.DEBUG:
+                        print(f"Error buscando facturas: {e}")
+                    else:
+                        create_log('App', f"Error buscando facturas: {e}")
+            needle = text.casefold()
+            found.update(archivo for archivo in archivos if needle in archivo.casefold())
+            matches = [archivo for archivo in found if archivo in archivos]
+
+        self._invoice_list_model.reset_names(matches)
+        if self._selected_invoice in matches:
+            self._select_invoice_by_name(self._selected_invoice)
+        else:
+            self._select_first_invoice()
 
-        if archivos:
-            self._generated_invoices_list_widget.setCurrentRow(0)
-            self._on_invoice_selected(self._generated_invoices_list_widget.currentItem(), skip_tab_switch=True)
+    def _select_first_invoice(self) -> None:
+        """
+        Selecciona la primera factura de la lista, o muestra la imagen de
+        "ninguna factura seleccionada" si la lista está vacía.
+        """
+        if self._invoice_list_model.rowCount():
+            self._generated_invoices_list_view.setCurrentIndex(self._invoice_list_model.index(0))
+            self._on_invoice_selected(self._invoice_list_model.name_at(0), skip_tab_switch=True)
         else:
-            pixmap = QPixmap(self._settings.NO_INVOICE_SELECTED_BACKGROUND_FILEPATH).scaled(
+            pixmap = self._image_cache.get_scaled(
+                self._settings.NO_INVOICE_SELECTED_BACKGROUND_FILEPATH,
                 self._settings.INVOICE_WIDTH,
-                self._settings.INVOICE_HEIGHT,
-                Qt.AspectRatioMode.IgnoreAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
+                self._settings.INVOICE_HEIGHT
             )
             self._viewer_invoice_overlay_label.setPixmap(pixmap)
             self._viewer_invoice_file_name_label.setText("No hay ninguna factura seleccionada.")
 
+    def _select_invoice_by_name(self, filename: str) -> None:
+        row = self._invoice_list_model.row_of(filename)
+        if row >= 0:
+            index = self._invoice_list_model.index(row)
+            self._generated_invoices_list_view.setCurrentIndex(index)
+            self._generated_invoices_list_view.scrollTo(index)
+            self._on_invoice_selected(filename, skip_tab_switch=True)
+
     def _center_on_screen(self) -> None:
         """
         Centra la APP en el medio de la pantalla.
@@ -661,70 +1057,280 @@ class App(QWidget):
         frame_geom.moveCenter(screen_center)
         self.move(frame_geom.topLeft())
 
-    def _update_inputs_geometry(self):
+    def _get_invoice_numbers(self) -> InvoiceNumberAllocator:
+        """
+        Retorna el contador de facturas de la carpeta de facturas actual (ver `counter_path_for`).
+        Se vuelve a crear si la carpeta cambió.
+        """
+        counter_path = counter_path_for(self._settings.prints_path)
+        if self._invoice_numbers is None or self._invoice_numbers.counter_path != counter_path:
+            self._invoice_numbers = InvoiceNumberAllocator(counter_path)
+        return self._invoice_numbers
+
+    def _get_invoice_store(self):
+        """
+        Retorna la base de datos de facturas (`InvoiceStore`), abriéndola en el primer uso.
+        Si falla, la app sigue funcionando sin búsqueda por datos.
+        """
+        if self._invoice_store is not None:
+            return self._invoice_store
+        try:
+            from ..invoice.store import InvoiceStore
+            self._invoice_store = InvoiceStore(self._settings.INVOICES_DB_FILE)
+            return self._invoice_store
+        except Exception as e:
+            if self._settings.DEBUG:
+                print(f"Error abriendo la base de datos de facturas: {e}")
+            else:
+                create_log('App', f"Error abriendo la base de datos de facturas: {e}")
+            return None
+
+    def _get_product_catalog(self):
+        """
+        Retorna el catálogo de productos, abriéndolo en el primer uso.
+        Si el catálogo no se pudo abrir, no se vuelve a intentar.
         """
-        Actualiza la geometría y propiedades de los widgets existentes según el archivo JSON.
+        if self._product_catalog is not None or self._product_catalog_failed:
+            return self._product_catalog
+        try:
+            from ..invoice.catalog import ProductCatalog
+            self._product_catalog = ProductCatalog(self._settings.CATALOG_DB_FILE)
+        except Exception as e:
+            self._product_catalog_failed = True
+            if self._settings.DEBUG:
+                print(f"Error abriendo el catálogo de productos: {e}")
+            else:
+                create_log('App', f"Error abriendo el catálogo de productos: {e}")
+        return self._product_catalog
 
-        Si el widget ya existe en `self._editor_inputs`, se actualiza su posición, tamaño, longitud máxima y alineación.
-        Si no existe, se crea y se agrega al contenedor `self._editor_invoice_label`.
+    def _get_inputs_layout(self, origin: str) -> CompiledLayout | None:
+        """
+        Retorna el layout compilado de `inputs_geometry.json`. El JSON solo se vuelve
+        a leer si el archivo cambió desde la última llamada.
 
-        El archivo debe tener entradas con la forma:
-            [x, y, width, height, max_length, tipo, alignment?]
-        Donde `alignment` puede ser "left", "center" o "right" (opcional, por defecto "left").
+        Args:
+            origin (str): Nombre del método que lo solicita, para los mensajes de error.
+
+        Returns:
+            layout (CompiledLayout | None): Layout compilado, o None si no se pudo cargar.
         """
         try:
-            with open(self._settings.INPUTS_GEOMETRY_JSON_FILE, "r", encoding="utf-8") as f:
-                updated_data = json.load(f)
+            return get_layout(
+                self._settings.INPUTS_GEOMETRY_JSON_FILE,
+                self._settings.INVOICE_WIDTH,
+                self._settings.INVOICE_HEIGHT
+            )
         except Exception as e:
             if self._settings.DEBUG:
-                print("Error leyendo geometría:", e)
+                print(f"Error cargando inputs_geometry.json en {origin}:", e)
             else:
-                create_log('App', f'Error leyendo la geometria en _upodate_inputs_geometry: {e}')
+                create_log('App', f"Error cargando inputs_geometry.json en {origin}: {e}")
+            return None
+
+    @staticmethod
+    def _qt_alignment(alignment: str) -> Qt.AlignmentFlag:
+        if alignment == "center":
+            return Qt.AlignmentFlag.AlignCenter
+        if alignment == "right":
+            return Qt.AlignmentFlag.AlignRight
+        return Qt.AlignmentFlag.AlignLeft
+
+    def _on_inputs_geometry_file_changed(self, path: str) -> None:
+        """
+        Signal `fileChanged` del watcher de `inputs_geometry.json` (solo en DEBUG).
+        Agrupa los eventos y programa la recarga.
+        """
+        if self._geometry_change_started_at is None:
+            self._geometry_change_started_at = time.perf_counter()
+        self._geometry_reload_timer.start()
+
+    def _update_inputs_geometry(self):
+        """
+        Actualiza la geometría y propiedades de los widgets según el archivo JSON.
+
+        Se compara el layout nuevo con el anterior (`diff_layouts`) y solo se tocan
+        los widgets de los campos nuevos, modificados o eliminados. Si el archivo no
+        cambió desde la última carga, el layout en cache es el mismo y no se hace nada.
+        """
+        started_at = time.perf_counter()
+        notified_at = self._geometry_change_started_at or started_at
+        self._geometry_change_started_at = None
+
+        # Algunos editores guardan reemplazando el archivo, y el watcher deja de vigilarlo
+        geometry_path = self._settings.INPUTS_GEOMETRY_JSON_FILE
+        if self._geometry_watcher is not None and geometry_path not in self._geometry_watcher.files() \
+                and os.path.exists(geometry_path):
+            self._geometry_watcher.addPath(geometry_path)
+
+        layout = self._get_inputs_layout('_update_inputs_geometry')
+        if layout is None or layout is self._inputs_layout:
             return
 
-        for key, values in updated_data.items():
-            x, y, w, h, max_len, tipo, *rest = values
-            alignment = rest[0] if rest else "left"
+        added, changed, removed = diff_layouts(self._inputs_layout, layout)
+        self._inputs_layout = layout
+        if self._form is None:
+            self._form = InvoiceForm(layout)
+        else:
+            self._form.relayout(layout)
 
-            if key in self._editor_inputs:
-                widget = self._editor_inputs[key]
-                widget.setGeometry(x, y, w, h)
+        for key in removed:
+            self._remove_editor_input(key)
 
-                if tipo == "text" and isinstance(widget, QLineEdit):
-                    widget.setMaxLength(max_len)
-                    if alignment == "center":
-                        widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    elif alignment == "right":
-                        widget.setAlignment(Qt.AlignmentFlag.AlignRight)
-                    else:
-                        widget.setAlignment(Qt.AlignmentFlag.AlignLeft)
-                continue
+        for field in changed:
+            widget = self._editor_inputs.get(field.key)
+            if widget is None or not self._widget_matches_tipo(widget, field.tipo):
+                self._remove_editor_input(field.key)
+                self._create_editor_input(field)
+            else:
+                self._apply_field_geometry(widget, field)
 
-            # Crear nuevo widget si no existe
-            if tipo == "text":
-                widget = QLineEdit(self._editor_invoice_label)
-                widget.setMaxLength(max_len)
-                if alignment == "center":
-                    widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                elif alignment == "right":
-                    widget.setAlignment(Qt.AlignmentFlag.AlignRight)
-                else:
-                    widget.setAlignment(Qt.AlignmentFlag.AlignLeft)
+        for field in added:
+            self._create_editor_input(field)
+
+        if added or removed:
+            self._reset_totals_engine(layout, self._form.snapshot().to_fields())
 
-            elif tipo == "checkbox":
-                widget = QCheckBox(self._editor_invoice_label)
+        if self._settings.DEBUG:
+            now = time.perf_counter()
+            print(
+                f"♻️ Geometría recargada: {len(changed)} modificados, {len(added)} nuevos, {len(removed)} eliminados. "
+                f"Aplicado en {(now - started_at) * 1000:.1f} ms, {(now - notified_at) * 1000:.1f} ms desde el aviso del archivo."
+            )
+
+    @staticmethod
+    def _widget_matches_tipo(widget: QWidget, tipo: str) -> bool:
+        if tipo == "text":
+            return isinstance(widget, QLineEdit)
+        if tipo == "checkbox":
+            return isinstance(widget, QCheckBox)
+        if tipo == "radio_button":
+            return isinstance(widget, QRadioButton)
+        return False
 
-            elif tipo == "radio_button":
-                widget = QRadioButton(self._editor_invoice_label)
-                self._radio_button_group.addButton(widget)
+    def _apply_field_geometry(self, widget: QWidget, field) -> None:
+        """
+        Aplica posición, tamaño, longitud máxima y alineación de `field` a `widget`.
+        """
+        widget.setGeometry(field.x, field.y, field.w, field.h)
+        if field.tipo == "text" and isinstance(widget, QLineEdit):
+            widget.setMaxLength(field.max_len)
+            widget.setAlignment(self._qt_alignment(field.alignment))
+
+    def _create_editor_input(self, field) -> QWidget | None:
+        """
+        Crea el widget de `field` en el contenedor del editor y lo registra en `self._editor_inputs`.
 
+        Returns:
+            widget (QWidget | None): Widget creado, o None si el tipo no es soportado.
+        """
+        parent = self._editor_inputs_parent
+        if field.tipo == "text":
+            widget = QLineEdit(parent)
+            widget.textChanged.connect(lambda text, k=field.key: self._set_form_value(k, text))
+            # `textEdited` solo se emite con cambios del usuario, no con los `setText` de los totales
+            widget.textEdited.connect(lambda text, k=field.key: self._on_editor_text_edited(k, text))
+            if field.key in ("nombre_razon_social", "numero_rif"):
+                completer = ClientCompleter(widget, field.key)
+                completer.client_selected.connect(self._on_client_selected)
+                completer.set_directory(self._client_directory)
+                self._client_completers[field.key] = completer
+            elif field.key.endswith("-concepto"):
+                completer = ProductCompleter(widget, self._get_product_catalog)
+                completer.product_selected.connect(
+                    lambda product, k=field.key: self._on_product_selected(k, product)
+                )
+
+        elif field.tipo == "checkbox":
+            widget = QCheckBox(parent)
+            widget.toggled.connect(lambda checked, k=field.key: self._set_form_value(k, checked))
+
+        elif field.tipo == "radio_button":
+            widget = QRadioButton(parent)
+            self._radio_button_group.addButton(widget)
+
+            if field.is_payment:
+                valor = field.key.replace("forma_pago_", "")
+                widget.toggled.connect(lambda checked, v=valor: self._on_payment_toggled(v, checked))
             else:
-                continue
+                widget.toggled.connect(lambda checked, k=field.key: self._set_form_value(k, checked))
+
+        else:
+            return None
+
+        self._apply_field_geometry(widget, field)
+        widget.setStyleSheet("background-color: rgba(255,255,255,180); border: 1px solid #888;")
+        widget.show()
+        self._editor_inputs[field.key] = widget
+        return widget
+
+    def _set_form_value(self, key: str, value) -> None:
+        if self._form.set(key, value) and self._drafts is not None:
+            self._draft_changes[key] = value
+            self._draft_timer.start()
+
+    def _on_payment_toggled(self, payment: str, checked: bool) -> None:
+        if checked:
+            changed = self._form.set_payment(payment)
+        elif self._form.payment == payment:
+            changed = self._form.set_payment(None)
+        else:
+            changed = False
+        if changed and self._drafts is not None:
+            self._draft_payment = self._form.payment
+            self._draft_timer.start()
+
+    def _flush_draft(self) -> None:
+        """
+        Encola en el diario del borrador los cambios acumulados desde el último autoguardado.
+        """
+        self._draft_timer.stop()
+        if self._drafts is None or (not self._draft_changes and self._draft_payment is ...):
+            return
+        self._drafts.record(self._draft_changes, payment=self._draft_payment)
+        self._draft_changes = {}
+        self._draft_payment = ...
 
-            widget.setGeometry(x, y, w, h)
-            widget.setStyleSheet("background-color: rgba(255,255,255,180); border: 1px solid #888;")
-            widget.show()
-            self._editor_inputs[key] = widget
+    def _restore_draft(self) -> None:
+        """
+        Restaura en una sola pasada el borrador guardado al cerrar (o al fallar) la app.
+        Los widgets se actualizan sin signals, ya que el formulario se carga directamente.
+        """
+        if self._drafts is None or not self._drafts.restored:
+            return
+        for key in self._form.load(self._drafts.restored):
+            widget = self._editor_inputs.get(key)
+            value = self._form.get(key)
+            if widget is None:
+                continue
+            widget.blockSignals(True)
+            if isinstance(widget, QLineEdit):
+                widget.setText(str(value))
+            elif isinstance(widget, (QCheckBox, QRadioButton)):
+                widget.setChecked(bool(value))
+            widget.blockSignals(False)
+
+        payment_widget = self._editor_inputs.get(f"forma_pago_{self._form.payment}")
+        if payment_widget is not None:
+            payment_widget.blockSignals(True)
+            payment_widget.setChecked(True)
+            payment_widget.blockSignals(False)
+
+    def closeEvent(self, event) -> None:
+        if self._drafts is not None:
+            self._flush_draft()
+            self._drafts.close()
+        super().closeEvent(event)
+
+    def _remove_editor_input(self, key: str) -> None:
+        widget = self._editor_inputs.pop(key, None)
+        if widget is None:
+            return
+        # El widget que lo reemplace (si lo hay) empieza vacío
+        self._form.reset(key)
+        self._client_completers.pop(key, None)
+        if isinstance(widget, QRadioButton):
+            self._radio_button_group.removeButton(widget)
+        widget.deleteLater()
 
     def _load_editor_inputs(self, parent: QWidget):
         """
@@ -732,57 +1338,44 @@ class App(QWidget):
 
         Este método crea los widgets (QLineEdit, QCheckBox, QRadioButton) y los posiciona en el contenedor `parent`.
         También aplica estilos visuales y alineación de texto si está especificada en el JSON.
+        Cada widget mantiene al día `self._form` (`InvoiceForm`) con sus signals.
 
         El archivo debe tener entradas con la forma:
             [x, y, width, height, max_length, tipo, alignment?]
         Donde `alignment` puede ser "left", "center" o "right" (opcional, por defecto "left").
         """
-        try:
-            with open(self._settings.INPUTS_GEOMETRY_JSON_FILE, "r", encoding="utf-8") as f:
-                inputs_data = json.load(f)
-        except Exception as e:
-            if self._settings.DEBUG:
-                print("Error cargando inputs_geometry.json en _load_editor_inputs:", e)
-            else:
-                create_log('App', f"Error cargando inputs_geometry.json en _load_editor_inputs: {e}")
-            return
-
+        self._editor_inputs_parent = parent
         self._editor_inputs = {}
         self._radio_button_group = QButtonGroup(parent)
 
-        for key, values in inputs_data.items():
-            x, y, w, h, max_len, tipo, *rest = values
-            alignment = rest[0] if rest else "left"
-
-            if tipo == "text":
-                widget = QLineEdit(parent)
-                widget.setMaxLength(max_len)
-
-                if alignment == "center":
-                    widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                elif alignment == "right":
-                    widget.setAlignment(Qt.AlignmentFlag.AlignRight)
-                else:
-                    widget.setAlignment(Qt.AlignmentFlag.AlignLeft)
-
-            elif tipo == "checkbox":
-                widget = QCheckBox(parent)
-
-            elif tipo == "radio_button":
-                widget = QRadioButton(parent)
-                self._radio_button_group.addButton(widget)
-
-                if key.startswith("forma_pago_"):
-                    valor = key.replace("forma_pago_", "")
-                    widget.toggled.connect(lambda checked, v=valor: setattr(self, "forma_pago_selected", v) if checked else None)
-
-            else:
-                continue
+        layout = self._get_inputs_layout('_load_editor_inputs')
+        if layout is None:
+            return
 
-            widget.move(x, y)
-            widget.resize(w, h)
-            widget.setStyleSheet("background-color: rgba(255,255,255,180); border: 1px solid #888;")
-            widget.show()
-            self._editor_inputs[key] = widget
+        self._inputs_layout = layout
+        self._form = InvoiceForm(layout)
+        for field in layout.fields:
+            self._create_editor_input(field)
+        self._restore_draft()
+        self._reset_totals_engine(layout, self._form.snapshot().to_fields())
 
+    def _reset_totals_engine(self, layout: CompiledLayout, values: dict = None) -> None:
+        """
+        Crea el motor de totales para las claves de `layout`, con `values` como estado inicial.
+        """
+        if not self._settings.AUTO_TOTALS:
+            return
+        self._totals = TotalsEngine(layout.by_key)
+        if values:
+            self._totals.load(values)
 
+    def _on_editor_text_edited(self, key: str, text: str) -> None:
+        """
+        Recalcula solo los totales que dependen de `key` y los escribe en el editor.
+        """
+        if self._totals is None:
+            return
+        for total_key, value in self._totals.set(key, text).items():
+            widget = self._editor_inputs.get(total_key)
+            if isinstance(widget, QLineEdit):
+                widget.setText(value)
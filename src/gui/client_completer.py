@@ -0,0 +1,67 @@
+from PyQt6.QtCore import Qt, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QStandardItem, QStandardItemModel
+from PyQt6.QtWidgets import QCompleter, QLineEdit
+from ..invoice.clients import Client, ClientDirectory
+
+# Valor que se inserta en el campo y cliente de cada fila
+_VALUE_ROLE = Qt.ItemDataRole.UserRole
+_CLIENT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class ClientCompleter(QCompleter):
+    """
+    Autocompletado de clientes para el campo de nombre o de RIF del editor.
+
+    El filtrado no lo hace Qt: en cada edición se consulta `ClientDirectory` (búsqueda
+    por prefijo) y el modelo se reemplaza con los resultados, que se muestran tal cual.
+
+    Signals:
+        client_selected (Client): El usuario eligió un cliente de la lista.
+
+    Args:
+        line_edit (QLineEdit): Campo al que se asocia.
+        field (str): `nombre_razon_social` o `numero_rif`.
+        limit (int): `Opcional` Máximo de sugerencias. Default: 20
+    """
+    client_selected = pyqtSignal(object)
+
+    def __init__(self, line_edit: QLineEdit, field: str, limit: int = 20):
+        super().__init__(line_edit)
+        self._field = field
+        self._limit = limit
+        self._directory = None
+        self._model = QStandardItemModel(self)
+        self.setModel(self._model)
+        self.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.setCompletionRole(_VALUE_ROLE)
+        self.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.activated[QModelIndex].connect(self._on_activated)
+        line_edit.setCompleter(self)
+        line_edit.textEdited.connect(self._on_text_edited)
+
+    def set_directory(self, directory: ClientDirectory) -> None:
+        self._directory = directory
+
+    def _on_text_edited(self, text: str) -> None:
+        if self._directory is None:
+            return
+        if self._field == "numero_rif":
+            clients = self._directory.search_rif(text, self._limit)
+        else:
+            clients = self._directory.search_name(text, self._limit)
+
+        self._model.clear()
+        for client in clients:
+            item = QStandardItem(client.label())
+            item.setData(getattr(client, self._field), _VALUE_ROLE)
+            item.setData(client, _CLIENT_ROLE)
+            self._model.appendRow(item)
+        if clients:
+            self.complete()
+        else:
+            self.popup().hide()
+
+    def _on_activated(self, index: QModelIndex) -> None:
+        client = index.data(_CLIENT_ROLE)
+        if isinstance(client, Client):
+            self.client_selected.emit(client)
@@ -0,0 +1,128 @@
+from pathlib import Path
+import hashlib
+import os
+import struct
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPixmap, QPixmapCache, QImage
+
+_RAW_MAGIC = b"FAIC"
+_RAW_HEADER = struct.Struct("<4sII")
+_RAW_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+
+class ImageCache:
+    """
+    Cache central de imágenes escaladas (plantilla de factura, imagen de
+    "ninguna factura seleccionada", etc.).
+
+    Cada variante se identifica por (ruta, tamaño, modo de transformación):
+    - En memoria se guarda en `QPixmapCache`, con el presupuesto `budget_kb`.
+    - En disco se guarda ya escalada, sin comprimir, en `cache_dir`. Cargarla
+      es mucho más rápido que decodificar el PNG original y volver a escalarlo,
+      y se invalida sola si cambian la fecha o el tamaño del archivo original.
+      Al guardar una variante se borran las de versiones anteriores del mismo
+      archivo, para que el cache no crezca con cada cambio de la imagen.
+
+    Args:
+        cache_dir (Path): Carpeta del cache en disco.
+        budget_kb (int): Límite de `QPixmapCache` en KB. Default: 32768
+    """
+
+    def __init__(self, cache_dir: Path, budget_kb: int = 32 * 1024):
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        if QPixmapCache.cacheLimit() < budget_kb:
+            QPixmapCache.setCacheLimit(budget_kb)
+
+    @staticmethod
+    def _digest(value) -> str:
+        return hashlib.sha1(repr(value).encode("utf-8")).hexdigest()[:16]
+
+    def _disk_path(self, path: str, width: int, height: int, mode: Qt.TransformationMode) -> Path | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        # <hash de la ruta>_<hash de mtime + tamaño>_<hash de la variante>.raw
+        return self._cache_dir / (
+            f"{self._digest(os.path.abspath(path))}_{self._digest((stat.st_mtime_ns, stat.st_size))}"
+            f"_{self._digest((width, height, mode.value))}.raw"
+        )
+
+    def _prune_stale(self, disk_path: Path) -> None:
+        """
+        Borra las variantes de versiones anteriores del archivo de `disk_path`.
+        """
+        path_prefix, stamp, _ = disk_path.stem.split("_")
+        stale = [
+            old for old in self._cache_dir.glob(f"{path_prefix}_*.raw")
+            if old.stem.split("_")[1] != stamp
+        ]
+        for old in stale:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _read_raw(disk_path: Path) -> QPixmap | None:
+        try:
+            data = disk_path.read_bytes()
+            magic, width, height = _RAW_HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if magic != _RAW_MAGIC or len(data) != _RAW_HEADER.size + width * height * 4:
+            return None
+        image = QImage(data[_RAW_HEADER.size:], width, height, width * 4, _RAW_FORMAT)
+        # copy() para que la imagen no dependa del buffer de bytes leído
+        return QPixmap.fromImage(image.copy())
+
+    @staticmethod
+    def _write_raw(disk_path: Path, pixmap: QPixmap) -> None:
+        image = pixmap.toImage().convertToFormat(_RAW_FORMAT)
+        bits = image.constBits()
+        bits.setsize(image.sizeInBytes())
+        tmp_path = disk_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_RAW_HEADER.pack(_RAW_MAGIC, image.width(), image.height()))
+            f.write(bytes(bits))
+        os.replace(tmp_path, disk_path)
+
+    def get_scaled(self, path: str, width: int, height: int,
+                   mode: Qt.TransformationMode = Qt.TransformationMode.SmoothTransformation) -> QPixmap:
+        """
+        Retorna la imagen de `path` escalada a `width` x `height` (sin mantener proporción).
+
+        Args:
+            path (str): Ruta de la imagen original.
+            width (int): Ancho final.
+            height (int): Alto final.
+            mode (Qt.TransformationMode): `Opcional` Modo de escalado. Default: SmoothTransformation
+
+        Returns:
+            pixmap (QPixmap): Imagen escalada. Si no se pudo leer el archivo, un QPixmap nulo.
+        """
+        memory_key = f"image_cache|{path}|{width}x{height}|{mode.value}"
+        pixmap = QPixmapCache.find(memory_key)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+
+        disk_path = self._disk_path(path, width, height, mode)
+        pixmap = self._read_raw(disk_path) if disk_path is not None and disk_path.exists() else None
+
+        if pixmap is None:
+            source = QImage(path)
+            if source.isNull():
+                return QPixmap()
+            if source.width() != width or source.height() != height:
+                source = source.scaled(width, height, Qt.AspectRatioMode.IgnoreAspectRatio, mode)
+            pixmap = QPixmap.fromImage(source)
+            if disk_path is not None:
+                try:
+                    self._prune_stale(disk_path)
+                    self._write_raw(disk_path, pixmap)
+                except OSError:
+                    pass
+
+        QPixmapCache.insert(memory_key, pixmap)
+        return pixmap
@@ -0,0 +1,111 @@
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from ..settings.settings import SettingsManager
+from ..invoice.archive import ArchiveIndex, ArchivedInvoice
+from ..utils import trace
+
+
+class InvoiceIndex(QObject):
+    """
+    Índice en memoria de las facturas de `prints_path`.
+
+    Se construye una sola vez con `os.scandir` y luego se mantiene al día con
+    `QFileSystemWatcher`. Cuando la carpeta cambia, se vuelve a leer la lista de
+    nombres (sin `stat` por archivo) y solo se emiten las diferencias.
+
+    También incluye las facturas archivadas en los PDF mensuales (ver
+    `src/invoice/archive.py`), con su nombre original.
+
+    Signals:
+        reset (list): Lista completa de facturas, al cambiar de carpeta.
+        added (list): Facturas nuevas.
+        removed (list): Facturas eliminadas.
+
+    Args:
+        settings_instance (SettingsManager): Configuración del programa.
+        debounce_ms (int): Milisegundos de espera para agrupar eventos del watcher. Default: 200
+    """
+    reset = pyqtSignal(list)
+    added = pyqtSignal(list)
+    removed = pyqtSignal(list)
+
+    def __init__(self, settings_instance: SettingsManager, debounce_ms: int = 200, parent=None):
+        super().__init__(parent)
+        self._settings = settings_instance
+        self._names = set()
+        self._path = ""
+        self._archive = None
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self.refresh)
+
+    def names(self) -> set:
+        return self._names
+
+    def rebuild(self) -> None:
+        """
+        Vuelve a construir el índice desde cero para `prints_path` y emite `reset`.
+        """
+        if self._watcher.directories():
+            self._watcher.removePaths(self._watcher.directories())
+        self._path = self._settings.prints_path
+        self._archive = ArchiveIndex(self._path) if self._path else None
+        names = self._list_names()
+        self._names = set(names)
+        if self._path:
+            self._watcher.addPath(self._path)
+        self.reset.emit(names)
+
+    @trace.traced("InvoiceIndex.refresh")
+    def refresh(self) -> None:
+        """
+        Vuelve a leer la carpeta y emite solo las facturas agregadas y eliminadas.
+        """
+        if self._path != self._settings.prints_path:
+            self.rebuild()
+            return
+        current = set(self._list_names())
+        added = current - self._names
+        removed = self._names - current
+        self._names = current
+        if removed:
+            self.removed.emit(sorted(removed))
+        if added:
+            self.added.emit(sorted(added))
+
+    def _list_names(self) -> list[str]:
+        names = self._settings.get_invoices_in_prints_path()
+        archived = self._archive.names() if self._archive is not None else None
+        if archived:
+            # Una factura puede estar en ambos lados si se interrumpió una compactación
+            return list(set(names).union(archived))
+        return names
+
+    def lookup_archived(self, name: str) -> ArchivedInvoice | None:
+        """
+        Retorna la ubicación de `name` en los archivos mensuales, o None si no está archivada.
+        """
+        return self._archive.lookup(name) if self._archive is not None else None
+
+    def notify_added(self, name: str) -> None:
+        """
+        Registra una factura creada por la propia app, sin esperar al watcher.
+        """
+        if name not in self._names:
+            self._names.add(name)
+            self.added.emit([name])
+
+    def notify_removed(self, name: str) -> None:
+        """
+        Registra una factura eliminada por la propia app, sin esperar al watcher.
+        """
+        if name in self._names:
+            self._names.discard(name)
+            self.removed.emit([name])
+
+    def _on_directory_changed(self, _path: str) -> None:
+        self._debounce_timer.start()
@@ -0,0 +1,171 @@
+from array import array
+from bisect import bisect_left, bisect_right
+import re
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+# factura_%Y%m%d_%H%M%S[_sufijo].pdf
+_INVOICE_NAME_RE = re.compile(r"^factura_(\d{8})_(\d{6})")
+
+
+def parse_invoice_sort_key(name: str) -> int:
+    """
+    Retorna la fecha de una factura a partir de su nombre, como entero `YYYYMMDDHHMMSS`.
+
+    No se consulta el sistema de archivos. Los nombres que no siguen el formato
+    `factura_%Y%m%d_%H%M%S` retornan 0 y quedan al final de la lista.
+    """
+    match = _INVOICE_NAME_RE.match(name)
+    if not match:
+        return 0
+    return int(match.group(1) + match.group(2))
+
+
+class InvoiceListModel(QAbstractListModel):
+    """
+    Modelo virtualizado para la lista de facturas.
+
+    Guarda los nombres en una lista y las fechas en un `array` compacto, ambos
+    ordenados por fecha (y por nombre en caso de empate). Las filas se entregan
+    a la vista por bloques con `canFetchMore`/`fetchMore`, por lo que abrir una
+    carpeta con cientos de miles de facturas no crea un item por archivo.
+
+    Args:
+        batch_size (int): Filas que se cargan en cada `fetchMore`. Default: 500
+    """
+
+    def __init__(self, batch_size: int = 500, parent=None):
+        super().__init__(parent)
+        self._batch_size = batch_size
+        self._keys = array("q")
+        self._names = []
+        self._loaded = 0
+        self._descending = True
+
+    # 🔹 Conversión entre filas de la vista y posiciones en el almacenamiento
+    def _position(self, row: int) -> int:
+        return len(self._names) - 1 - row if self._descending else row
+
+    def _row(self, position: int) -> int:
+        return len(self._names) - 1 - position if self._descending else position
+
+    def _find_position(self, key: int, name: str) -> tuple[int, bool]:
+        lo = bisect_left(self._keys, key)
+        hi = bisect_right(self._keys, key, lo)
+        position = bisect_left(self._names, name, lo, hi)
+        found = position < hi and self._names[position] == name
+        return position, found
+
+    # 🔹 API de QAbstractListModel
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._names[self._position(index.row())]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._names)
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid():
+            return
+        count = min(self._batch_size, len(self._names) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def sort(self, column: int, order=Qt.SortOrder.DescendingOrder) -> None:
+        """
+        Ordena por la fecha del nombre de la factura. Como los datos ya están
+        ordenados, solo se invierte el sentido de lectura.
+        """
+        descending = order == Qt.SortOrder.DescendingOrder
+        if descending == self._descending:
+            return
+        self.beginResetModel()
+        self._descending = descending
+        self._loaded = min(self._batch_size, len(self._names))
+        self.endResetModel()
+
+    # 🔹 Actualización de los datos
+    def reset_names(self, names: list) -> None:
+        """
+        Reemplaza todas las facturas del modelo.
+        """
+        entries = sorted((parse_invoice_sort_key(name), name) for name in names)
+        self.beginResetModel()
+        self._keys = array("q", (key for key, _ in entries))
+        self._names = [name for _, name in entries]
+        self._loaded = min(self._batch_size, len(self._names))
+        self.endResetModel()
+
+    def add_names(self, names: list) -> None:
+        """
+        Inserta facturas en su posición según la fecha. Si caen fuera de las filas
+        ya cargadas, no se notifica a la vista hasta el próximo `fetchMore`.
+        """
+        for name in names:
+            key = parse_invoice_sort_key(name)
+            position, found = self._find_position(key, name)
+            if found:
+                continue
+            row = len(self._names) - position if self._descending else position
+            if row <= self._loaded:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._keys.insert(position, key)
+                self._names.insert(position, name)
+                self._loaded += 1
+                self.endInsertRows()
+            else:
+                self._keys.insert(position, key)
+                self._names.insert(position, name)
+
+    def remove_names(self, names: list) -> None:
+        """
+        Quita facturas del modelo.
+        """
+        for name in names:
+            position, found = self._find_position(parse_invoice_sort_key(name), name)
+            if not found:
+                continue
+            row = self._row(position)
+            if row < self._loaded:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._keys[position]
+                del self._names[position]
+                self._loaded -= 1
+                self.endRemoveRows()
+            else:
+                del self._keys[position]
+                del self._names[position]
+
+    # 🔹 Consultas
+    def total_count(self) -> int:
+        """
+        Cantidad total de facturas, incluidas las que aún no se cargaron en la vista.
+        """
+        return len(self._names)
+
+    def name_at(self, row: int) -> str:
+        return self._names[self._position(row)]
+
+    def row_of(self, name: str) -> int:
+        """
+        Retorna la fila de `name`, cargando las filas necesarias, o -1 si no existe.
+        """
+        position, found = self._find_position(parse_invoice_sort_key(name), name)
+        if not found:
+            return -1
+        row = self._row(position)
+        while row >= self._loaded and self.canFetchMore():
+            self.fetchMore()
+        return row
@@ -0,0 +1,61 @@
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QPainter, QPixmap
+from PyQt6.QtWidgets import QWidget
+
+# Intervalo mínimo entre repintados al arrastrar el slider (~60 fps)
+FRAME_INTERVAL_MS = 16
+
+
+class OpacityPixmapLabel(QWidget):
+    """
+    Label que dibuja un pixmap con opacidad variable.
+
+    Reemplaza a `QLabel` + `QGraphicsOpacityEffect`: el pixmap se pinta
+    directamente con `QPainter.setOpacity`, sin composición fuera de pantalla,
+    y los cambios de opacidad se agrupan para repintar como mucho una vez por frame.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pixmap = QPixmap()
+        self._opacity = 1.0
+        self._pending_opacity = None
+
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setInterval(FRAME_INTERVAL_MS)
+        self._frame_timer.timeout.connect(self._apply_pending_opacity)
+
+    def setPixmap(self, pixmap: QPixmap) -> None:
+        self._pixmap = pixmap
+        self.update()
+
+    def pixmap(self) -> QPixmap:
+        return self._pixmap
+
+    def opacity(self) -> float:
+        return self._opacity if self._pending_opacity is None else self._pending_opacity
+
+    def setOpacity(self, opacity: float) -> None:
+        """
+        Cambia la opacidad (0.0 - 1.0). El repintado se hace en el siguiente frame.
+        """
+        self._pending_opacity = min(max(opacity, 0.0), 1.0)
+        if not self._frame_timer.isActive():
+            self._frame_timer.start()
+
+    def _apply_pending_opacity(self) -> None:
+        if self._pending_opacity is None:
+            return
+        opacity, self._pending_opacity = self._pending_opacity, None
+        if opacity != self._opacity:
+            self._opacity = opacity
+            self.update()
+
+    def paintEvent(self, event) -> None:
+        if self._pixmap.isNull() or self._opacity <= 0:
+            return
+        painter = QPainter(self)
+        painter.setOpacity(self._opacity)
+        painter.drawPixmap(0, 0, self._pixmap)
+        painter.end()
@@ -0,0 +1,198 @@
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import os
+from PyQt6.QtCore import QSize
+from PyQt6.QtGui import QPixmap, QImage
+
+
+class PdfRasterizer:
+    """
+    Convierte páginas de PDF en `QPixmap` para el Visualizador.
+
+    Mantiene dos niveles de cache:
+    - En memoria: LRU de pixmaps limitado por bytes.
+    - En disco: PNG ya rasterizados en `cache_dir`, con clave ruta + mtime + tamaño,
+      por lo que sobreviven entre ejecuciones y se invalidan solos si el PDF cambia.
+      El nombre de cada PNG empieza con un hash de la ruta y la página, así que al
+      rasterizar una versión nueva se borran las anteriores y `discard` encuentra
+      todas las páginas de un PDF. El cache se limita a `max_disk_bytes`: al
+      superarlo se borran los PNG usados hace más tiempo (por mtime).
+
+    Args:
+        cache_dir (Path): Carpeta del cache en disco.
+        size (QSize): Tamaño final del raster (el mismo del label del Visualizador).
+        max_bytes (int): Bytes máximos de pixmaps en memoria. Default: 64 MB.
+        max_disk_bytes (int): Bytes máximos de PNG en disco. Default: 256 MB.
+    """
+
+    def __init__(self, cache_dir: Path, size: QSize, max_bytes: int = 64 * 1024 * 1024,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size = size
+        self._max_bytes = max_bytes
+        self._max_disk_bytes = max_disk_bytes
+        self._disk_bytes = None
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+
+    def _cache_key(self, pdf_path: str, page: int) -> tuple | None:
+        try:
+            stat = os.stat(pdf_path)
+        except OSError:
+            return None
+        return (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size, page,
+                self._size.width(), self._size.height())
+
+    @staticmethod
+    def _path_prefix(abs_path: str) -> str:
+        return hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:16]
+
+    def _disk_path(self, key: tuple) -> Path:
+        # <hash de la ruta>_p<página>_<hash de la clave completa>.png
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:24]
+        return self._cache_dir / f"{self._path_prefix(key[0])}_p{key[3]}_{digest}.png"
+
+    def _disk_entries(self) -> list[tuple[float, str, int]]:
+        """
+        PNG del cache en disco como `(mtime, ruta, bytes)`.
+        """
+        entries = []
+        try:
+            with os.scandir(self._cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".png") and entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.path, stat.st_size))
+        except OSError:
+            pass
+        return entries
+
+    def _store_on_disk(self, key: tuple, image: QImage) -> None:
+        disk_path = self._disk_path(key)
+        # Versiones anteriores de la misma página (el PDF cambió)
+        prefix = disk_path.name[:disk_path.name.rfind("_") + 1]
+        for old_path in self._cache_dir.glob(f"{prefix}*.png"):
+            try:
+                old_size = old_path.stat().st_size
+                old_path.unlink()
+                if self._disk_bytes is not None:
+                    self._disk_bytes -= old_size
+            except OSError:
+                pass
+
+        if not image.save(str(disk_path), "PNG"):
+            return
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+        else:
+            try:
+                self._disk_bytes += disk_path.stat().st_size
+            except OSError:
+                pass
+        if self._disk_bytes > self._max_disk_bytes:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """
+        Borra los PNG usados hace más tiempo hasta dejar el cache en 3/4 de
+        `max_disk_bytes`, para no tener que podar en cada escritura.
+        """
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, _, size in entries)
+        target = self._max_disk_bytes * 3 // 4
+        for _, path, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    @staticmethod
+    def _pixmap_bytes(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def _remember(self, key: tuple, pixmap: QPixmap) -> None:
+        cost = self._pixmap_bytes(pixmap)
+        if cost > self._max_bytes:
+            return
+        self._memory[key] = (pixmap, cost)
+        self._memory_bytes += cost
+        while self._memory_bytes > self._max_bytes:
+            _, (_, old_cost) = self._memory.popitem(last=False)
+            self._memory_bytes -= old_cost
+
+    def _render(self, pdf_path: str, page: int) -> QImage | None:
+        # QtPdf carga pdfium; se importa solo cuando hay que rasterizar algo que no está en cache
+        from PyQt6.QtPdf import QPdfDocument
+
+        document = QPdfDocument(None)
+        try:
+            if document.load(pdf_path) != QPdfDocument.Error.None_:
+                return None
+            if page >= document.pageCount():
+                return None
+            image = document.render(page, self._size)
+            return None if image.isNull() else image
+        finally:
+            document.close()
+
+    def get_pixmap(self, pdf_path: str, page: int = 0) -> QPixmap | None:
+        """
+        Retorna la página `page` de `pdf_path` rasterizada al tamaño del Visualizador.
+
+        Args:
+            pdf_path (str): Ruta del PDF.
+            page (int): `Opcional` Índice de la página. Default: 0
+
+        Returns:
+            pixmap (QPixmap | None): Pixmap de la página, o None si no se pudo leer el PDF.
+        """
+        key = self._cache_key(pdf_path, page)
+        if key is None:
+            return None
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            self._memory.move_to_end(key)
+            return cached[0]
+
+        disk_path = self._disk_path(key)
+        pixmap = QPixmap(str(disk_path)) if disk_path.exists() else QPixmap()
+        if pixmap.isNull():
+            image = self._render(pdf_path, page)
+            if image is None:
+                return None
+            self._store_on_disk(key, image)
+            pixmap = QPixmap.fromImage(image)
+        else:
+            # El mtime marca el último uso para la poda por antigüedad
+            try:
+                os.utime(disk_path)
+            except OSError:
+                pass
+
+        self._remember(key, pixmap)
+        return pixmap
+
+    def discard(self, pdf_path: str) -> None:
+        """
+        Elimina del cache (memoria y disco) los rasters de todas las páginas de `pdf_path`.
+        """
+        abs_path = os.path.abspath(pdf_path)
+        for key in [key for key in self._memory if key[0] == abs_path]:
+            _, cost = self._memory.pop(key)
+            self._memory_bytes -= cost
+
+        for disk_path in self._cache_dir.glob(f"{self._path_prefix(abs_path)}_p*.png"):
+            try:
+                size = disk_path.stat().st_size
+                disk_path.unlink()
+                if self._disk_bytes is not None:
+                    self._disk_bytes -= size
+            except OSError:
+                pass
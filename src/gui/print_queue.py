@@ -0,0 +1,225 @@
+import itertools
+import os
+import shlex
+import subprocess
+import time
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from ..utils import trace
+
+# Estados de un trabajo de impresión
+PENDING = "pendiente"
+SENDING = "enviando"
+SENT = "enviado"
+FAILED = "fallido"
+
+
+def parse_spooler_command(value) -> list[str] | None:
+    """
+    Interpreta el comando de impresión configurado en `settings.json` (`print_command`).
+
+    Puede ser una lista (`["lp", "-d", "EPSON"]`) o un texto (`"lp -d EPSON"`). Si el
+    comando incluye `{files}`, las rutas se insertan en esa posición; si no, se agregan al final.
+
+    Sin comando configurado se usa `lp` en Linux y también en macOS (CUPS), que imprime
+    directo en la impresora predeterminada. Antes, en macOS las facturas se abrían en
+    Vista Previa; para volver a eso: `"print_command": "open -a Preview {files}"`.
+
+    Args:
+        value (list | str | None): Valor configurado.
+
+    Returns:
+        command (list[str] | None): Comando a ejecutar. None en Windows sin comando
+        configurado, donde se usa la impresión nativa del sistema.
+    """
+    if isinstance(value, (list, tuple)) and value:
+        return [str(part) for part in value]
+    if isinstance(value, str) and value.strip():
+        return shlex.split(value, posix=os.name != "nt")
+    return None if os.name == "nt" else ["lp"]
+
+
+def build_spooler_args(command: list[str], files: list[str]) -> list[str]:
+    """
+    Arma los argumentos del comando de impresión para `files`.
+    """
+    if "{files}" in command:
+        index = command.index("{files}")
+        return command[:index] + list(files) + command[index + 1:]
+    return command + list(files)
+
+
+class PrintJob:
+    """
+    Un trabajo de impresión: un grupo de facturas que se envía en una sola
+    llamada al comando de impresión.
+
+    Attributes:
+        job_id (int): Número del trabajo en la cola.
+        files (list[str]): Rutas de los PDF.
+        status (str): `pendiente`, `enviando`, `enviado` o `fallido`.
+        attempts (int): Intentos realizados.
+        output (str): Salida del comando (por ejemplo, `request id is HP-42 (3 file(s))`).
+        error (str): Último error, si lo hubo.
+    """
+
+    __slots__ = ("job_id", "files", "status", "attempts", "output", "error")
+
+    def __init__(self, job_id: int, files: list[str]):
+        self.job_id = job_id
+        self.files = files
+        self.status = PENDING
+        self.attempts = 0
+        self.output = ""
+        self.error = ""
+
+    def copy(self) -> "PrintJob":
+        """
+        Copia del trabajo, para enviarla por signals sin compartir el objeto entre hilos.
+        """
+        job = PrintJob(self.job_id, list(self.files))
+        job.status = self.status
+        job.attempts = self.attempts
+        job.output = self.output
+        job.error = self.error
+        return job
+
+
+class PrintJobSignals(QObject):
+    """
+    Signals de `_SpoolRunnable`.
+
+    Signals:
+        updated (PrintJob): El trabajo cambió de estado.
+    """
+    updated = pyqtSignal(object)
+
+
+class _SpoolRunnable(QRunnable):
+    """
+    Envía un `PrintJob` al comando de impresión, con reintentos.
+    """
+
+    def __init__(self, job: PrintJob, command: list[str] | None, max_retries: int,
+                 retry_delay: float, timeout: float):
+        super().__init__()
+        self.job = job
+        self.command = command
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.signals = PrintJobSignals()
+
+    def _submit(self) -> str:
+        if self.command is None:
+            # Windows: impresión nativa, un archivo a la vez
+            for filepath in self.job.files:
+                os.startfile(filepath, "print")
+            return ""
+        completed = subprocess.run(
+            build_spooler_args(self.command, self.job.files),
+            capture_output=True, text=True, timeout=self.timeout
+        )
+        if completed.returncode != 0:
+            message = (completed.stderr or completed.stdout).strip()
+            raise RuntimeError(message or f"El comando de impresión terminó con código {completed.returncode}")
+        return completed.stdout.strip()
+
+    def run(self) -> None:
+        job = self.job
+        with trace.span("PrintQueue.job", job=job.job_id, files=len(job.files)) as job_span:
+            while True:
+                job.attempts += 1
+                job.status = SENDING
+                self.signals.updated.emit(job.copy())
+                try:
+                    job.output = self._submit()
+                    job.status = SENT
+                    job.error = ""
+                    break
+                except (OSError, ValueError) as e:
+                    # El comando no existe o no se puede ejecutar: reintentar no ayuda
+                    job.status = FAILED
+                    job.error = str(e)
+                    break
+                except (RuntimeError, subprocess.TimeoutExpired) as e:
+                    job.error = str(e)
+                    if job.attempts > self.max_retries:
+                        job.status = FAILED
+                        break
+                    time.sleep(self.retry_delay * job.attempts)
+            job_span.finish(status=job.status, attempts=job.attempts)
+        self.signals.updated.emit(job.copy())
+
+
+class PrintQueue(QObject):
+    """
+    Cola de impresión en segundo plano.
+
+    Las facturas encoladas se agrupan en trabajos de hasta `batch_size` archivos;
+    cada trabajo se envía en una sola llamada al comando de impresión (`lp` acepta
+    varios archivos por trabajo). Los trabajos se envían de uno en uno, en orden,
+    en un hilo propio, y los que fallan se reintentan hasta `max_retries` veces.
+
+    Signals:
+        job_updated (PrintJob): Un trabajo cambió de estado.
+
+    Args:
+        command (list[str] | None): Comando de impresión (ver `parse_spooler_command`).
+        batch_size (int): `Opcional` Máximo de archivos por trabajo. Default: 20
+        max_retries (int): `Opcional` Reintentos por trabajo. Default: 2
+        retry_delay (float): `Opcional` Segundos de espera antes del primer reintento;
+        crece con cada intento. Default: 1.0
+        timeout (float): `Opcional` Segundos máximos por llamada al comando. Default: 60
+    """
+    job_updated = pyqtSignal(object)
+
+    def __init__(self, command: list[str] | None, batch_size: int = 20, max_retries: int = 2,
+                 retry_delay: float = 1.0, timeout: float = 60.0, parent=None):
+        super().__init__(parent)
+        self.command = command
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self._job_ids = itertools.count(1)
+        self._jobs = {}
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def enqueue(self, files: list[str]) -> list[PrintJob]:
+        """
+        Encola `files` para imprimir.
+
+        Args:
+            files (list[str]): Rutas de los PDF, en el orden de impresión.
+
+        Returns:
+            jobs (list[PrintJob]): Trabajos creados.
+        """
+        jobs = []
+        for start in range(0, len(files), self.batch_size):
+            job = PrintJob(next(self._job_ids), list(files[start:start + self.batch_size]))
+            self._jobs[job.job_id] = job
+            jobs.append(job.copy())
+            runnable = _SpoolRunnable(job, self.command, self.max_retries, self.retry_delay, self.timeout)
+            runnable.signals.updated.connect(self._on_job_updated)
+            self._pool.start(runnable)
+        return jobs
+
+    def _on_job_updated(self, job: PrintJob) -> None:
+        if job.status in (SENT, FAILED):
+            self._jobs.pop(job.job_id, None)
+        self.job_updated.emit(job)
+
+    def pending_jobs(self) -> int:
+        """
+        Cantidad de trabajos que aún no terminaron.
+        """
+        return len(self._jobs)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """
+        Espera a que se envíen todos los trabajos encolados.
+        """
+        return self._pool.waitForDone(msecs)
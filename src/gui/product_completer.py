@@ -0,0 +1,60 @@
+from PyQt6.QtCore import Qt, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QStandardItem, QStandardItemModel
+from PyQt6.QtWidgets import QCompleter, QLineEdit
+
+# Texto que se inserta en el campo y producto de cada fila
+_VALUE_ROLE = Qt.ItemDataRole.UserRole
+_PRODUCT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class ProductCompleter(QCompleter):
+    """
+    Autocompletado de productos del catálogo para un campo `itemN-concepto`.
+
+    Como en `ClientCompleter`, el filtrado lo hace el catálogo (búsqueda por palabras
+    en SQLite) y el modelo se reemplaza en cada edición con los resultados.
+
+    Signals:
+        product_selected (Product): El usuario eligió un producto de la lista.
+
+    Args:
+        line_edit (QLineEdit): Campo al que se asocia.
+        get_catalog (callable): Retorna el `ProductCatalog`, o None si no está disponible.
+        Se llama en la primera búsqueda, para no abrir el catálogo al arrancar.
+        limit (int): `Opcional` Máximo de sugerencias. Default: 20
+    """
+    product_selected = pyqtSignal(object)
+
+    def __init__(self, line_edit: QLineEdit, get_catalog, limit: int = 20):
+        super().__init__(line_edit)
+        self._get_catalog = get_catalog
+        self._limit = limit
+        self._model = QStandardItemModel(self)
+        self.setModel(self._model)
+        self.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.setCompletionRole(_VALUE_ROLE)
+        self.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.activated[QModelIndex].connect(self._on_activated)
+        line_edit.setCompleter(self)
+        line_edit.textEdited.connect(self._on_text_edited)
+
+    def _on_text_edited(self, text: str) -> None:
+        catalog = self._get_catalog()
+        products = catalog.search(text, self._limit) if catalog is not None else []
+
+        self._model.clear()
+        for product in products:
+            item = QStandardItem(product.label())
+            item.setData(product.descripcion, _VALUE_ROLE)
+            item.setData(product, _PRODUCT_ROLE)
+            self._model.appendRow(item)
+        if products:
+            self.complete()
+        else:
+            self.popup().hide()
+
+    def _on_activated(self, index: QModelIndex) -> None:
+        product = index.data(_PRODUCT_ROLE)
+        # Solo las filas de resultados tienen producto (el catálogo se importa en el primer uso)
+        if product is not None:
+            self.product_selected.emit(product)
@@ -0,0 +1,210 @@
+import os
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+from ..invoice.layout import CompiledLayout
+from ..invoice.form import FormSnapshot
+from ..utils import trace
+
+
+class WorkerSignals(QObject):
+    """
+    Signals de los workers en segundo plano. Los `QRunnable` no pueden emitir
+    signals por si mismos, por lo que cada worker tiene una instancia de esta clase.
+
+    Signals:
+        progress (int, int): Paso actual y total de pasos.
+        finished (str): Ruta del archivo generado.
+        failed (str): Mensaje de error.
+        empty (): La factura no tenía ningún campo rellenado.
+        cancelled (): El trabajo fue cancelado antes de escribir el archivo.
+        warning (str): Error no fatal (por ejemplo, al registrar la factura en la base de datos).
+        optimized (str): Resumen de la optimización del PDF (tamaño antes/después y tiempo).
+        loaded (object): Resultado de una carga en segundo plano (por ejemplo, `ClientDirectory`).
+    """
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    empty = pyqtSignal()
+    cancelled = pyqtSignal()
+    warning = pyqtSignal(str)
+    optimized = pyqtSignal(str)
+    loaded = pyqtSignal(object)
+
+
+class GenerateInvoiceWorker(QRunnable):
+    """
+    Genera el PDF de una factura fuera del hilo del GUI.
+
+    Recibe una copia de los valores de los campos, por lo que nunca toca widgets.
+    La cancelación es cooperativa: se revisa entre cada paso y, si se cancela
+    antes de guardar, no se escribe ningún archivo.
+
+    El PDF se escribe en un temporal de `output_dir` y se publica al final sin
+    sobrescribir nunca una factura existente (ver `publish_invoice`). Sin `filename`,
+    el número de factura se reserva con `allocator` recién al publicar, por lo que una
+    factura vacía, cancelada o fallida no consume número. `finished` emite la ruta final.
+
+    Args:
+        output_dir (str): Carpeta donde se guarda el PDF.
+        fields (FormSnapshot | dict): Copia inmutable del formulario (`InvoiceForm.snapshot`), o
+        valores de la factura con las claves de `inputs_geometry.json`. La copia se convierte en
+        el hilo de trabajo.
+        layout (CompiledLayout): Layout compilado de la factura.
+        store (InvoiceStore): `Opcional` Base de datos donde registrar la factura generada.
+        optimize (bool): `Opcional` Optimizar el PDF con pikepdf después de escribirlo. Default: False
+        linearize (bool): `Opcional` Linealizar el PDF al optimizarlo. Default: False
+        allocator (InvoiceNumberAllocator): `Opcional` Contador de facturas para numerar el PDF,
+        o para elegir otro número si `filename` ya existe.
+        filename (str): `Opcional` Nombre fijo del PDF. Sin él se requiere `allocator`.
+    """
+
+    STEPS = 4
+
+    def __init__(self, output_dir: str, fields: FormSnapshot | dict, layout: CompiledLayout, store=None,
+                 optimize: bool = False, linearize: bool = False, allocator=None, filename: str = None):
+        super().__init__()
+        if filename is None and allocator is None:
+            raise ValueError("Se requiere un nombre de archivo o un contador de facturas.")
+        self.output_dir = output_dir
+        self.fields = fields
+        self.layout = layout
+        self.store = store
+        self.optimize = optimize
+        self.linearize = linearize
+        self.allocator = allocator
+        self.filename = filename
+        self.signals = WorkerSignals()
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def _publish(self, tmp_path: str) -> str:
+        from ..invoice.numbering import publish_invoice, publish_numbered_invoice
+
+        if self.filename is not None:
+            return publish_invoice(tmp_path, os.path.join(self.output_dir, self.filename), self.allocator)
+        try:
+            return publish_numbered_invoice(tmp_path, self.output_dir, self.allocator)
+        except (OSError, TimeoutError) as e:
+            raise RuntimeError(f"No se pudo asignar un número a la factura: {e}") from e
+
+    def run(self) -> None:
+        # reportlab se importa en el primer uso para no retrasar el arranque del GUI
+        from reportlab.pdfgen import canvas
+        from ..invoice.renderer import EmptyInvoiceError, plan_invoice_pages, draw_invoice_pages
+        from ..invoice.numbering import temp_path_for
+
+        fields = self.fields.to_fields() if isinstance(self.fields, FormSnapshot) else self.fields
+        tmp_path = temp_path_for(self.output_dir)
+        optimize_result = None
+        optimize_error = None
+        try:
+            with trace.span("GenerateInvoiceWorker.plan"):
+                plans = plan_invoice_pages(fields, self.layout)
+            self.signals.progress.emit(1, self.STEPS)
+            if self._cancelled:
+                self.signals.cancelled.emit()
+                return
+
+            with trace.span("GenerateInvoiceWorker.draw"):
+                c = canvas.Canvas(tmp_path, pagesize=(self.layout.width_pt, self.layout.height_pt))
+                draw_invoice_pages(c, plans)
+            self.signals.progress.emit(2, self.STEPS)
+            if self._cancelled:
+                self.signals.cancelled.emit()
+                return
+
+            with trace.span("GenerateInvoiceWorker.save"):
+                c.save()
+            self.signals.progress.emit(3, self.STEPS)
+
+            if self.optimize:
+                # Si la optimización falla, la factura queda tal como la escribió reportlab
+                try:
+                    from ..invoice.optimize import optimize_pdf
+                    with trace.span("GenerateInvoiceWorker.optimize") as optimize_span:
+                        optimize_result = optimize_pdf(tmp_path, linearize=self.linearize)
+                        optimize_span.finish(before=optimize_result.size_before, after=optimize_result.size_after)
+                except Exception as e:
+                    optimize_error = e
+
+            with trace.span("GenerateInvoiceWorker.publish"):
+                filepath = self._publish(tmp_path)
+            self.signals.progress.emit(4, self.STEPS)
+        except EmptyInvoiceError:
+            self.signals.empty.emit()
+            return
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        if optimize_result is not None:
+            self.signals.optimized.emit(f"PDF optimizado {filepath}: {optimize_result.summary()}")
+        if optimize_error is not None:
+            self.signals.warning.emit(f"No se pudo optimizar la factura {filepath}: {optimize_error}")
+        if self.store is not None:
+            try:
+                with trace.span("GenerateInvoiceWorker.record"):
+                    self.store.record_invoice(filepath, fields)
+            except Exception as e:
+                self.signals.warning.emit(f"No se pudo registrar la factura {filepath} en la base de datos: {e}")
+        self.signals.finished.emit(filepath)
+
+
+class CompactArchiveWorker(QRunnable):
+    """
+    Archiva las facturas antiguas de `prints_path` en PDF mensuales
+    (ver `compact_invoices`), fuera del hilo del GUI.
+
+    Args:
+        prints_path (str): Carpeta de facturas.
+        older_than_days (int): Antigüedad mínima, en días, para archivar una factura.
+    """
+
+    def __init__(self, prints_path: str, older_than_days: int):
+        super().__init__()
+        self.prints_path = prints_path
+        self.older_than_days = older_than_days
+        self.signals = WorkerSignals()
+
+    def run(self) -> None:
+        from ..invoice.archive import compact_invoices
+
+        try:
+            with trace.span("CompactArchiveWorker.run"):
+                result = compact_invoices(self.prints_path, self.older_than_days)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        for filename, error in result.failures:
+            self.signals.warning.emit(f"No se pudo archivar la factura {filename}: {error}")
+        self.signals.finished.emit(result.summary())
+
+
+class LoadClientsWorker(QRunnable):
+    """
+    Construye el directorio de clientes (ver `ClientDirectory`) con las facturas
+    registradas en la base de datos, fuera del hilo del GUI.
+
+    Args:
+        store (InvoiceStore): Base de datos de facturas.
+    """
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.signals = WorkerSignals()
+
+    def run(self) -> None:
+        from ..invoice.clients import ClientDirectory
+
+        try:
+            with trace.span("LoadClientsWorker.run"):
+                directory = ClientDirectory.from_store(self.store)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.loaded.emit(directory)
@@ -0,0 +1,302 @@
+from datetime import datetime, timedelta
+import json
+import os
+import re
+import sys
+import time
+from .numbering import try_lock_file, unlock_file
+
+# Subcarpeta de `prints_path` donde se guardan los archivos mensuales y el índice
+ARCHIVE_DIR_NAME = "archivo"
+ARCHIVE_INDEX_NAME = "indice.json"
+# Lock (en `prints_path`) que impide que dos instancias compacten la misma carpeta a la vez
+COMPACTION_LOCK_NAME = ".compactacion.lock"
+
+# factura_%Y%m%d_%H%M%S[_sufijo].pdf
+_INVOICE_NAME_RE = re.compile(r"^factura_(\d{8})_(\d{6})")
+
+
+class ArchivedInvoice:
+    """
+    Ubicación de una factura dentro de un archivo mensual.
+
+    Attributes:
+        filename (str): Nombre original de la factura.
+        archive_path (str): Ruta del PDF mensual.
+        page (int): Índice (desde 0) de la primera página de la factura.
+        pages (int): Cantidad de páginas de la factura.
+    """
+
+    __slots__ = ("filename", "archive_path", "page", "pages")
+
+    def __init__(self, filename: str, archive_path: str, page: int, pages: int):
+        self.filename = filename
+        self.archive_path = archive_path
+        self.page = page
+        self.pages = pages
+
+
+class ArchiveIndex:
+    """
+    Índice de las facturas archivadas de `prints_path`: nombre original ->
+    (archivo mensual, página). Se guarda como JSON en la carpeta de archivos y
+    solo se vuelve a leer cuando el archivo cambia.
+
+    Args:
+        prints_path (str): Carpeta de facturas.
+    """
+
+    def __init__(self, prints_path: str):
+        self.prints_path = prints_path
+        self.archive_dir = os.path.join(prints_path, ARCHIVE_DIR_NAME)
+        self.index_path = os.path.join(self.archive_dir, ARCHIVE_INDEX_NAME)
+        self._entries = {}
+        self._stat = None
+
+    def _load(self) -> dict:
+        try:
+            stat = os.stat(self.index_path)
+        except OSError:
+            self._entries = {}
+            self._stat = None
+            return self._entries
+        if self._stat != (stat.st_mtime_ns, stat.st_size):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+            self._stat = (stat.st_mtime_ns, stat.st_size)
+        return self._entries
+
+    def entries(self) -> dict:
+        """
+        Copia del índice: nombre original -> `[archivo mensual, página, páginas]`.
+        """
+        return dict(self._load())
+
+    def names(self) -> list[str]:
+        """
+        Nombres originales de las facturas archivadas.
+        """
+        return list(self._load())
+
+    def lookup(self, filename: str) -> ArchivedInvoice | None:
+        """
+        Retorna la ubicación de la factura `filename`, o None si no está archivada.
+        """
+        entry = self._load().get(filename)
+        if entry is None:
+            return None
+        archive_name, page, pages = entry
+        return ArchivedInvoice(filename, os.path.join(self.archive_dir, archive_name), page, pages)
+
+    def save(self, entries: dict) -> None:
+        """
+        Reemplaza el índice con `entries` (escritura atómica).
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+        self._entries = entries
+        stat = os.stat(self.index_path)
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+
+
+class CompactionResult:
+    """
+    Resultado de `compact_invoices`.
+
+    Attributes:
+        archived (int): Facturas movidas a archivos mensuales.
+        archives (list[str]): Archivos mensuales creados o actualizados.
+        failures (list[tuple[str, str]]): Pares (factura, mensaje de error).
+        bytes_before (int): Tamaño total de las facturas archivadas.
+        elapsed (float): Segundos totales.
+        skipped (bool): True si no se compactó porque otra instancia lo estaba haciendo.
+    """
+
+    def __init__(self):
+        self.archived = 0
+        self.archives = []
+        self.failures = []
+        self.bytes_before = 0
+        self.elapsed = 0.0
+        self.skipped = False
+
+    def summary(self) -> str:
+        if self.skipped:
+            return "Otra instancia está archivando las facturas de esta carpeta; se omitió el archivado."
+        return (
+            f"{self.archived} facturas archivadas en {len(self.archives)} archivos mensuales "
+            f"({self.bytes_before} bytes originales), {len(self.failures)} fallidas, en {self.elapsed:.2f}s"
+        )
+
+
+def get_invoice_datetime(prints_path: str, filename: str) -> datetime:
+    """
+    Fecha de una factura: la del nombre (`factura_%Y%m%d_%H%M%S`) o, si el nombre
+    no sigue ese formato, la fecha de modificación del archivo.
+    """
+    match = _INVOICE_NAME_RE.match(filename)
+    if match:
+        try:
+            return datetime.strptime(match.group(1) + match.group(2), "%Y%m%d%H%M%S")
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(os.path.getmtime(os.path.join(prints_path, filename)))
+
+
+def compact_invoices(prints_path: str, older_than_days: int, now: datetime = None) -> CompactionResult:
+    """
+    Une las facturas de `prints_path` con más de `older_than_days` días en un PDF
+    por mes (`archivo/facturas_AAAA_MM.pdf`) y borra los archivos individuales.
+
+    Por cada mes, el PDF mensual se escribe en un temporal y se reemplaza de forma
+    atómica; luego se actualiza el índice y recién entonces se borran los originales.
+    Si el proceso se interrumpe, no se pierde ninguna factura.
+
+    Todo el proceso se hace con un lock del sistema operativo sobre `COMPACTION_LOCK_NAME`
+    (ver `try_lock_file`): si otra instancia de la app o de la consola ya está compactando
+    la misma carpeta, no se espera y se retorna un resultado con `skipped`.
+
+    Args:
+        prints_path (str): Carpeta de facturas.
+        older_than_days (int): Antigüedad mínima, en días, para archivar una factura.
+        now (datetime): `Opcional` Fecha de referencia. Default: ahora.
+
+    Returns:
+        result (CompactionResult): Facturas archivadas, archivos mensuales y fallos.
+    """
+    result = CompactionResult()
+    fd = os.open(os.path.join(prints_path, COMPACTION_LOCK_NAME), os.O_CREAT | os.O_RDWR)
+    if not try_lock_file(fd):
+        os.close(fd)
+        result.skipped = True
+        return result
+    try:
+        _compact_locked(prints_path, older_than_days, now, result)
+    finally:
+        unlock_file(fd)
+    return result
+
+
+def _compact_locked(prints_path: str, older_than_days: int, now: datetime, result: CompactionResult) -> None:
+    # pikepdf solo se carga al compactar o extraer, no al listar facturas archivadas
+    import pikepdf
+    from .optimize import dedup_resources, save_optimized
+
+    start = time.perf_counter()
+    index = ArchiveIndex(prints_path)
+    entries = index.entries()
+    cutoff = (now or datetime.now()) - timedelta(days=older_than_days)
+
+    by_month = {}
+    with os.scandir(prints_path) as dir_entries:
+        for entry in dir_entries:
+            if not entry.name.lower().endswith(".pdf") or not entry.is_file():
+                continue
+            created = get_invoice_datetime(prints_path, entry.name)
+            if created < cutoff:
+                by_month.setdefault((created.year, created.month), []).append((created, entry.name))
+
+    for (year, month), invoices in sorted(by_month.items()):
+        invoices.sort()
+        archive_name = f"facturas_{year:04d}_{month:02d}.pdf"
+        archive_path = os.path.join(index.archive_dir, archive_name)
+        os.makedirs(index.archive_dir, exist_ok=True)
+
+        archived_now = []
+        sources = []
+        try:
+            archive = pikepdf.open(archive_path) if os.path.exists(archive_path) else pikepdf.new()
+            try:
+                for _, filename in invoices:
+                    if filename in entries:
+                        # Ya está en el índice: quedó sin borrar en una compactación interrumpida
+                        archived_now.append(filename)
+                        continue
+                    filepath = os.path.join(prints_path, filename)
+                    try:
+                        source = pikepdf.open(filepath)
+                    except Exception as e:
+                        result.failures.append((filename, str(e)))
+                        continue
+                    sources.append(source)
+                    first_page = len(archive.pages)
+                    archive.pages.extend(source.pages)
+                    entries[filename] = [archive_name, first_page, len(source.pages)]
+                    result.bytes_before += os.path.getsize(filepath)
+                    archived_now.append(filename)
+
+                dedup_resources(archive)
+                save_optimized(archive, f"{archive_path}.tmp")
+            finally:
+                archive.close()
+                for source in sources:
+                    source.close()
+            os.replace(f"{archive_path}.tmp", archive_path)
+        except Exception as e:
+            result.failures.extend((filename, str(e)) for _, filename in invoices)
+            entries = index.entries()
+            continue
+
+        index.save(entries)
+        for filename in archived_now:
+            try:
+                os.remove(os.path.join(prints_path, filename))
+            except OSError as e:
+                result.failures.append((filename, str(e)))
+        result.archived += len(archived_now)
+        result.archives.append(archive_path)
+
+    result.elapsed = time.perf_counter() - start
+
+
+def extract_archived_invoice(archived: ArchivedInvoice, output_path: str) -> str:
+    """
+    Escribe la factura archivada como un PDF independiente (solo sus páginas).
+
+    Args:
+        archived (ArchivedInvoice): Ubicación de la factura (ver `ArchiveIndex.lookup`).
+        output_path (str): Ruta del PDF a escribir.
+
+    Returns:
+        output_path (str): Ruta del PDF escrito.
+
+    Raises:
+        pikepdf.PdfError: Si el archivo mensual no se puede leer.
+        OSError: Si no se puede escribir el resultado.
+    """
+    import pikepdf
+    from .optimize import save_optimized
+
+    with pikepdf.open(archived.archive_path) as archive, pikepdf.new() as single:
+        single.pages.extend(archive.pages[archived.page:archived.page + archived.pages])
+        save_optimized(single, output_path)
+    return output_path
+
+
+def main(argv: list[str]) -> int:
+    """
+    Punto de entrada por consola:
+        python -m src.invoice.archive carpeta_facturas [--dias 90]
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m src.invoice.archive", description="Archiva las facturas antiguas en un PDF por mes.")
+    parser.add_argument("carpeta_facturas", help="Carpeta de facturas (prints_path).")
+    parser.add_argument("--dias", type=int, default=90, help="Archivar las facturas con más de estos días. Default: 90")
+    args = parser.parse_args(argv)
+
+    result = compact_invoices(args.carpeta_facturas, args.dias)
+    print(result.summary())
+    for filename, error in result.failures:
+        print(f"  {filename}: {error}")
+    return 0 if not result.failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
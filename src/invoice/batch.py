@@ -0,0 +1,322 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import argparse
+import json
+import os
+import sys
+import time
+from .renderer import render_invoice, render_print_run
+from .layout import get_layout
+from .totals import TotalsGraph
+from .numbering import InvoiceNumberAllocator, counter_path_for, publish_invoice, publish_numbered_invoice, temp_path_for
+
+
+class BatchResult:
+    """
+    Resultado de una generación de facturas por lotes.
+
+    Attributes:
+        generated (list[str]): Rutas de los PDF generados correctamente.
+        failures (list[tuple[int, str]]): Pares (índice de la factura, mensaje de error).
+        warnings (list[str]): Problemas que no impidieron generar las facturas (por ejemplo,
+            un PDF que no se pudo optimizar y quedó sin optimizar).
+        elapsed (float): Segundos totales de la generación.
+        print_run_path (str | None): Ruta del PDF del tiraje, si se generó en modo tiraje.
+        pages (int): Páginas escritas en el tiraje (más de una por factura si tiene páginas de continuación).
+        print_run_invoices (int): Facturas incluidas en el tiraje.
+        bytes_before (int): Tamaño total de los PDF antes de optimizarlos.
+        bytes_after (int): Tamaño total de los PDF optimizados.
+        optimize_elapsed (float): Segundos usados en optimizar (sumados entre procesos).
+    """
+
+    def __init__(self):
+        self.generated = []
+        self.failures = []
+        self.warnings = []
+        self.elapsed = 0.0
+        self.print_run_path = None
+        self.pages = 0
+        self.print_run_invoices = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.optimize_elapsed = 0.0
+
+    def add_optimization(self, optimize_result) -> None:
+        self.bytes_before += optimize_result.size_before
+        self.bytes_after += optimize_result.size_after
+        self.optimize_elapsed += optimize_result.elapsed
+
+    @property
+    def rendered(self) -> int:
+        """
+        Cantidad de facturas renderizadas correctamente.
+        """
+        return self.print_run_invoices if self.print_run_path else len(self.generated)
+
+    @property
+    def throughput(self) -> float:
+        """
+        Facturas generadas por segundo.
+        """
+        if self.elapsed <= 0:
+            return 0.0
+        return self.rendered / self.elapsed
+
+    def summary(self) -> str:
+        text = (
+            f"{self.rendered} facturas generadas, {len(self.failures)} fallidas "
+            f"en {self.elapsed:.2f}s ({self.throughput:.1f} facturas/s)"
+        )
+        if self.print_run_path:
+            text += f"\nTiraje: {self.print_run_path} ({self.pages} páginas)"
+        if self.bytes_before:
+            text += (
+                f"\nOptimización: {self.bytes_before} -> {self.bytes_after} bytes "
+                f"({(1 - self.bytes_after / self.bytes_before) * 100:.0f}% menos) "
+                f"en {self.optimize_elapsed:.2f}s"
+            )
+        return text
+
+
+# Layout y contador compilados una sola vez por proceso trabajador
+_worker_layout = None
+_worker_allocator = None
+
+
+def _init_worker(geometry_path: str, invoice_width: int, invoice_height: int, counter_path: str = None) -> None:
+    global _worker_layout, _worker_allocator
+    _worker_layout = get_layout(geometry_path, invoice_width, invoice_height)
+    _worker_allocator = InvoiceNumberAllocator(counter_path) if counter_path else None
+
+
+def _render_job(index: int, output_dir: str, filename: str, fields: dict, optimize: bool = False,
+                linearize: bool = False) -> tuple[int, str, object, str]:
+    # Se escribe en un temporal y se publica sin sobrescribir una factura existente
+    tmp_path = temp_path_for(output_dir)
+    try:
+        render_invoice(tmp_path, fields, _worker_layout)
+        optimize_result = None
+        warning = None
+        if optimize:
+            # Si la optimización falla, el temporal queda intacto y se publica sin optimizar
+            try:
+                from .optimize import optimize_pdf
+                optimize_result = optimize_pdf(tmp_path, linearize=linearize)
+            except Exception as e:
+                warning = f"No se pudo optimizar la factura #{index}: {e}"
+        if filename is None:
+            # El número se reserva con el PDF ya escrito: una factura fallida no deja huecos
+            filepath = publish_numbered_invoice(tmp_path, output_dir, _worker_allocator)
+        else:
+            filepath = publish_invoice(tmp_path, os.path.join(output_dir, filename), _worker_allocator)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return index, filepath, optimize_result, warning
+
+
+def build_batch_filenames(count: int) -> list[str]:
+    """
+    Genera nombres de archivo para un lote sin contador: `factura_<timestamp>.pdf` mas
+    un sufijo secuencial para evitar colisiones dentro del lote.
+
+    Con contador no se generan nombres por adelantado: cada factura se numera al
+    publicarse (ver `publish_numbered_invoice`).
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return [f"factura_{timestamp}_{i + 1:05d}.pdf" for i in range(count)]
+
+
+def render_batch(invoices: list[dict], output_dir: str, geometry_path: str, invoice_width: int,
+                 invoice_height: int, max_workers: int = None, filenames: list[str] = None,
+                 optimize: bool = False, linearize: bool = False, counter_path: str = None) -> BatchResult:
+    """
+    Genera varias facturas en paralelo usando un `ProcessPoolExecutor`.
+
+    Cada PDF se escribe en un temporal y se publica sin sobrescribir nunca un archivo
+    existente (ver `publish_invoice`), por lo que en `result.generated` puede aparecer
+    un nombre distinto al pedido.
+
+    Args:
+        invoices (list[dict]): Valores de cada factura, con las claves de `inputs_geometry.json`.
+        output_dir (str): Carpeta donde se guardan los PDF.
+        geometry_path (str): Ruta de `inputs_geometry.json`.
+        invoice_width (int): Ancho de la plantilla en el editor.
+        invoice_height (int): Alto de la plantilla en el editor.
+        max_workers (int): `Opcional` Cantidad de procesos. Por defecto usa `os.cpu_count()`.
+        filenames (list[str]): `Opcional` Nombres de archivo para cada factura.
+        optimize (bool): `Opcional` Optimizar cada PDF con pikepdf (ver `optimize_pdf`). Default: False
+        linearize (bool): `Opcional` Linealizar los PDF optimizados. Default: False
+        counter_path (str): `Opcional` Contador de facturas (ver `InvoiceNumberAllocator`)
+            para numerar el lote y resolver colisiones de nombres. Sin `filenames`, cada
+            factura recibe su número al publicarse, en el orden en que terminan los procesos,
+            y las facturas que fallan no consumen número.
+
+    Returns:
+        result (BatchResult): Archivos generados, fallos por factura y rendimiento.
+    """
+    if filenames is None:
+        # Con contador, cada proceso numera sus facturas al publicarlas
+        filenames = [None] * len(invoices) if counter_path else build_batch_filenames(len(invoices))
+    if len(filenames) != len(invoices):
+        raise ValueError("La cantidad de nombres de archivo no coincide con la cantidad de facturas.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    result = BatchResult()
+    start = time.perf_counter()
+    generated = {}
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(geometry_path, invoice_width, invoice_height, counter_path),
+    ) as executor:
+        futures = {
+            executor.submit(_render_job, index, output_dir, filename, fields, optimize, linearize): index
+            for index, (filename, fields) in enumerate(zip(filenames, invoices))
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                _, filepath, optimize_result, warning = future.result()
+                generated[index] = filepath
+                if optimize_result is not None:
+                    result.add_optimization(optimize_result)
+                if warning is not None:
+                    result.warnings.append(warning)
+            except Exception as e:
+                result.failures.append((index, str(e)))
+
+    result.elapsed = time.perf_counter() - start
+    result.generated = [generated[i] for i in sorted(generated)]
+    result.failures.sort()
+    return result
+
+
+def generate_print_run(invoices: list[dict], filepath: str, geometry_path: str, invoice_width: int,
+                       invoice_height: int, individual_dir: str = None, filenames: list[str] = None,
+                       optimize: bool = False, linearize: bool = False, counter_path: str = None) -> BatchResult:
+    """
+    Genera un tiraje de impresión: todas las facturas como páginas de un único PDF.
+
+    Args:
+        invoices (list[dict]): Valores de cada factura, con las claves de `inputs_geometry.json`.
+        filepath (str): Ruta del PDF del tiraje.
+        geometry_path (str): Ruta de `inputs_geometry.json`.
+        invoice_width (int): Ancho de la plantilla en el editor.
+        invoice_height (int): Alto de la plantilla en el editor.
+        individual_dir (str): `Opcional` Carpeta donde escribir también cada factura
+            por separado, en la misma pasada.
+        filenames (list[str]): `Opcional` Nombres de los archivos individuales.
+        optimize (bool): `Opcional` Optimizar el tiraje y los archivos individuales con pikepdf. Default: False
+        linearize (bool): `Opcional` Linealizar los PDF optimizados. Default: False
+        counter_path (str): `Opcional` Contador de facturas para numerar los archivos individuales
+            (solo las facturas que se generan bien) y elegir otro número si un nombre ya existe.
+
+    Returns:
+        result (BatchResult): Tiraje generado, archivos individuales y fallos por factura.
+    """
+    layout = get_layout(geometry_path, invoice_width, invoice_height)
+    individual_paths = None
+    allocator = InvoiceNumberAllocator(counter_path) if counter_path else None
+    if individual_dir is not None and (filenames is not None or allocator is None):
+        if filenames is None:
+            filenames = build_batch_filenames(len(invoices))
+        individual_paths = [os.path.join(individual_dir, filename) for filename in filenames]
+
+    result = BatchResult()
+    start = time.perf_counter()
+    try:
+        run = render_print_run(
+            filepath, invoices, layout, individual_paths, allocator,
+            individual_dir=individual_dir if individual_paths is None else None
+        )
+        result.pages = run.pages
+        result.failures = run.failures
+        result.print_run_path = filepath
+        result.print_run_invoices = run.drawn
+        result.generated = [path for path in run.published if path is not None]
+    except Exception as e:
+        result.failures = [(index, str(e)) for index in range(len(invoices))]
+    if optimize:
+        from .optimize import optimize_pdf
+        for path in ([result.print_run_path] if result.print_run_path else []) + result.generated:
+            try:
+                result.add_optimization(optimize_pdf(path, linearize=linearize))
+            except Exception as e:
+                result.warnings.append(f"No se pudo optimizar {path}: {e}")
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def main(argv: list[str]) -> int:
+    """
+    Punto de entrada por consola:
+        python -m src.invoice.batch facturas.json carpeta_salida [-p procesos]
+        python -m src.invoice.batch facturas.json carpeta_salida --tiraje tiraje.pdf [--individuales]
+        python -m src.invoice.batch facturas.json carpeta_salida --calcular-totales
+
+    `facturas.json` debe contener una lista de diccionarios con los valores de cada factura.
+    Una factura puede traer sus productos en `items` (lista de `cantidad`, `concepto`, `pu`
+    y `total`) o en claves `itemN-<columna>`; si no caben en las filas de la plantilla se
+    agregan páginas de continuación.
+    Los nombres se numeran con el contador de `carpeta_salida`, el mismo que usa la app
+    cuando guarda sus facturas en esa carpeta.
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.invoice.batch", description="Generación de facturas por lotes.")
+    parser.add_argument("facturas", help="JSON con la lista de facturas.")
+    parser.add_argument("carpeta_salida", help="Carpeta donde se guardan los PDF.")
+    parser.add_argument("-p", "--procesos", type=int, default=None, help="Cantidad de procesos.")
+    parser.add_argument("--tiraje", default=None, help="Nombre del PDF único con todas las facturas como páginas.")
+    parser.add_argument("--individuales", action="store_true", help="En modo tiraje, escribir también cada factura por separado.")
+    parser.add_argument("--optimizar", action="store_true", help="Optimizar los PDF con pikepdf (streams comprimidos y de objetos).")
+    parser.add_argument("--linealizar", action="store_true", help="Con --optimizar, linealizar los PDF.")
+    parser.add_argument("--calcular-totales", action="store_true", help="Completar los totales vacíos a partir de cantidades y precios.")
+    args = parser.parse_args(argv)
+
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    with open(os.path.join(base_dir, "json", "gui_config.json"), "r", encoding="utf-8") as f:
+        gui_data = json.load(f)
+    with open(args.facturas, "r", encoding="utf-8") as f:
+        invoices = json.load(f)
+
+    geometry_path = os.path.join(base_dir, "json", "inputs_geometry.json")
+    os.makedirs(args.carpeta_salida, exist_ok=True)
+    counter_path = counter_path_for(args.carpeta_salida)
+    if args.calcular_totales:
+        layout = get_layout(geometry_path, gui_data.get("invoice_width"), gui_data.get("invoice_height"))
+        invoices = TotalsGraph(layout.by_key).compute_many(invoices)
+    if args.tiraje:
+        result = generate_print_run(
+            invoices,
+            os.path.join(args.carpeta_salida, args.tiraje),
+            geometry_path,
+            gui_data.get("invoice_width"),
+            gui_data.get("invoice_height"),
+            individual_dir=args.carpeta_salida if args.individuales else None,
+            optimize=args.optimizar,
+            linearize=args.linealizar,
+            counter_path=counter_path,
+        )
+    else:
+        result = render_batch(
+            invoices,
+            args.carpeta_salida,
+            geometry_path,
+            gui_data.get("invoice_width"),
+            gui_data.get("invoice_height"),
+            max_workers=args.procesos,
+            optimize=args.optimizar,
+            linearize=args.linealizar,
+            counter_path=counter_path,
+        )
+    print(result.summary())
+    for index, error in result.failures:
+        print(f"  Factura #{index}: {error}")
+    for warning in result.warnings:
+        print(f"  Aviso: {warning}")
+    return 0 if not result.failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,219 @@
+import argparse
+import csv
+import sqlite3
+import sys
+import threading
+import unicodedata
+from decimal import Decimal
+from .totals import parse_amount
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    sku TEXT NOT NULL UNIQUE,
+    descripcion TEXT NOT NULL,
+    precio TEXT
+);
+CREATE TABLE IF NOT EXISTS product_tokens (
+    token TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    PRIMARY KEY (token, product_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_product_tokens_product ON product_tokens (product_id);
+"""
+
+# Nombre del catálogo dentro de la carpeta de configuración
+CATALOG_FILENAME = "catalogo.db"
+
+# Nombres de columna aceptados en el CSV
+_SKU_COLUMNS = ("sku", "codigo", "código", "code")
+_DESCRIPTION_COLUMNS = ("descripcion", "descripción", "concepto", "producto", "nombre")
+_PRICE_COLUMNS = ("precio", "pu", "precio_unitario", "price")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Palabras normalizadas de `text`: minúsculas, sin acentos ni signos.
+    `"Cemento Gris 42,5kg"` -> `["cemento", "gris", "42", "5kg"]`
+    """
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii").casefold()
+    return "".join(char if char.isalnum() else " " for char in text).split()
+
+
+class Product:
+    """
+    Producto del catálogo.
+    """
+
+    __slots__ = ("sku", "descripcion", "precio")
+
+    def __init__(self, sku: str, descripcion: str, precio: Decimal | None):
+        self.sku = sku
+        self.descripcion = descripcion
+        self.precio = precio
+
+    def label(self) -> str:
+        return f"{self.descripcion}  [{self.sku}]"
+
+
+class ProductCatalog:
+    """
+    Catálogo de productos en SQLite, con búsqueda por palabras.
+
+    Cada palabra de la descripción (y el código) se guarda en un índice
+    `product_tokens`; una búsqueda es una consulta por rango sobre ese índice,
+    por lo que un catálogo de decenas de miles de productos no se carga en
+    memoria ni retrasa el arranque.
+
+    Args:
+        db_path (str): Ruta del archivo de la base de datos.
+    """
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def upsert_products(self, products) -> int:
+        """
+        Agrega o actualiza productos (por `sku`) en una sola transacción.
+
+        Args:
+            products (Iterable[Product]): Productos a guardar.
+
+        Returns:
+            count (int): Productos guardados.
+        """
+        count = 0
+        with self._lock, self._conn:
+            for product in products:
+                precio = str(product.precio) if product.precio is not None else None
+                self._conn.execute(
+                    "INSERT INTO products (sku, descripcion, precio) VALUES (?, ?, ?) "
+                    "ON CONFLICT(sku) DO UPDATE SET descripcion = excluded.descripcion, precio = excluded.precio",
+                    (product.sku, product.descripcion, precio)
+                )
+                product_id = self._conn.execute(
+                    "SELECT id FROM products WHERE sku = ?", (product.sku,)
+                ).fetchone()[0]
+                self._conn.execute("DELETE FROM product_tokens WHERE product_id = ?", (product_id,))
+                tokens = set(tokenize(product.descripcion)) | set(tokenize(product.sku))
+                self._conn.executemany(
+                    "INSERT INTO product_tokens (token, product_id) VALUES (?, ?)",
+                    ((token, product_id) for token in tokens)
+                )
+                count += 1
+        return count
+
+    def import_csv(self, csv_path: str) -> int:
+        """
+        Importa productos de un CSV con encabezados. El separador (`,` o `;`) se detecta solo.
+
+        Columnas reconocidas: código (`sku`/`codigo`), descripción (`descripcion`/`concepto`/
+        `producto`) y precio (`precio`/`pu`). Sin columna de código se usa la descripción.
+
+        Returns:
+            count (int): Productos importados.
+
+        Raises:
+            ValueError: Si el CSV no tiene columna de descripción.
+        """
+        with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            reader = csv.DictReader(f, dialect=dialect)
+            columns = {name.strip().casefold(): name for name in reader.fieldnames or []}
+
+            def column(options):
+                return next((columns[option] for option in options if option in columns), None)
+
+            sku_column = column(_SKU_COLUMNS)
+            description_column = column(_DESCRIPTION_COLUMNS)
+            price_column = column(_PRICE_COLUMNS)
+            if description_column is None:
+                raise ValueError("El CSV debe tener una columna de descripción (descripcion, concepto o producto).")
+
+            def products():
+                for row in reader:
+                    descripcion = (row.get(description_column) or "").strip()
+                    if not descripcion:
+                        continue
+                    sku = (row.get(sku_column) or "").strip() if sku_column else ""
+                    precio = parse_amount(row.get(price_column)) if price_column else None
+                    yield Product(sku or descripcion, descripcion, precio)
+
+            return self.upsert_products(products())
+
+    def search(self, text: str, limit: int = 20) -> list[Product]:
+        """
+        Productos que contienen palabras que empiezan por cada palabra de `text`.
+        `"cem gr"` encuentra "Cemento Gris 42,5kg".
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        # Se recorre el índice desde la palabra más larga (la más selectiva) y las
+        # demás se comprueban por producto, con el índice por `product_id`
+        tokens.sort(key=len, reverse=True)
+        query = (
+            "SELECT DISTINCT p.sku, p.descripcion, p.precio FROM product_tokens t "
+            "JOIN products p ON p.id = t.product_id WHERE t.token >= ? AND t.token < ?"
+        )
+        params = [tokens[0], tokens[0] + "\uffff"]
+        for token in tokens[1:]:
+            query += (
+                " AND EXISTS (SELECT 1 FROM product_tokens o WHERE o.product_id = t.product_id "
+                "AND o.token >= ? AND o.token < ?)"
+            )
+            params += [token, token + "\uffff"]
+        with self._lock:
+            rows = self._conn.execute(query + " LIMIT ?", params + [limit]).fetchall()
+        # Sin ORDER BY en la consulta, para que SQLite pare al llegar a `limit`
+        return sorted(
+            (Product(sku, descripcion, Decimal(precio) if precio is not None else None)
+             for sku, descripcion, precio in rows),
+            key=lambda product: product.descripcion.casefold()
+        )
+
+
+def main(argv: list[str]) -> int:
+    """
+    Punto de entrada por consola:
+        python -m src.invoice.catalog productos.csv
+    """
+    from ..settings.settings import get_config_dir
+
+    parser = argparse.ArgumentParser(prog="python -m src.invoice.catalog", description="Importar el catálogo de productos.")
+    parser.add_argument("csv", help="CSV con código, descripción y precio de cada producto.")
+    args = parser.parse_args(argv)
+
+    config_dir = get_config_dir()
+    config_dir.mkdir(parents=True, exist_ok=True)
+    catalog = ProductCatalog(config_dir / CATALOG_FILENAME)
+    try:
+        count = catalog.import_csv(args.csv)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo importar el catálogo: {e}")
+        return 1
+    print(f"{count} productos importados ({len(catalog)} en el catálogo).")
+    catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,164 @@
+from bisect import bisect_left, insort
+import re
+
+_NON_ALNUM_RE = re.compile(r"[^0-9A-Z]")
+
+# Campos del editor que se llenan al elegir un cliente
+CLIENT_FIELDS = ("nombre_razon_social", "numero_rif", "domicilio_fiscal", "telefono")
+
+
+def normalize_rif(rif: str) -> str:
+    """
+    Normaliza un RIF para búsquedas: mayúsculas y sin guiones, puntos ni espacios.
+    `J-12345678-9` -> `J123456789`
+    """
+    return _NON_ALNUM_RE.sub("", (rif or "").upper())
+
+
+def normalize_client(name: str) -> str:
+    """
+    Normaliza un nombre de cliente para búsquedas sin distinguir mayúsculas.
+    """
+    return " ".join((name or "").split()).casefold()
+
+
+class Client:
+    """
+    Datos de un cliente tomados de su última factura.
+    """
+
+    __slots__ = ("nombre_razon_social", "numero_rif", "domicilio_fiscal", "telefono")
+
+    def __init__(self, nombre_razon_social: str, numero_rif: str, domicilio_fiscal: str = "", telefono: str = ""):
+        self.nombre_razon_social = nombre_razon_social or ""
+        self.numero_rif = numero_rif or ""
+        self.domicilio_fiscal = domicilio_fiscal or ""
+        self.telefono = telefono or ""
+
+    @classmethod
+    def from_fields(cls, fields: dict) -> "Client | None":
+        """
+        Cliente de los valores de una factura, o None si no tiene nombre ni RIF.
+        """
+        values = [str(fields.get(key) or "").strip() for key in CLIENT_FIELDS]
+        return cls(*values) if values[0] or values[1] else None
+
+    def key(self) -> str:
+        """
+        Identidad del cliente: el RIF normalizado o, si no tiene, el nombre.
+        """
+        return normalize_rif(self.numero_rif) or normalize_client(self.nombre_razon_social)
+
+    def to_fields(self) -> dict:
+        return {key: getattr(self, key) for key in CLIENT_FIELDS}
+
+    def label(self) -> str:
+        if self.numero_rif and self.nombre_razon_social:
+            return f"{self.nombre_razon_social}  ({self.numero_rif})"
+        return self.nombre_razon_social or self.numero_rif
+
+
+class ClientDirectory:
+    """
+    Directorio de clientes en memoria con búsqueda por prefijo.
+
+    Guarda dos arreglos ordenados de `(clave normalizada, id)`, uno por nombre y
+    otro por RIF; una búsqueda es un `bisect` más la lectura de los resultados,
+    por lo que no depende de la cantidad de clientes.
+
+    Args:
+        clients (Iterable[Client]): `Opcional` Clientes iniciales. Si un cliente se
+        repite (mismo RIF o, sin RIF, mismo nombre), queda el último.
+    """
+
+    __slots__ = ("_clients", "_ids", "_by_name", "_by_rif")
+
+    def __init__(self, clients=()):
+        self._clients = []
+        self._ids = {}
+        self._by_name = []
+        self._by_rif = []
+        for client in clients:
+            client_id = self._find(client)
+            if client_id is None:
+                self._ids[client.key()] = len(self._clients)
+                self._clients.append(client)
+            else:
+                self._clients[client_id] = client
+        for client_id, client in enumerate(self._clients):
+            self._by_name.append((normalize_client(client.nombre_razon_social), client_id))
+            self._by_rif.append((normalize_rif(client.numero_rif), client_id))
+        self._by_name.sort()
+        self._by_rif.sort()
+
+    @classmethod
+    def from_store(cls, store) -> "ClientDirectory":
+        """
+        Construye el directorio con los clientes de las facturas registradas en `store`.
+        """
+        return cls(Client(*row) for row in store.list_clients())
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _find(self, client: Client) -> int | None:
+        """
+        Id del cliente ya registrado que corresponde a `client`, o None.
+
+        Un cliente registrado solo por nombre pasa a identificarse por RIF cuando llega
+        con RIF, para que no quede repetido.
+        """
+        rif = normalize_rif(client.numero_rif)
+        name = normalize_client(client.nombre_razon_social)
+        client_id = self._ids.get(rif or name)
+        if client_id is None and rif and name:
+            client_id = self._ids.get(name)
+            if client_id is not None and not normalize_rif(self._clients[client_id].numero_rif):
+                del self._ids[name]
+                self._ids[rif] = client_id
+            else:
+                client_id = None
+        return client_id
+
+    def add(self, client: Client) -> None:
+        """
+        Agrega un cliente o actualiza sus datos (por ejemplo, tras generar una factura).
+        Los clientes con RIF se identifican por el RIF normalizado, aunque cambie el nombre.
+        """
+        client_id = self._find(client)
+        if client_id is None:
+            client_id = self._ids[client.key()] = len(self._clients)
+            self._clients.append(client)
+        else:
+            previous = self._clients[client_id]
+            self._clients[client_id] = client
+            self._by_name.pop(bisect_left(self._by_name, (normalize_client(previous.nombre_razon_social), client_id)))
+            self._by_rif.pop(bisect_left(self._by_rif, (normalize_rif(previous.numero_rif), client_id)))
+        insort(self._by_name, (normalize_client(client.nombre_razon_social), client_id))
+        insort(self._by_rif, (normalize_rif(client.numero_rif), client_id))
+
+    @staticmethod
+    def _prefix_search(index: list, prefix: str, limit: int) -> list[int]:
+        if not prefix:
+            return []
+        ids = []
+        position = bisect_left(index, (prefix,))
+        while position < len(index) and len(ids) < limit:
+            key, client_id = index[position]
+            if not key.startswith(prefix):
+                break
+            ids.append(client_id)
+            position += 1
+        return ids
+
+    def search_name(self, text: str, limit: int = 20) -> list[Client]:
+        """
+        Clientes cuyo nombre empieza por `text`, sin distinguir mayúsculas.
+        """
+        return [self._clients[i] for i in self._prefix_search(self._by_name, normalize_client(text), limit)]
+
+    def search_rif(self, text: str, limit: int = 20) -> list[Client]:
+        """
+        Clientes cuyo RIF empieza por `text`, ignorando guiones y puntos.
+        """
+        return [self._clients[i] for i in self._prefix_search(self._by_rif, normalize_rif(text), limit)]
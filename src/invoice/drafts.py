@@ -0,0 +1,242 @@
+import atexit
+import json
+import os
+import queue
+import threading
+from pathlib import Path
+
+# Tamaño del diario a partir del cual se compacta en el snapshot
+COMPACT_BYTES = 64 * 1024
+# Largo máximo de un valor guardado (los campos del editor son mucho más cortos)
+MAX_VALUE_CHARS = 1024
+# Máximo de cambios encolados que se escriben de una vez
+_MAX_BATCH = 500
+
+SNAPSHOT_FILENAME = "borrador.json"
+JOURNAL_FILENAME = "borrador.journal"
+
+_STOP = object()
+_CLEAR = object()
+
+
+def _apply_delta(state: dict, delta: dict) -> None:
+    campos = state.setdefault("campos", {})
+    for key, value in (delta.get("campos") or {}).items():
+        if value:
+            campos[key] = value
+        else:
+            campos.pop(key, None)
+    if "forma_pago" in delta:
+        state["forma_pago"] = delta["forma_pago"]
+
+
+def load_draft(directory: str) -> dict | None:
+    """
+    Lee el último borrador guardado en `directory`: el snapshot más los cambios del diario.
+
+    Una línea incompleta al final del diario (cierre inesperado durante la escritura)
+    se ignora, junto con todo lo que venga después.
+
+    Returns:
+        draft (dict | None): Borrador con el formato de `FormSnapshot.to_dict`, o None si
+        no hay borrador o está vacío.
+    """
+    directory = Path(directory)
+    state = {"campos": {}, "forma_pago": None}
+    try:
+        with open(directory / SNAPSHOT_FILENAME, "r", encoding="utf-8") as f:
+            _apply_delta(state, json.load(f))
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        with open(directory / JOURNAL_FILENAME, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    _apply_delta(state, json.loads(line))
+                except (ValueError, AttributeError):
+                    break
+    except OSError:
+        pass
+
+    if not state["campos"] and not state["forma_pago"]:
+        return None
+    return state
+
+
+class _DraftWriter(threading.Thread):
+    """
+    Hilo que escribe los cambios encolados por `DraftJournal`.
+
+    Agrupa los cambios pendientes en una sola línea del diario por lote y,
+    cuando el diario supera `compact_bytes`, escribe el estado completo en el
+    snapshot (temporal + `os.replace`) y vacía el diario.
+    """
+
+    def __init__(self, draft_queue: queue.Queue, directory: Path, compact_bytes: int, state: dict | None):
+        super().__init__(name="draft-writer", daemon=True)
+        self._queue = draft_queue
+        self._directory = directory
+        self._compact_bytes = compact_bytes
+        self._state = json.loads(json.dumps(state)) if state else {"campos": {}, "forma_pago": None}
+        self._journal_path = directory / JOURNAL_FILENAME
+        self._snapshot_path = directory / SNAPSHOT_FILENAME
+        self._stream = None
+        self._size = 0
+
+    def _open_journal(self) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        # Descartar una línea incompleta de un cierre inesperado, para no continuarla
+        try:
+            with open(self._journal_path, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+        self._stream = open(self._journal_path, "a", encoding="utf-8")
+        self._size = self._stream.tell()
+
+    def _append(self, delta: dict) -> None:
+        if self._stream is None:
+            self._open_journal()
+        line = json.dumps(delta, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._stream.write(line)
+        self._stream.flush()
+        os.fsync(self._stream.fileno())
+        self._size += len(line.encode("utf-8"))
+
+    def _compact(self) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+        # El snapshot ya incluye el diario, así que se puede vaciar
+        if self._stream is not None:
+            self._stream.close()
+        self._stream = open(self._journal_path, "w", encoding="utf-8")
+        self._size = 0
+
+    def _clear(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self._size = 0
+        self._state = {"campos": {}, "forma_pago": None}
+        for path in (self._journal_path, self._snapshot_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def run(self) -> None:
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < _MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            pending = {}
+            flushed = []
+            for item in batch + [None]:
+                if isinstance(item, dict):
+                    # Los cambios seguidos se unen en un solo delta
+                    pending.setdefault("campos", {}).update(item.get("campos") or {})
+                    if "forma_pago" in item:
+                        pending["forma_pago"] = item["forma_pago"]
+                    continue
+                try:
+                    if pending:
+                        _apply_delta(self._state, pending)
+                        self._append(pending)
+                        pending = {}
+                        if self._size > self._compact_bytes:
+                            self._compact()
+                    if item is _CLEAR:
+                        self._clear()
+                except Exception as e:
+                    print(f"Error guardando el borrador: {e}")
+                if item is _STOP:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    flushed.append(item)
+
+            for event in flushed:
+                event.set()
+
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+class DraftJournal:
+    """
+    Autoguardado del borrador del editor en un diario de solo agregado.
+
+    `record` solo encola el cambio: la escritura (con `fsync`) la hace un hilo en
+    segundo plano, así que no afecta la escritura en el editor. El diario se
+    compacta en un snapshot al superar `compact_bytes`, por lo que su tamaño
+    está acotado. `load_draft` reconstruye el borrador en una sola lectura.
+
+    Args:
+        directory (str): Carpeta del borrador (en la carpeta de configuración).
+        compact_bytes (int): `Opcional` Tamaño del diario que dispara la compactación. Default: 64 KB
+
+    Attributes:
+        restored (dict | None): Borrador que había al abrir el diario (ver `load_draft`).
+    """
+
+    def __init__(self, directory: str, compact_bytes: int = COMPACT_BYTES):
+        self.directory = Path(directory)
+        self.restored = load_draft(self.directory)
+        self._queue = queue.Queue()
+        self._writer = _DraftWriter(self._queue, self.directory, compact_bytes, self.restored)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def record(self, changes: dict, payment=...) -> None:
+        """
+        Encola cambios del formulario.
+
+        Args:
+            changes (dict): Valores nuevos por clave. Un valor vacío borra la clave del borrador.
+            payment (str | None): `Opcional` Forma de pago nueva, si cambió.
+        """
+        delta = {"campos": {key: value[:MAX_VALUE_CHARS] if isinstance(value, str) else value
+                            for key, value in changes.items()}}
+        if payment is not ...:
+            delta["forma_pago"] = payment
+        self._queue.put(delta)
+
+    def clear(self) -> None:
+        """
+        Borra el borrador (por ejemplo, al limpiar todos los campos).
+        """
+        self._queue.put(_CLEAR)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """
+        Espera a que todos los cambios encolados hasta ahora se escriban en disco.
+        """
+        if not self._writer.is_alive():
+            return
+        event = threading.Event()
+        self._queue.put(event)
+        event.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Escribe los cambios pendientes y detiene el hilo de escritura.
+        """
+        if not self._writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
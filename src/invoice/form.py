@@ -0,0 +1,166 @@
+import json
+from .layout import CompiledLayout
+
+PAYMENT_PREFIX = "forma_pago_"
+
+
+class FormSnapshot:
+    """
+    Copia inmutable de los valores del formulario en un momento dado.
+
+    Se puede pasar a otros hilos o procesos (render, autoguardado, índice,
+    lotes) sin tocar los widgets. Las claves se comparten con el formulario,
+    por lo que tomar una copia solo copia la tupla de valores.
+
+    Attributes:
+        keys (tuple[str]): Claves de los campos (sin las de forma de pago).
+        values (tuple): Valor de cada clave: `str` para textos, `bool` para checkboxes.
+        payment (str | None): Forma de pago seleccionada (`efectivo`, `debito`, ...).
+        version (int): Versión del formulario cuando se tomó la copia.
+    """
+
+    __slots__ = ("keys", "values", "payment", "version")
+
+    def __init__(self, keys: tuple, values: tuple, payment: str | None, version: int):
+        object.__setattr__(self, "keys", keys)
+        object.__setattr__(self, "values", values)
+        object.__setattr__(self, "payment", payment)
+        object.__setattr__(self, "version", version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FormSnapshot es inmutable.")
+
+    def get(self, key: str, default=None):
+        try:
+            return self.values[self.keys.index(key)]
+        except ValueError:
+            return default
+
+    def is_empty(self) -> bool:
+        return self.payment is None and not any(self.values)
+
+    def to_fields(self) -> dict:
+        """
+        Valores en el formato de `plan_invoice`/`render_invoice`: todas las claves, y la
+        forma de pago como `forma_pago_<valor>: True`.
+        """
+        fields = dict(zip(self.keys, self.values))
+        if self.payment:
+            fields[f"{PAYMENT_PREFIX}{self.payment}"] = True
+        return fields
+
+    def to_dict(self) -> dict:
+        """
+        Versión compacta para guardar: solo los campos con valor.
+        """
+        return {
+            "campos": {key: value for key, value in zip(self.keys, self.values) if value},
+            "forma_pago": self.payment,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+
+class InvoiceForm:
+    """
+    Modelo del formulario del editor, independiente de Qt.
+
+    Los widgets lo mantienen al día con sus signals (ver `App._create_editor_input`),
+    y el resto de la app trabaja con copias inmutables (`snapshot`) en lugar de
+    recorrer los widgets.
+
+    Args:
+        layout (CompiledLayout): Layout compilado con `get_layout`.
+    """
+
+    __slots__ = ("keys", "payments", "_index", "_defaults", "_values", "payment", "version")
+
+    def __init__(self, layout: CompiledLayout):
+        self.keys = ()
+        self.payment = None
+        self.version = 0
+        self._values = []
+        self.relayout(layout)
+
+    def relayout(self, layout: CompiledLayout) -> None:
+        """
+        Adapta el formulario a un layout nuevo, conservando los valores de las claves que siguen.
+        """
+        previous = dict(zip(self.keys, self._values)) if self._values else {}
+        keys = []
+        defaults = []
+        payments = []
+        for field in layout.fields:
+            if field.is_payment:
+                payments.append(field.key[len(PAYMENT_PREFIX):])
+                continue
+            keys.append(field.key)
+            defaults.append(False if field.is_check else "")
+
+        self.keys = tuple(keys)
+        self.payments = tuple(payments)
+        self._index = {key: index for index, key in enumerate(keys)}
+        self._defaults = tuple(defaults)
+        self._values = [
+            previous.get(key, default) for key, default in zip(self.keys, self._defaults)
+        ]
+        if self.payment not in self.payments:
+            self.payment = None
+        self.version += 1
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def get(self, key: str, default=None):
+        index = self._index.get(key)
+        return self._values[index] if index is not None else default
+
+    def set(self, key: str, value) -> bool:
+        """
+        Cambia el valor de `key`.
+
+        Returns:
+            changed (bool): False si la clave no existe o el valor es el mismo.
+        """
+        index = self._index.get(key)
+        if index is None or self._values[index] == value:
+            return False
+        self._values[index] = value
+        self.version += 1
+        return True
+
+    def reset(self, key: str) -> bool:
+        """
+        Vuelve `key` a su valor vacío.
+        """
+        index = self._index.get(key)
+        return self.set(key, self._defaults[index]) if index is not None else False
+
+    def set_payment(self, payment: str | None) -> bool:
+        if payment is not None and payment not in self.payments:
+            return False
+        if payment == self.payment:
+            return False
+        self.payment = payment
+        self.version += 1
+        return True
+
+    def clear(self) -> None:
+        self._values = list(self._defaults)
+        self.payment = None
+        self.version += 1
+
+    def load(self, data: dict) -> list[str]:
+        """
+        Carga valores guardados con `FormSnapshot.to_dict`. Las claves desconocidas se ignoran.
+
+        Returns:
+            keys (list[str]): Claves que cambiaron.
+        """
+        changed = [key for key, value in (data.get("campos") or {}).items() if self.set(key, value)]
+        self.set_payment(data.get("forma_pago"))
+        return changed
+
+    def snapshot(self) -> FormSnapshot:
+        return FormSnapshot(self.keys, tuple(self._values), self.payment, self.version)
@@ -0,0 +1,167 @@
+import json
+import os
+import re
+
+# Tamaño carta en puntos PDF (1 pulgada = 72 puntos)
+PAGE_WIDTH_PT = 8.5 * 72.0
+PAGE_HEIGHT_PT = 11 * 72.0
+
+# Columnas de cada fila de items (`itemN-cantidad`, `itemN-concepto`, ...)
+ITEM_COLUMNS = ("cantidad", "concepto", "pu", "total")
+ITEM_KEY_RE = re.compile(r"^item(\d+)-(" + "|".join(ITEM_COLUMNS) + r")$")
+
+
+class FieldSpec:
+    """
+    Geometría compilada de un campo de `inputs_geometry.json`.
+
+    Guarda los valores originales del editor (`x`, `y`, `w`, `h`) y las coordenadas
+    ya convertidas al espacio del PDF, para que el render no haga cálculos por campo.
+    """
+
+    __slots__ = (
+        "key", "x", "y", "w", "h", "max_len", "tipo", "alignment",
+        "is_check", "is_payment", "pdf_x", "pdf_y", "check_x", "check_y",
+    )
+
+    def __init__(self, key: str, values: list, scale_x: float, scale_y: float, height_pt: float):
+        x, y, w, h, max_len, tipo, *rest = values
+        alignment = rest[0] if rest else "left"
+        if alignment not in ("left", "center", "right"):
+            alignment = "left"
+
+        self.key = key
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.max_len = max_len
+        self.tipo = tipo
+        self.alignment = alignment
+        self.is_check = tipo in ("radio_button", "checkbox")
+        self.is_payment = tipo == "radio_button" and key.startswith("forma_pago_")
+
+        # Coordenadas del texto según su alineación
+        self.pdf_y = height_pt - ((y + 16) * scale_y)
+        if alignment == "center":
+            self.pdf_x = (x + w / 2) * scale_x
+        elif alignment == "right":
+            self.pdf_x = (x + w - 2) * scale_x
+        else:
+            self.pdf_x = (x + 2) * scale_x
+
+        # Coordenadas del símbolo ✔ de la forma de pago
+        self.check_x = (x + 1) * scale_x
+        self.check_y = height_pt - ((y + 11) * scale_y)
+
+    def same_geometry(self, other: "FieldSpec") -> bool:
+        """
+        Indica si `other` tiene la misma geometría y propiedades de editor.
+        """
+        return (
+            self.x == other.x and self.y == other.y and self.w == other.w and self.h == other.h
+            and self.max_len == other.max_len and self.tipo == other.tipo
+            and self.alignment == other.alignment
+        )
+
+
+class CompiledLayout:
+    """
+    Layout compilado de la factura a partir de `inputs_geometry.json`.
+
+    Attributes:
+        fields (tuple[FieldSpec]): Campos en el mismo orden del JSON.
+        by_key (dict[str, FieldSpec]): Campos indexados por clave.
+        width_pt (float): Ancho de la página PDF.
+        height_pt (float): Alto de la página PDF.
+        item_rows (tuple[tuple[FieldSpec | None]]): Geometría de cada fila de items, de
+            arriba hacia abajo, con un campo por columna de `ITEM_COLUMNS` (None si falta).
+    """
+
+    __slots__ = ("fields", "by_key", "width_pt", "height_pt", "invoice_width", "invoice_height", "item_rows")
+
+    def __init__(self, inputs_data: dict, invoice_width: int, invoice_height: int):
+        self.width_pt = PAGE_WIDTH_PT
+        self.height_pt = PAGE_HEIGHT_PT
+        self.invoice_width = invoice_width
+        self.invoice_height = invoice_height
+
+        scale_x = self.width_pt / invoice_width
+        scale_y = self.height_pt / invoice_height
+
+        self.fields = tuple(
+            FieldSpec(key, values, scale_x, scale_y, self.height_pt)
+            for key, values in inputs_data.items()
+        )
+        self.by_key = {field.key: field for field in self.fields}
+
+        rows = {}
+        for field in self.fields:
+            match = ITEM_KEY_RE.match(field.key)
+            if match:
+                rows.setdefault(int(match.group(1)), {})[match.group(2)] = field
+        self.item_rows = tuple(
+            tuple(rows[row].get(column) for column in ITEM_COLUMNS) for row in sorted(rows)
+        )
+
+
+# (ruta, ancho, alto) -> (mtime_ns, tamaño, CompiledLayout)
+_layout_cache = {}
+
+
+def get_layout(geometry_path: str, invoice_width: int, invoice_height: int) -> CompiledLayout:
+    """
+    Retorna el layout compilado de `geometry_path`.
+
+    El resultado se guarda en memoria y solo se vuelve a leer el JSON cuando
+    cambian la fecha de modificación o el tamaño del archivo.
+
+    Args:
+        geometry_path (str): Ruta de `inputs_geometry.json`.
+        invoice_width (int): Ancho de la plantilla en el editor.
+        invoice_height (int): Alto de la plantilla en el editor.
+
+    Returns:
+        layout (CompiledLayout): Layout compilado.
+
+    Raises:
+        OSError: Si el archivo no existe o no se puede leer.
+        ValueError: Si el JSON es inválido.
+    """
+    stat = os.stat(geometry_path)
+    cache_key = (geometry_path, invoice_width, invoice_height)
+    cached = _layout_cache.get(cache_key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with open(geometry_path, "r", encoding="utf-8") as f:
+        inputs_data = json.load(f)
+    layout = CompiledLayout(inputs_data, invoice_width, invoice_height)
+    _layout_cache[cache_key] = (stat.st_mtime_ns, stat.st_size, layout)
+    return layout
+
+
+def diff_layouts(old: CompiledLayout | None, new: CompiledLayout) -> tuple[list, list, list]:
+    """
+    Compara dos layouts campo por campo.
+
+    Args:
+        old (CompiledLayout | None): Layout anterior. Si es None, todos los campos son nuevos.
+        new (CompiledLayout): Layout nuevo.
+
+    Returns:
+        diff (tuple[list[FieldSpec], list[FieldSpec], list[str]]): Campos nuevos,
+        campos con geometría o propiedades modificadas y claves eliminadas.
+    """
+    if old is None:
+        return list(new.fields), [], []
+    added = []
+    changed = []
+    for field in new.fields:
+        previous = old.by_key.get(field.key)
+        if previous is None:
+            added.append(field)
+        elif not previous.same_geometry(field):
+            changed.append(field)
+    removed = [key for key in old.by_key if key not in new.by_key]
+    return added, changed, removed
@@ -0,0 +1,277 @@
+from datetime import datetime
+import json
+import os
+import re
+import threading
+import time
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# Nombre del contador dentro de la carpeta de facturas
+COUNTER_FILENAME = ".numeracion_facturas.json"
+
+# factura_%Y%m%d_%H%M%S_<número>.pdf
+_NUMBERED_NAME_RE = re.compile(r"^factura_\d{8}_\d{6}_(\d{6,})\.pdf$", re.IGNORECASE)
+
+
+def counter_path_for(prints_path: str) -> str:
+    """
+    Ruta del contador de facturas de la carpeta `prints_path`.
+    """
+    return os.path.join(prints_path, COUNTER_FILENAME)
+
+
+def highest_invoice_number(prints_path: str) -> int:
+    """
+    Mayor número de factura en `prints_path`, contando también las facturas
+    archivadas (ver `ArchiveIndex`). 0 si no hay facturas numeradas.
+    """
+    from .archive import ArchiveIndex
+
+    highest = 0
+    try:
+        with os.scandir(prints_path) as entries:
+            names = [entry.name for entry in entries]
+    except FileNotFoundError:
+        names = []
+    for name in names + ArchiveIndex(prints_path).names():
+        match = _NUMBERED_NAME_RE.match(name)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+def try_lock_file(fd: int) -> bool:
+    """
+    Intenta tomar, sin esperar, el lock exclusivo del sistema operativo sobre el archivo
+    abierto `fd` (`fcntl.flock` / `msvcrt.locking`). El lock se libera con `unlock_file`
+    o, si el proceso termina, automáticamente.
+
+    Returns:
+        locked (bool): True si se obtuvo el lock, False si lo tiene otro proceso.
+    """
+    try:
+        if os.name == "nt":
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def unlock_file(fd: int) -> None:
+    """
+    Libera el lock tomado con `try_lock_file` y cierra `fd`.
+    """
+    try:
+        if os.name == "nt":
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+class InvoiceNumberAllocator:
+    """
+    Asigna números de factura secuenciales, guardados en `counter_path`.
+
+    El contador vive en la propia carpeta de facturas (ver `counter_path_for`), así
+    que lo comparten todas las PC que guardan en la misma carpeta compartida, y se
+    protege con un lock del sistema operativo (`fcntl.flock` / `msvcrt.locking`) sobre
+    un archivo `.lock`: varias instancias de la app (o procesos de generación por lotes)
+    nunca reciben el mismo número, y un proceso cerrado a la fuerza libera el lock
+    automáticamente. El contador se reescribe con un archivo temporal y `os.replace`,
+    así que un cierre inesperado no lo deja a medias. Si falta o está dañado, se
+    reconstruye a partir del mayor número que ya hay en la carpeta.
+
+    Args:
+        counter_path (str): Ruta del JSON del contador.
+        lock_timeout (float): `Opcional` Segundos máximos de espera por el lock. Default: 10
+    """
+
+    def __init__(self, counter_path: str, lock_timeout: float = 10.0):
+        self.counter_path = str(counter_path)
+        self.lock_timeout = lock_timeout
+        self._lock_path = f"{self.counter_path}.lock"
+        self._lock_fd = None
+        self._thread_lock = threading.Lock()
+
+    def _acquire_file_lock(self) -> None:
+        deadline = time.monotonic() + self.lock_timeout
+        # El archivo nunca se borra: el lock es del descriptor, no de la existencia del archivo
+        fd = os.open(self._lock_path, os.O_CREAT | os.O_RDWR)
+        while not try_lock_file(fd):
+            if time.monotonic() > deadline:
+                os.close(fd)
+                raise TimeoutError(f"No se pudo obtener el lock del contador de facturas ({self._lock_path}).")
+            time.sleep(0.005)
+        self._lock_fd = fd
+
+    def _release_file_lock(self) -> None:
+        fd, self._lock_fd = self._lock_fd, None
+        if fd is not None:
+            unlock_file(fd)
+
+    def _read_next(self) -> int:
+        """
+        Próximo número según el contador. Si el contador no existe o está dañado, se
+        reconstruye con el mayor número de la carpeta, para no repetir números ya usados.
+
+        Raises:
+            OSError: Si el contador existe pero no se puede leer (permisos, red, etc.).
+        """
+        try:
+            with open(self.counter_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return max(1, int(data["siguiente"]))
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError, KeyError):
+            # JSON dañado o sin "siguiente"
+            pass
+        return highest_invoice_number(os.path.dirname(self.counter_path) or ".") + 1
+
+    def _write_next(self, next_number: int) -> None:
+        tmp_path = f"{self.counter_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"siguiente": next_number}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.counter_path)
+
+    def allocate(self, count: int = 1) -> range:
+        """
+        Reserva `count` números consecutivos.
+
+        Returns:
+            numbers (range): Números reservados.
+
+        Raises:
+            TimeoutError: Si otro proceso mantiene el lock más de `lock_timeout` segundos.
+            OSError: Si no se puede escribir el contador.
+        """
+        with self._thread_lock:
+            os.makedirs(os.path.dirname(self.counter_path) or ".", exist_ok=True)
+            self._acquire_file_lock()
+            try:
+                first = self._read_next()
+                self._write_next(first + count)
+            finally:
+                self._release_file_lock()
+        return range(first, first + count)
+
+    def peek(self) -> int:
+        """
+        Retorna el próximo número que se asignaría, sin reservarlo.
+        """
+        return self._read_next()
+
+
+def build_invoice_filename(number: int, when: datetime = None) -> str:
+    """
+    Nombre de archivo de una factura: `factura_%Y%m%d_%H%M%S_<número>.pdf`.
+
+    Mantiene la fecha al inicio, por lo que sigue ordenándose por fecha en la lista
+    y en el archivo mensual.
+    """
+    return f"factura_{(when or datetime.now()).strftime('%Y%m%d_%H%M%S')}_{number:06d}.pdf"
+
+
+def temp_path_for(directory: str) -> str:
+    """
+    Ruta temporal (oculta y sin extensión .pdf) en `directory`, para escribir un PDF
+    antes de publicarlo con `publish_file`. Al estar en la misma carpeta, el
+    renombrado final es atómico.
+    """
+    # `os.urandom` en lugar de `uuid`, que en Python 3.11 importa `platform` al cargarse
+    return os.path.join(directory, f".factura_{os.urandom(8).hex()}.part")
+
+
+def publish_file(tmp_path: str, final_path: str) -> None:
+    """
+    Mueve `tmp_path` a `final_path` solo si `final_path` no existe, de forma atómica.
+
+    Se usa un enlace duro, que falla si el destino existe. En sistemas de archivos
+    sin enlaces duros se reserva el nombre con una creación exclusiva y luego se
+    reemplaza con el temporal; si el reemplazo falla, se libera el nombre reservado.
+
+    Raises:
+        FileNotFoundError: Si `tmp_path` no existe. No se crea `final_path`.
+        FileExistsError: Si `final_path` ya existe. `tmp_path` queda intacto.
+    """
+    try:
+        os.link(tmp_path, final_path)
+    except (FileExistsError, FileNotFoundError):
+        raise
+    except (OSError, NotImplementedError):
+        if not os.path.isfile(tmp_path):
+            raise FileNotFoundError(f"No existe el PDF temporal {tmp_path}.")
+        fd = os.open(final_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        os.close(fd)
+        try:
+            os.replace(tmp_path, final_path)
+        except OSError:
+            os.remove(final_path)
+            raise
+        return
+    os.remove(tmp_path)
+
+
+def publish_invoice(tmp_path: str, final_path: str, allocator: InvoiceNumberAllocator = None,
+                    when: datetime = None, max_attempts: int = 100) -> str:
+    """
+    Publica el PDF temporal `tmp_path` como `final_path`, sin sobrescribir nunca un archivo.
+
+    Si el nombre ya existe (por ejemplo, otra instancia de la app con su propio contador
+    escribió en la misma carpeta compartida) y hay `allocator`, se reserva un número nuevo
+    y se vuelve a intentar.
+
+    Args:
+        tmp_path (str): PDF ya escrito (ver `temp_path_for`).
+        final_path (str): Ruta deseada.
+        allocator (InvoiceNumberAllocator): `Opcional` Contador para elegir otro número.
+        when (datetime): `Opcional` Fecha para los nombres nuevos. Default: ahora.
+        max_attempts (int): `Opcional` Intentos máximos. Default: 100
+
+    Returns:
+        final_path (str): Ruta con la que se publicó el PDF.
+
+    Raises:
+        FileExistsError: Si el nombre existe y no hay `allocator`, o se agotaron los intentos.
+    """
+    directory = os.path.dirname(final_path)
+    for _ in range(max_attempts):
+        try:
+            publish_file(tmp_path, final_path)
+            return final_path
+        except FileExistsError:
+            if allocator is None:
+                raise
+            final_path = os.path.join(directory, build_invoice_filename(allocator.allocate()[0], when))
+    raise FileExistsError(f"No se encontró un nombre libre para la factura en {directory}.")
+
+
+def publish_numbered_invoice(tmp_path: str, directory: str, allocator: InvoiceNumberAllocator,
+                             when: datetime = None) -> str:
+    """
+    Reserva un número de factura y publica el PDF temporal `tmp_path` en `directory`
+    con ese número (ver `publish_invoice`).
+
+    El número se reserva recién cuando el PDF ya está escrito, así que una generación
+    vacía, cancelada o fallida no deja huecos en la numeración.
+
+    Returns:
+        final_path (str): Ruta con la que se publicó el PDF.
+
+    Raises:
+        TimeoutError: Si otro proceso mantiene el lock del contador demasiado tiempo.
+        OSError: Si no se puede leer o escribir el contador.
+    """
+    final_path = os.path.join(directory, build_invoice_filename(allocator.allocate()[0], when))
+    return publish_invoice(tmp_path, final_path, allocator, when)
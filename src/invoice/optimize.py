@@ -0,0 +1,140 @@
+import hashlib
+import os
+import time
+import pikepdf
+
+
+class OptimizeResult:
+    """
+    Resultado de optimizar un PDF.
+
+    Attributes:
+        path (str): Ruta del PDF optimizado.
+        size_before (int): Tamaño original en bytes.
+        size_after (int): Tamaño final en bytes.
+        elapsed (float): Segundos que tomó la optimización.
+        deduplicated (int): Recursos repetidos que se unificaron.
+    """
+
+    __slots__ = ("path", "size_before", "size_after", "elapsed", "deduplicated")
+
+    def __init__(self, path: str, size_before: int, size_after: int, elapsed: float, deduplicated: int):
+        self.path = path
+        self.size_before = size_before
+        self.size_after = size_after
+        self.elapsed = elapsed
+        self.deduplicated = deduplicated
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.size_before - self.size_after
+
+    @property
+    def ratio(self) -> float:
+        """
+        Tamaño final respecto al original (0.6 = 40% más pequeño).
+        """
+        return self.size_after / self.size_before if self.size_before else 1.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.size_before} -> {self.size_after} bytes "
+            f"({(1 - self.ratio) * 100:.0f}% menos) en {self.elapsed * 1000:.1f} ms"
+        )
+
+
+def _resource_key(obj: pikepdf.Object) -> tuple:
+    if isinstance(obj, pikepdf.Stream):
+        digest = hashlib.sha1(obj.read_raw_bytes()).hexdigest()
+        return ("stream", obj.stream_dict.unparse(resolved=True), digest)
+    return ("object", obj.unparse(resolved=True))
+
+
+def dedup_resources(pdf: pikepdf.Pdf) -> int:
+    """
+    Unifica las fuentes y XObjects idénticos que aparecen como objetos distintos
+    en varias páginas (por ejemplo, al unir facturas generadas por separado).
+    Los objetos que quedan sin referencias no se escriben al guardar.
+
+    Args:
+        pdf (pikepdf.Pdf): Documento abierto.
+
+    Returns:
+        deduplicated (int): Cantidad de referencias que se cambiaron por el objeto compartido.
+    """
+    canonical = {}
+    deduplicated = 0
+    for page in pdf.pages:
+        resources = page.obj.get("/Resources")
+        if resources is None:
+            continue
+        for category in ("/Font", "/XObject"):
+            entries = resources.get(category)
+            if entries is None:
+                continue
+            for name in list(entries.keys()):
+                obj = entries[name]
+                if not obj.is_indirect:
+                    continue
+                key = _resource_key(obj)
+                shared = canonical.setdefault(key, obj)
+                if shared.objgen != obj.objgen:
+                    entries[name] = shared
+                    deduplicated += 1
+    return deduplicated
+
+
+def save_optimized(pdf: pikepdf.Pdf, filepath: str, linearize: bool = False) -> None:
+    """
+    Guarda `pdf` con streams comprimidos con Flate (sin ASCII85), streams de objetos
+    y, opcionalmente, linealizado (para abrirlo por partes desde una carpeta compartida).
+
+    Args:
+        pdf (pikepdf.Pdf): Documento abierto.
+        filepath (str): Ruta de destino. No puede ser el archivo desde el que se abrió `pdf`.
+        linearize (bool): `Opcional` Linealizar el PDF. Default: False
+    """
+    pdf.save(
+        filepath,
+        compress_streams=True,
+        stream_decode_level=pikepdf.StreamDecodeLevel.generalized,
+        object_stream_mode=pikepdf.ObjectStreamMode.generate,
+        linearize=linearize,
+        deterministic_id=True,
+    )
+
+
+def optimize_pdf(filepath: str, output_path: str = None, linearize: bool = False) -> OptimizeResult:
+    """
+    Reescribe un PDF generado por reportlab para que ocupe menos: recomprime los
+    streams, agrupa los objetos en streams de objetos y unifica recursos repetidos.
+
+    El archivo se escribe primero en un temporal y luego se reemplaza, por lo que
+    si algo falla el PDF original queda intacto.
+
+    Args:
+        filepath (str): Ruta del PDF a optimizar.
+        output_path (str): `Opcional` Ruta de destino. Por defecto reemplaza `filepath`.
+        linearize (bool): `Opcional` Linealizar el PDF. Default: False
+
+    Returns:
+        result (OptimizeResult): Tamaños antes y después, y tiempo empleado.
+
+    Raises:
+        pikepdf.PdfError: Si el PDF no se puede leer.
+        OSError: Si no se puede escribir el resultado.
+    """
+    start = time.perf_counter()
+    output_path = output_path or filepath
+    size_before = os.path.getsize(filepath)
+    tmp_path = f"{output_path}.tmp"
+    try:
+        with pikepdf.open(filepath) as pdf:
+            deduplicated = dedup_resources(pdf)
+            save_optimized(pdf, tmp_path, linearize)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return OptimizeResult(output_path, size_before, os.path.getsize(output_path),
+                          time.perf_counter() - start, deduplicated)
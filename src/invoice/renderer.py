@@ -0,0 +1,377 @@
+from .layout import CompiledLayout, ITEM_COLUMNS, ITEM_KEY_RE
+from .numbering import InvoiceNumberAllocator, publish_invoice, publish_numbered_invoice, temp_path_for
+from .totals import format_amount, parse_amount
+from typing import TYPE_CHECKING
+import os
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen import canvas
+
+CHECK_MARK = "✔"
+
+# Campos que solo se dibujan en la última página de una factura con páginas de continuación
+TOTAL_KEYS = frozenset((
+    "iva", "igtf", "sub_total", "iva_total", "sub_total_mas_iva",
+    "pago_bs", "pago_divisa_tasa", "igtf_sobre", "total_pagar",
+))
+
+
+class EmptyInvoiceError(Exception):
+    """
+    Se lanza cuando se intenta renderizar una factura sin ningun campo rellenado.
+    """
+
+
+def plan_invoice(fields: dict, layout: CompiledLayout) -> tuple[list, tuple | None]:
+    """
+    Calcula los textos a dibujar para una factura, sin tocar ningún canvas.
+
+    El plan se puede dibujar varias veces (por ejemplo en un tiraje y en el
+    archivo individual) sin volver a recorrer los campos.
+
+    Args:
+        fields (dict): Valores de la factura con las mismas claves de `inputs_geometry.json`.
+            Los campos de tipo `checkbox`/`radio_button` aceptan cualquier valor booleano.
+            La forma de pago se indica con `forma_pago_<valor>: True`.
+        layout (CompiledLayout): Layout compilado con `get_layout`.
+
+    Returns:
+        plan (tuple[list, tuple | None]): Lista de `(alignment, x, y, texto)` y la
+        posición `(x, y)` del ✔ de la forma de pago, si hay una seleccionada.
+
+    Raises:
+        EmptyInvoiceError: Si no hay ningún campo rellenado.
+    """
+    texts = []
+    forma_pago_field = None
+
+    for field in layout.fields:
+        raw_value = fields.get(field.key)
+        if raw_value is None:
+            continue
+
+        # Forma de pago se maneja aparte
+        if field.is_payment:
+            if raw_value and forma_pago_field is None:
+                forma_pago_field = field
+            continue
+
+        if field.is_check:
+            value = CHECK_MARK if raw_value else ""
+        else:
+            value = str(raw_value).strip()
+
+        if value:
+            texts.append((field.alignment, field.pdf_x, field.pdf_y, value))
+
+    check = (forma_pago_field.check_x, forma_pago_field.check_y) if forma_pago_field else None
+
+    if not texts and check is None:
+        raise EmptyInvoiceError("Debes llenar al menos un campo para generar un documento.")
+
+    return texts, check
+
+
+def _item_amount(item: dict):
+    amount = parse_amount(item.get("total"))
+    if amount is None:
+        quantity, price = parse_amount(item.get("cantidad")), parse_amount(item.get("pu"))
+        if quantity is not None and price is not None:
+            amount = quantity * price
+    return amount
+
+
+def _row_texts(row: tuple, values: tuple) -> list:
+    return [
+        (spec.alignment, spec.pdf_x, spec.pdf_y, value)
+        for spec, value in zip(row, values)
+        if spec is not None and value
+    ]
+
+
+def _overflowing_items(fields: dict, layout: CompiledLayout) -> list[dict] | None:
+    """
+    Items de las claves planas `itemN-<columna>` de `fields`, en orden de fila, si alguna
+    de esas claves no existe en el layout (más filas de las que tiene la plantilla).
+    Si todas caben, retorna None y la factura se dibuja tal cual.
+    """
+    rows = {}
+    overflow = False
+    for key, value in fields.items():
+        match = ITEM_KEY_RE.match(key)
+        if match is None:
+            continue
+        rows.setdefault(int(match.group(1)), {})[match.group(2)] = value
+        if key not in layout.by_key and str(value or "").strip():
+            overflow = True
+    if not overflow:
+        return None
+    return [
+        rows[row] for row in sorted(rows)
+        if any(str(value or "").strip() for value in rows[row].values())
+    ]
+
+
+def plan_invoice_pages(fields: dict, layout: CompiledLayout) -> list[tuple[list, tuple | None]]:
+    """
+    Calcula los planes de todas las páginas de una factura.
+
+    Si `fields` tiene una lista `items` (diccionarios con `cantidad`, `concepto`, `pu` y
+    `total`), los items se reparten en las filas del layout y, si no caben, en páginas
+    de continuación con la misma plantilla y los datos del cliente:
+        - Cada página que continúa muestra en `sub_total` el subtotal acumulado ("van").
+        - La página siguiente usa su primera fila para "Vienen de la página N" con ese monto.
+        - Los totales y la forma de pago solo se dibujan en la última página. Si falta
+          `sub_total`, se usa la suma de los items.
+
+    Los textos del encabezado y de los totales se calculan una sola vez por factura;
+    las páginas solo agregan las filas de items.
+
+    Sin `items`, los items se toman de las claves `itemN-cantidad`, `itemN-concepto`, etc.
+    cuando hay más filas de las que tiene la plantilla (por ejemplo, un JSON de lotes con
+    `item15-*`). Si todas las filas caben (siempre ocurre en el editor, que solo tiene las
+    filas de la plantilla), el resultado es una sola página igual a `plan_invoice`.
+
+    Args:
+        fields (dict): Valores de la factura (ver `plan_invoice`).
+        layout (CompiledLayout): Layout compilado con `get_layout`.
+
+    Returns:
+        plans (list[tuple[list, tuple | None]]): Un plan por página (ver `draw_invoice_plan`).
+
+    Raises:
+        EmptyInvoiceError: Si no hay ningún campo rellenado ni items.
+    """
+    items = fields.get("items")
+    if items is None:
+        items = _overflowing_items(fields, layout)
+        if items is None:
+            return [plan_invoice(fields, layout)]
+    rows = layout.item_rows
+    if not rows:
+        raise ValueError("El layout no tiene filas de items (itemN-cantidad, itemN-concepto, ...).")
+
+    header_fields = {}
+    totals_fields = {}
+    for key, value in fields.items():
+        if key == "items" or ITEM_KEY_RE.match(key):
+            continue
+        if key in TOTAL_KEYS or key.startswith("forma_pago_"):
+            totals_fields[key] = value
+        else:
+            header_fields[key] = value
+
+    item_values = [tuple(str(item.get(column) or "").strip() for column in ITEM_COLUMNS) for item in items]
+    if not item_values and not any(header_fields.values()) and not any(totals_fields.values()):
+        raise EmptyInvoiceError("Debes llenar al menos un campo para generar un documento.")
+
+    amounts = [_item_amount(item) for item in items]
+    if not str(totals_fields.get("sub_total") or "").strip() and any(a is not None for a in amounts):
+        totals_fields["sub_total"] = format_amount(sum(a for a in amounts if a is not None))
+
+    def texts_for(values: dict) -> tuple[list, tuple | None]:
+        try:
+            return plan_invoice(values, layout)
+        except EmptyInvoiceError:
+            return [], None
+
+    header_texts = texts_for(header_fields)[0]
+    totals_texts, check = texts_for(totals_fields)
+    sub_total_spec = layout.by_key.get("sub_total")
+    concept_column = ITEM_COLUMNS.index("concepto")
+    total_column = ITEM_COLUMNS.index("total")
+
+    plans = []
+    position = 0
+    carried = None
+    while True:
+        page_texts = list(header_texts)
+        first_row = 0
+        if plans:
+            # Fila de "vienen" con el subtotal de las páginas anteriores
+            carried_values = [""] * len(ITEM_COLUMNS)
+            carried_values[concept_column] = f"Vienen de la página {len(plans)}"
+            carried_values[total_column] = format_amount(carried)
+            page_texts += _row_texts(rows[0], carried_values)
+            first_row = 1
+
+        capacity = len(rows) - first_row
+        if capacity <= 0:
+            raise ValueError("El layout necesita al menos dos filas de items para paginar.")
+        page_items = item_values[position:position + capacity]
+        for row, values in zip(rows[first_row:], page_items):
+            page_texts += _row_texts(row, values)
+        page_amounts = [a for a in amounts[position:position + capacity] if a is not None]
+        if page_amounts or carried is not None:
+            carried = (carried or 0) + sum(page_amounts)
+        position += capacity
+
+        if position >= len(item_values):
+            plans.append((page_texts + totals_texts, check))
+            return plans
+        if sub_total_spec is not None and carried is not None:
+            page_texts.append((sub_total_spec.alignment, sub_total_spec.pdf_x, sub_total_spec.pdf_y,
+                               f"Van {format_amount(carried)}"))
+        plans.append((page_texts, None))
+
+
+def draw_invoice_plan(c: "canvas.Canvas", plan: tuple[list, tuple | None]) -> None:
+    """
+    Dibuja un plan de `plan_invoice` en la página actual de `c`.
+    """
+    texts, check = plan
+    c.setFont("Helvetica", 10)
+
+    draw_by_alignment = {
+        "left": c.drawString,
+        "center": c.drawCentredString,
+        "right": c.drawRightString,
+    }
+    for alignment, x, y, value in texts:
+        draw_by_alignment[alignment](x, y, value)
+
+    # ✔ Imprimir símbolo en forma de pago seleccionada
+    if check:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(check[0], check[1], CHECK_MARK)
+
+
+def draw_invoice_pages(c: "canvas.Canvas", plans: list) -> None:
+    """
+    Dibuja los planes de `plan_invoice_pages`, uno por página, y cierra cada página.
+    """
+    for plan in plans:
+        draw_invoice_plan(c, plan)
+        c.showPage()
+
+
+def render_invoice(filepath: str, fields: dict, layout: CompiledLayout) -> int:
+    """
+    Genera un archivo PDF con los valores de `fields`, posicionando cada texto
+    según la geometría ya compilada en `layout`. Con una lista `items` larga se
+    agregan páginas de continuación (ver `plan_invoice_pages`).
+
+    No depende de Qt, por lo que se puede usar desde el GUI o desde procesos
+    de generación por lotes.
+
+    Args:
+        filepath (str): Ruta del PDF a generar.
+        fields (dict): Valores de la factura (ver `plan_invoice`).
+        layout (CompiledLayout): Layout compilado con `get_layout`.
+
+    Returns:
+        campos_rellenados (int): Cantidad de campos dibujados en el PDF.
+
+    Raises:
+        EmptyInvoiceError: Si no hay ningún campo rellenado. En ese caso no se escribe el archivo.
+    """
+    # reportlab se importa solo al escribir un PDF: planificar una factura no lo necesita
+    from reportlab.pdfgen import canvas
+
+    plans = plan_invoice_pages(fields, layout)
+    c = canvas.Canvas(filepath, pagesize=(layout.width_pt, layout.height_pt))
+    draw_invoice_pages(c, plans)
+    c.save()
+    return sum(len(texts) + (1 if check else 0) for texts, check in plans)
+
+
+class PrintRunResult:
+    """
+    Resultado de `render_print_run`.
+
+    Attributes:
+        pages (int): Páginas escritas en el tiraje.
+        drawn (int): Facturas incluidas en el tiraje.
+        failures (list[tuple[int, str]]): Pares (índice de la factura, mensaje de error), tanto
+            de facturas omitidas del tiraje como de archivos individuales que no se publicaron.
+        published (list[str | None]): Ruta de cada archivo individual publicado (puede diferir
+            de la pedida si el nombre ya existía), o None si falló. Vacía sin archivos individuales.
+    """
+
+    __slots__ = ("pages", "drawn", "failures", "published")
+
+    def __init__(self):
+        self.pages = 0
+        self.drawn = 0
+        self.failures = []
+        self.published = []
+
+
+def render_print_run(filepath: str, invoices: list[dict], layout: CompiledLayout,
+                     individual_paths: list[str] = None,
+                     allocator: InvoiceNumberAllocator = None,
+                     individual_dir: str = None) -> PrintRunResult:
+    """
+    Genera un tiraje: un solo PDF con una página por factura (o más, si tiene
+    páginas de continuación), compartiendo fuentes y recursos en lugar de abrir
+    un archivo por factura.
+
+    Args:
+        filepath (str): Ruta del PDF del tiraje.
+        invoices (list[dict]): Valores de cada factura (ver `plan_invoice`).
+        layout (CompiledLayout): Layout compilado con `get_layout`.
+        individual_paths (list[str]): `Opcional` Si se indica, también se escribe cada
+            factura en su propio archivo en la misma pasada. Debe tener el mismo largo de `invoices`.
+            Un archivo individual que ya existe no se sobrescribe (ver `publish_invoice`).
+        allocator (InvoiceNumberAllocator): `Opcional` Contador para elegir otro número si el
+            nombre de un archivo individual ya existe. Sin él, la factura se reporta como fallida.
+        individual_dir (str): `Opcional` En lugar de `individual_paths`, carpeta donde escribir
+            cada factura con el número que le asigna `allocator` al publicarla (ver
+            `publish_numbered_invoice`). Las facturas omitidas no consumen número.
+
+    Returns:
+        result (PrintRunResult): Páginas escritas, archivos publicados y fallos por factura.
+        Una factura cuyo archivo individual falla se incluye igual en el tiraje.
+
+    Raises:
+        EmptyInvoiceError: Si ninguna factura tiene campos rellenados. En ese caso no se escribe el archivo.
+    """
+    if individual_paths is not None and len(individual_paths) != len(invoices):
+        raise ValueError("La cantidad de archivos individuales no coincide con la cantidad de facturas.")
+    if individual_dir is not None and (individual_paths is not None or allocator is None):
+        raise ValueError("individual_dir requiere un contador de facturas y no se combina con individual_paths.")
+    write_individual = individual_paths is not None or individual_dir is not None
+
+    from reportlab.pdfgen import canvas
+
+    pagesize = (layout.width_pt, layout.height_pt)
+    c = canvas.Canvas(filepath, pagesize=pagesize)
+    result = PrintRunResult()
+
+    for index, fields in enumerate(invoices):
+        try:
+            plans = plan_invoice_pages(fields, layout)
+        except Exception as e:
+            result.failures.append((index, str(e)))
+            if write_individual:
+                result.published.append(None)
+            continue
+
+        if write_individual:
+            directory = individual_dir if individual_dir is not None else os.path.dirname(individual_paths[index])
+            tmp_path = temp_path_for(directory)
+            try:
+                single = canvas.Canvas(tmp_path, pagesize=pagesize)
+                draw_invoice_pages(single, plans)
+                single.save()
+                if individual_dir is not None:
+                    result.published.append(publish_numbered_invoice(tmp_path, individual_dir, allocator))
+                else:
+                    result.published.append(publish_invoice(tmp_path, individual_paths[index], allocator))
+            except Exception as e:
+                # El archivo individual falló, pero la factura sigue en el tiraje
+                result.failures.append((index, f"Archivo individual: {e}"))
+                result.published.append(None)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        draw_invoice_pages(c, plans)
+        result.pages += len(plans)
+        result.drawn += 1
+
+    if result.pages == 0:
+        raise EmptyInvoiceError("Ninguna factura del tiraje tiene campos rellenados.")
+
+    c.save()
+    return result
@@ -0,0 +1,174 @@
+from datetime import datetime
+import json
+import os
+import sqlite3
+import threading
+from .clients import normalize_client, normalize_rif
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS invoices (
+    prints_path TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    fecha TEXT,
+    cliente TEXT,
+    cliente_norm TEXT,
+    numero_rif TEXT,
+    rif_norm TEXT,
+    domicilio_fiscal TEXT,
+    telefono TEXT,
+    total_pagar TEXT,
+    forma_pago TEXT,
+    fields_json TEXT NOT NULL,
+    PRIMARY KEY (prints_path, filename)
+);
+CREATE INDEX IF NOT EXISTS idx_invoices_rif ON invoices (prints_path, rif_norm);
+CREATE INDEX IF NOT EXISTS idx_invoices_cliente ON invoices (prints_path, cliente_norm);
+CREATE INDEX IF NOT EXISTS idx_invoices_fecha ON invoices (prints_path, fecha);
+CREATE INDEX IF NOT EXISTS idx_invoices_created_at ON invoices (created_at);
+"""
+
+
+def _invoice_date(fields: dict) -> str | None:
+    """
+    Fecha de la factura en formato `YYYY-MM-DD` a partir de `fecha_ano`, `fecha_mes` y `fecha_dia`.
+    """
+    try:
+        year = int(str(fields.get("fecha_ano", "")).strip())
+        month = int(str(fields.get("fecha_mes", "")).strip())
+        day = int(str(fields.get("fecha_dia", "")).strip())
+        if year < 100:
+            year += 2000
+        return f"{year:04d}-{month:02d}-{day:02d}"
+    except ValueError:
+        return None
+
+
+class InvoiceStore:
+    """
+    Base de datos SQLite con los datos de cada factura generada.
+
+    Permite buscar facturas por cliente, RIF o fecha sin abrir ningún PDF.
+    Usa modo WAL para que las escrituras desde el hilo de generación no
+    bloqueen las búsquedas del GUI.
+
+    Args:
+        db_path (str): Ruta del archivo de la base de datos.
+    """
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record_invoice(self, filepath: str, fields: dict) -> None:
+        """
+        Guarda (o reemplaza) los datos de una factura generada.
+
+        Args:
+            filepath (str): Ruta del PDF generado.
+            fields (dict): Valores de la factura con las claves de `inputs_geometry.json`.
+        """
+        forma_pago = next(
+            (key.replace("forma_pago_", "") for key, value in fields.items()
+             if key.startswith("forma_pago_") and value),
+            None
+        )
+        numero_rif = str(fields.get("numero_rif", "")).strip()
+        cliente = str(fields.get("nombre_razon_social", "")).strip()
+        row = (
+            os.path.dirname(os.path.abspath(filepath)),
+            os.path.basename(filepath),
+            datetime.now().isoformat(timespec="seconds"),
+            _invoice_date(fields),
+            cliente,
+            normalize_client(cliente),
+            numero_rif,
+            normalize_rif(numero_rif),
+            str(fields.get("domicilio_fiscal", "")).strip(),
+            str(fields.get("telefono", "")).strip(),
+            str(fields.get("total_pagar", "")).strip(),
+            forma_pago,
+            json.dumps(fields, ensure_ascii=False),
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO invoices (prints_path, filename, created_at, fecha, cliente, cliente_norm, "
+                "numero_rif, rif_norm, domicilio_fiscal, telefono, total_pagar, forma_pago, fields_json) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+            self._conn.commit()
+
+    def remove_invoice(self, prints_path: str, filename: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM invoices WHERE prints_path = ? AND filename = ?",
+                (os.path.abspath(prints_path), filename)
+            )
+            self._conn.commit()
+
+    def list_clients(self) -> list[tuple[str, str, str, str]]:
+        """
+        Datos de cada cliente facturado (en cualquier carpeta), tomados de su última factura.
+        Los clientes se identifican por RIF o, si no tienen, por nombre, y se retornan
+        del menos al más reciente.
+
+        Returns:
+            clients (list[tuple[str, str, str, str]]): Tuplas de
+            `(cliente, numero_rif, domicilio_fiscal, telefono)`.
+        """
+        with self._lock:
+            # En SQLite, las columnas junto a MAX() se toman de la fila con el máximo
+            rows = self._conn.execute(
+                "SELECT cliente, numero_rif, domicilio_fiscal, telefono, MAX(created_at) FROM invoices "
+                "WHERE cliente != '' OR rif_norm != '' "
+                "GROUP BY CASE WHEN rif_norm != '' THEN rif_norm ELSE cliente_norm END "
+                "ORDER BY MAX(created_at)"
+            ).fetchall()
+        return [row[:4] for row in rows]
+
+    def search(self, text: str, prints_path: str, limit: int = 5000) -> list[str]:
+        """
+        Busca facturas de `prints_path` cuyo cliente, RIF o fecha empiecen por `text`.
+
+        Cada criterio es una búsqueda por rango sobre su índice, por lo que el costo
+        no depende de la cantidad de facturas guardadas.
+
+        Args:
+            text (str): Texto a buscar. Las fechas se buscan como `YYYY`, `YYYY-MM` o `YYYY-MM-DD`.
+            prints_path (str): Carpeta de facturas.
+            limit (int): `Opcional` Máximo de resultados por criterio. Default: 5000
+
+        Returns:
+            filenames (list[str]): Nombres de archivo de las facturas encontradas.
+        """
+        text = text.strip()
+        if not text:
+            return []
+        prints_path = os.path.abspath(prints_path)
+        criteria = [("cliente_norm", normalize_client(text)), ("fecha", text)]
+        rif_prefix = normalize_rif(text)
+        if rif_prefix:
+            criteria.append(("rif_norm", rif_prefix))
+
+        filenames = []
+        seen = set()
+        with self._lock:
+            for column, prefix in criteria:
+                rows = self._conn.execute(
+                    f"SELECT filename FROM invoices WHERE prints_path = ? AND {column} >= ? AND {column} < ? LIMIT ?",
+                    (prints_path, prefix, prefix + "\uffff", limit)
+                )
+                for (filename,) in rows:
+                    if filename not in seen:
+                        seen.add(filename)
+                        filenames.append(filename)
+        return filenames
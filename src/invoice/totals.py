@@ -0,0 +1,305 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+import re
+
+CENT = Decimal("0.01")
+HUNDRED = Decimal(100)
+
+# itemN-cantidad, itemN-pu, itemN-total
+_ITEM_KEY_RE = re.compile(r"^item(\d+)-(cantidad|pu|total)$")
+
+
+def parse_amount(text) -> Decimal | None:
+    """
+    Convierte un monto escrito a mano en `Decimal`.
+
+    Acepta el formato local (`1.234,56`) y el inglés (`1,234.56`): si aparecen ambos
+    separadores, el último es el decimal; con uno solo repetido, es de miles. Un solo
+    punto seguido de exactamente tres dígitos también es de miles (`1.500` = 1500),
+    salvo con parte entera 0 (`0.500`).
+    Ignora espacios, `Bs` y `%`.
+
+    Returns:
+        amount (Decimal | None): Monto, o None si el texto está vacío o no es un número.
+    """
+    if text is None:
+        return None
+    if isinstance(text, bool):
+        # Valores de checkboxes del formulario, no montos
+        return None
+    if isinstance(text, Decimal):
+        return text if text.is_finite() else None
+    if isinstance(text, (int, float)):
+        amount = Decimal(str(text))
+        return amount if amount.is_finite() else None
+    cleaned = str(text).replace("Bs", "").replace("%", "").replace(" ", "").strip()
+    if not cleaned:
+        return None
+
+    last_dot, last_comma = cleaned.rfind("."), cleaned.rfind(",")
+    if last_dot >= 0 and last_comma >= 0:
+        decimal_sep = "." if last_dot > last_comma else ","
+        thousands_sep = "," if decimal_sep == "." else "."
+        cleaned = cleaned.replace(thousands_sep, "").replace(decimal_sep, ".")
+    elif last_comma >= 0:
+        cleaned = cleaned.replace(",", "") if cleaned.count(",") > 1 else cleaned.replace(",", ".")
+    elif cleaned.count(".") > 1:
+        cleaned = cleaned.replace(".", "")
+    elif last_dot >= 0 and len(cleaned) - last_dot == 4 and cleaned[:last_dot].lstrip("+-") not in ("", "0"):
+        # Un solo punto seguido de exactamente tres dígitos: separador de miles (`1.500`)
+        cleaned = cleaned.replace(".", "")
+
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        return None
+    return amount if amount.is_finite() else None
+
+
+def format_amount(amount: Decimal | None) -> str:
+    """
+    Formatea un monto con dos decimales en el formato local: `1.234,56`.
+    """
+    if amount is None:
+        return ""
+    text = f"{amount.quantize(CENT, rounding=ROUND_HALF_UP):,.2f}"
+    return text.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def _round(amount: Decimal) -> Decimal:
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _product(a: Decimal | None, b: Decimal | None) -> Decimal | None:
+    if a is None or b is None:
+        return None
+    return _round(a * b)
+
+
+def _percent_of(base: Decimal | None, rate: Decimal | None) -> Decimal | None:
+    if base is None or rate is None:
+        return None
+    return _round(base * rate / HUNDRED)
+
+
+def _add(*values: Decimal | None) -> Decimal | None:
+    present = [value for value in values if value is not None]
+    return sum(present, Decimal(0)) if present else None
+
+
+def _sum_total(values: list) -> Decimal | None:
+    return _add(*values)
+
+
+class TotalsGraph:
+    """
+    Grafo de dependencias de los totales de la factura, compilado una vez.
+
+    Los nodos derivados son:
+        - `itemN-total` = `itemN-cantidad` × `itemN-pu`
+        - `sub_total` = suma de los `itemN-total`
+        - `iva_total` = `sub_total` × `iva` %
+        - `sub_total_mas_iva` = `sub_total` + `iva_total`
+        - `igtf_sobre` = `pago_divisa_tasa` × `igtf` %
+        - `total_pagar` = `sub_total_mas_iva` + `igtf_sobre`
+
+    Solo se incluyen los nodos cuyas claves existen en `keys`, así que un
+    `inputs_geometry.json` con menos filas o sin IGTF sigue funcionando.
+
+    Attributes:
+        formulas (dict[str, tuple[tuple[str], callable]]): Dependencias y función de cada nodo.
+        order (tuple[str]): Nodos derivados en orden topológico.
+        dependents (dict[str, tuple[str]]): Nodos que dependen directamente de cada clave.
+        sums (frozenset[str]): Nodos que son una suma y se actualizan por diferencia.
+    """
+
+    __slots__ = ("formulas", "order", "dependents", "sums", "_position")
+
+    def __init__(self, keys):
+        keys = set(keys)
+        rows = sorted({
+            int(match.group(1)) for match in map(_ITEM_KEY_RE.match, keys) if match
+        })
+
+        formulas = {}
+        item_totals = []
+        for row in rows:
+            total_key = f"item{row}-total"
+            if total_key not in keys:
+                continue
+            item_totals.append(total_key)
+            quantity_key, price_key = f"item{row}-cantidad", f"item{row}-pu"
+            if quantity_key in keys and price_key in keys:
+                formulas[total_key] = ((quantity_key, price_key), _product)
+
+        sums = set()
+        if "sub_total" in keys and item_totals:
+            formulas["sub_total"] = (tuple(item_totals), _sum_total)
+            sums.add("sub_total")
+        if {"iva_total", "sub_total", "iva"} <= keys:
+            formulas["iva_total"] = (("sub_total", "iva"), _percent_of)
+        if {"sub_total_mas_iva", "sub_total", "iva_total"} <= keys:
+            formulas["sub_total_mas_iva"] = (("sub_total", "iva_total"), _add)
+        if {"igtf_sobre", "pago_divisa_tasa", "igtf"} <= keys:
+            formulas["igtf_sobre"] = (("pago_divisa_tasa", "igtf"), _percent_of)
+        if {"total_pagar", "sub_total_mas_iva", "igtf_sobre"} <= keys:
+            formulas["total_pagar"] = (("sub_total_mas_iva", "igtf_sobre"), _add)
+
+        dependents = {}
+        for key, (deps, _) in formulas.items():
+            for dep in deps:
+                dependents.setdefault(dep, []).append(key)
+
+        # Las fórmulas se declaran de forma que cada nodo va después de sus dependencias
+        self.formulas = formulas
+        self.order = tuple(formulas)
+        self.dependents = {key: tuple(value) for key, value in dependents.items()}
+        self.sums = frozenset(sums)
+        self._position = {key: index for index, key in enumerate(self.order)}
+
+    def affected(self, key: str) -> list[str]:
+        """
+        Nodos derivados que hay que recalcular si cambia `key`, en orden topológico.
+        """
+        seen = set()
+        pending = list(self.dependents.get(key, ()))
+        while pending:
+            node = pending.pop()
+            if node not in seen:
+                seen.add(node)
+                pending.extend(self.dependents.get(node, ()))
+        return sorted(seen, key=self._position.__getitem__)
+
+    def compute_columns(self, columns: dict) -> dict:
+        """
+        Calcula los totales de muchas filas a la vez, columna por columna.
+
+        Pensado para importaciones por lotes: el grafo se recorre una sola vez y
+        cada fórmula se aplica sobre columnas completas.
+
+        Args:
+            columns (dict[str, list]): Valores de entrada por clave, todas de igual largo.
+                Las claves que faltan se consideran vacías.
+
+        Returns:
+            totals (dict[str, list[Decimal | None]]): Valores derivados por clave. Si una
+            columna derivada viene en `columns` con un valor, ese valor se respeta.
+        """
+        length = max((len(column) for column in columns.values()), default=0)
+        empty = [None] * length
+        parsed = {key: [parse_amount(value) for value in column] for key, column in columns.items()}
+
+        totals = {}
+        for key in self.order:
+            deps, func = self.formulas[key]
+            dep_columns = [parsed.get(dep, empty) for dep in deps]
+            if key in self.sums:
+                computed = [func(list(values)) for values in zip(*dep_columns)]
+            else:
+                computed = [func(*values) for values in zip(*dep_columns)]
+            given = parsed.get(key)
+            if given is not None:
+                computed = [value if value is not None else fallback for value, fallback in zip(given, computed)]
+            parsed[key] = totals[key] = computed
+        return totals
+
+    def compute_many(self, invoices: list[dict]) -> list[dict]:
+        """
+        Completa los totales de una lista de facturas (ver `compute_columns`).
+
+        Returns:
+            invoices (list[dict]): Copias de las facturas con los totales formateados.
+            Los totales que ya venían escritos no se modifican.
+        """
+        keys = set(self.formulas) | set(self.dependents)
+        columns = {key: [invoice.get(key) for invoice in invoices] for key in keys}
+        totals = self.compute_columns(columns)
+        result = []
+        for index, invoice in enumerate(invoices):
+            completed = dict(invoice)
+            for key, column in totals.items():
+                if not str(completed.get(key) or "").strip() and column[index] is not None:
+                    completed[key] = format_amount(column[index])
+            result.append(completed)
+        return result
+
+
+class TotalsEngine:
+    """
+    Calcula los totales del editor de forma incremental.
+
+    Guarda el último valor conocido de cada clave. Al editar una celda solo se
+    recalculan los nodos que dependen de ella (ver `TotalsGraph.affected`), y
+    `sub_total` se actualiza sumando la diferencia del total de la fila, sin
+    volver a recorrer las 18 filas.
+
+    Si el usuario escribe a mano un total derivado, ese valor se toma como dado
+    y se propaga a los totales que dependen de él.
+
+    Args:
+        keys (Iterable[str]): Claves del layout (por ejemplo `layout.by_key`).
+    """
+
+    __slots__ = ("graph", "_values", "_sum_state")
+
+    def __init__(self, keys):
+        self.graph = TotalsGraph(keys)
+        self._values = {}
+        # Por cada suma: (total acumulado, cantidad de términos con valor)
+        self._sum_state = {key: (Decimal(0), 0) for key in self.graph.sums}
+
+    def value(self, key: str) -> Decimal | None:
+        return self._values.get(key)
+
+    def load(self, values: dict) -> None:
+        """
+        Reemplaza el estado con `values` (por ejemplo, al restaurar un borrador o
+        recargar la geometría), sin recalcular nada.
+        """
+        self._values = {key: parse_amount(value) for key, value in values.items()}
+        for key in self.graph.sums:
+            terms = [self._values.get(dep) for dep in self.graph.formulas[key][0]]
+            present = [term for term in terms if term is not None]
+            self._sum_state[key] = (sum(present, Decimal(0)), len(present))
+
+    def clear(self) -> None:
+        self.load({})
+
+    def set(self, key: str, text) -> dict[str, str]:
+        """
+        Registra el nuevo valor de `key` y recalcula los totales afectados.
+
+        Returns:
+            changed (dict[str, str]): Totales cuyo valor cambió, ya formateados
+            para escribirlos en el editor.
+        """
+        if key not in self.graph.formulas and key not in self.graph.dependents:
+            return {}
+
+        changed_values = {}
+        self._assign(key, parse_amount(text), changed_values)
+        for node in self.graph.affected(key):
+            deps, func = self.graph.formulas[node]
+            if node in self.graph.sums:
+                total, count = self._sum_state[node]
+                new_value = total if count else None
+            else:
+                new_value = func(*(self._values.get(dep) for dep in deps))
+            if new_value != self._values.get(node):
+                self._assign(node, new_value, changed_values)
+                changed_values[node] = new_value
+
+        changed_values.pop(key, None)
+        return {node: format_amount(value) for node, value in changed_values.items()}
+
+    def _assign(self, key: str, new_value: Decimal | None, changed_values: dict) -> None:
+        old_value = self._values.get(key)
+        self._values[key] = new_value
+        # Actualizar por diferencia las sumas que incluyen a `key`
+        for node in self.graph.dependents.get(key, ()):
+            if node in self.graph.sums:
+                total, count = self._sum_state[node]
+                if old_value is not None:
+                    total, count = total - old_value, count - 1
+                if new_value is not None:
+                    total, count = total + new_value, count + 1
+                self._sum_state[node] = (total, count)
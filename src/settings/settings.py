@@ -1,9 +1,22 @@
 import json
 import os
 import sys
+import time
 from ..utils.log import create_log
+from ..utils import trace
 from pathlib import Path
 
+
+def get_config_dir() -> Path:
+    """
+    Carpeta de configuración modificable (AppData en Windows, ~/.config en el resto).
+    """
+    if os.name == "nt":
+        base_config = os.getenv("APPDATA", Path.home())
+        return Path(base_config) / "FacturacionAwaa"
+    return Path.home() / ".config" / "facturacion_awaa"
+
+
 class SettingsManager:
     """
     Manager de la configuracion del programa. Esta programado para
@@ -16,21 +29,30 @@ class SettingsManager:
     """
 
     def __init__(self):
+        load_started_at = time.perf_counter()
         # Ruta base del bundle original
         self.BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
         # Carpeta segura para configuración modificable
-        if os.name == "nt":
-            base_config = os.getenv("APPDATA", Path.home())
-            self.CONFIG_DIR = Path(base_config) / "FacturacionAwaa"
-        else:
-            self.CONFIG_DIR = Path.home() / ".config" / "facturacion_awaa"
+        self.CONFIG_DIR = get_config_dir()
 
         self.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 
+        # Cache regenerable (rasters del visualizador, etc.)
+        self.CACHE_DIR = self.CONFIG_DIR / "cache"
+
         # settings.json se guarda en AppData
         self.SETTINGS_JSON_FILE = self.CONFIG_DIR / "settings.json"
 
+        # Base de datos con los datos de las facturas generadas
+        self.INVOICES_DB_FILE = self.CONFIG_DIR / "facturas.db"
+
+        # Catálogo de productos (ver `src/invoice/catalog.py`, mismo nombre que `CATALOG_FILENAME`)
+        self.CATALOG_DB_FILE = self.CONFIG_DIR / "catalogo.db"
+
+        # Borrador del editor autoguardado (ver `src/invoice/drafts.py`)
+        self.DRAFTS_DIR = self.CONFIG_DIR / "borrador"
+
         # Si no existe, copiar desde el bundle
         default_settings_path = Path(self.BASE_DIR) / "json" / "settings.json"
         if not self.SETTINGS_JSON_FILE.exists():
@@ -38,7 +60,14 @@ class SettingsManager:
                 default_settings = {
                     "debug": False,
                     "update_time": 1,
-                    "prints_path": ""
+                    "prints_path": "",
+                    "trace": False,
+                    "print_command": "",
+                    "optimize_pdf": False,
+                    "linearize_pdf": False,
+                    "archive_after_days": 0,
+                    "auto_totals": True,
+                    "autosave_delay_ms": 500
                 }
                 with open(self.SETTINGS_JSON_FILE, "w", encoding="utf-8") as f:
                     json.dump(default_settings, f, indent=4, ensure_ascii=False)
@@ -60,6 +89,17 @@ class SettingsManager:
         self.UPDATE_TIME = settings_data.get('update_time')
         defined_prints_path_in_settings = settings_data.get('prints_path')
         self.prints_path = defined_prints_path_in_settings if defined_prints_path_in_settings else ""
+        # Comando de impresión (lista o texto). Vacío: `lp` en Linux/macOS, impresión nativa en Windows
+        self.PRINT_COMMAND = settings_data.get('print_command', "")
+        # Optimización de los PDF generados con pikepdf (ver `src/invoice/optimize.py`)
+        self.OPTIMIZE_PDF = bool(settings_data.get('optimize_pdf', False))
+        self.LINEARIZE_PDF = bool(settings_data.get('linearize_pdf', False))
+        # Días tras los cuales las facturas se unen en un PDF mensual (0 = no archivar)
+        self.ARCHIVE_AFTER_DAYS = int(settings_data.get('archive_after_days', 0) or 0)
+        # Cálculo automático de los totales del editor (ver `src/invoice/totals.py`)
+        self.AUTO_TOTALS = bool(settings_data.get('auto_totals', True))
+        # Espera tras la última edición antes de autoguardar el borrador (0 = sin autoguardado)
+        self.AUTOSAVE_DELAY_MS = int(settings_data.get('autosave_delay_ms', 500) or 0)
 
         self.INVOICE_WIDTH = gui_data.get('invoice_width')
         self.INVOICE_HEIGHT = gui_data.get('invoice_height')
@@ -70,6 +110,12 @@ class SettingsManager:
         self.MARGIN_TOP = gui_data.get('margin_top')
         self.MARGIN_BOTTOM = gui_data.get('margin_bottom')
 
+        # Medición de tiempos de las operaciones principales (ver `src/utils/trace.py`)
+        self.TRACE = bool(settings_data.get('trace', False))
+        if self.TRACE:
+            trace.enable_tracing(self.CONFIG_DIR / "traces")
+            trace.record_span("SettingsManager.load", load_started_at, time.perf_counter())
+
 
         
     def __get_settings_data(self)->dict:
@@ -112,21 +158,27 @@ class SettingsManager:
         """
         return f"{self.WINDOW_WIDTH}x{self.WINDOW_HEIGHT}"
     
+    @trace.traced("SettingsManager.get_invoices_in_prints_path")
     def get_invoices_in_prints_path(self)->list:
         """
         Retorna una lista con los nombres de los archivos .pdf en
         la ruta especificada en self.prints_path.
+
+        Usa `os.scandir`, que obtiene el tipo de cada entrada junto con el listado,
+        sin hacer un `stat` por archivo.
         """
         files = []
         try:
-            files = [
-                file for file in os.listdir(self.prints_path)
-                if file.lower().endswith(".pdf") and os.path.isfile(os.path.join(self.prints_path, file))
-            ]
+            with os.scandir(self.prints_path) as entries:
+                files = [
+                    entry.name for entry in entries
+                    if entry.name.lower().endswith(".pdf") and entry.is_file()
+                ]
         except Exception as e:
             print("Error leyendo archivos PDF: ", e)
         return files
     
+    @trace.traced("SettingsManager.set_prints_path")
     def set_prints_path(self, new_path: str) -> bool:
         """
         Actualiza `settings.json` y `self.prints_path` con la nueva
@@ -157,4 +209,21 @@ class SettingsManager:
                 print(f'Se ha actualizado la ruta de guardado de facturas de {old_path} -> {self.prints_path}')
         return result
 
-settings_instance = SettingsManager()
\ No newline at end of file
+_settings_instance = None
+
+
+def get_settings() -> SettingsManager:
+    """
+    Retorna la instancia compartida de `SettingsManager`, creándola en el primer uso.
+    """
+    global _settings_instance
+    if _settings_instance is None:
+        _settings_instance = SettingsManager()
+    return _settings_instance
+
+
+def __getattr__(name: str):
+    # Compatibilidad con `from src.settings.settings import settings_instance`
+    if name == "settings_instance":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,13 +1,171 @@
 from datetime import datetime
+import atexit
 import os
+import queue
+import threading
 from pathlib import Path
 
+# Tamaño máximo de cada archivo de log antes de rotarlo
+MAX_LOG_BYTES = 5 * 1024 * 1024
+# Cantidad de archivos rotados que se conservan por día (log_d_m_a.log.1, .2, ...)
+LOG_BACKUP_COUNT = 5
+# Máximo de líneas que se escriben de una vez antes de hacer flush
+_MAX_BATCH = 500
+
+_STOP = object()
+
+
+def get_logs_dir() -> Path:
+    """
+    Retorna la carpeta de logs del sistema.
+    En Windows se usa %APPDATA%/FacturacionAwaa/logs
+    En Linux/macOS se usa ~/.local/share/facturacion_awaa/logs
+    """
+    if os.name == "nt":
+        base_dir = os.getenv("APPDATA", Path.home())
+        return Path(base_dir) / "FacturacionAwaa" / "logs"
+    return Path.home() / ".local" / "share" / "facturacion_awaa" / "logs"
+
+
+class _LogWriter(threading.Thread):
+    """
+    Hilo que escribe los logs encolados por `create_log`.
+
+    Mantiene abierto el archivo del día, escribe las líneas por lotes con un
+    solo flush, cambia de archivo al cambiar el día y rota el archivo cuando
+    supera `MAX_LOG_BYTES`.
+    """
+
+    def __init__(self, log_queue: queue.Queue, logs_dir: Path):
+        super().__init__(name="log-writer", daemon=True)
+        self._queue = log_queue
+        self._logs_dir = logs_dir
+        self._stream = None
+        self._day = None
+        self._path = None
+        self._size = 0
+
+    def _open_for_day(self, day: tuple) -> None:
+        if self._stream is not None:
+            self._stream.close()
+        self._logs_dir.mkdir(parents=True, exist_ok=True)
+        self._day = day
+        self._path = self._logs_dir / f"log_{day[0]}_{day[1]}_{day[2]}.log"
+        self._stream = open(self._path, "a", encoding="utf-8")
+        self._size = self._stream.tell()
+
+    def _rotate(self) -> None:
+        self._stream.close()
+        for index in range(LOG_BACKUP_COUNT - 1, 0, -1):
+            source = Path(f"{self._path}.{index}")
+            if source.exists():
+                os.replace(source, f"{self._path}.{index + 1}")
+        if LOG_BACKUP_COUNT > 0:
+            os.replace(self._path, f"{self._path}.1")
+        else:
+            self._path.unlink(missing_ok=True)
+        self._stream = open(self._path, "a", encoding="utf-8")
+        self._size = 0
+
+    def _write(self, day: tuple, line: str) -> None:
+        if day != self._day:
+            self._open_for_day(day)
+        size = len(line.encode("utf-8"))
+        if self._size and self._size + size > MAX_LOG_BYTES:
+            self._rotate()
+        self._stream.write(line)
+        self._size += size
+
+    def run(self) -> None:
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < _MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            flushed = []
+            for item in batch:
+                if item is _STOP:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    flushed.append(item)
+                else:
+                    try:
+                        self._write(*item)
+                    except Exception as e:
+                        print(f"Error escribiendo el log: {e}")
+
+            if self._stream is not None:
+                try:
+                    self._stream.flush()
+                except Exception as e:
+                    print(f"Error escribiendo el log: {e}")
+            for event in flushed:
+                event.set()
+
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+_lock = threading.Lock()
+_queue = None
+_writer = None
+_writer_pid = None
+
+
+def _get_queue() -> queue.Queue:
+    global _queue, _writer, _writer_pid
+    # El pid se revisa para que los procesos hijos (generación por lotes) inicien su propio hilo
+    if _writer is not None and _writer_pid == os.getpid() and _writer.is_alive():
+        return _queue
+    with _lock:
+        if _writer is None or _writer_pid != os.getpid() or not _writer.is_alive():
+            _queue = queue.Queue()
+            _writer = _LogWriter(_queue, get_logs_dir())
+            _writer_pid = os.getpid()
+            _writer.start()
+        return _queue
+
+
+def flush_logs(timeout: float = 5.0) -> None:
+    """
+    Espera a que todos los logs encolados hasta ahora se escriban en disco.
+    """
+    if _writer is None or _writer_pid != os.getpid() or not _writer.is_alive():
+        return
+    event = threading.Event()
+    _queue.put(event)
+    event.wait(timeout)
+
+
+def shutdown_logs(timeout: float = 5.0) -> None:
+    """
+    Escribe los logs pendientes y detiene el hilo de escritura. Se llama automáticamente al salir.
+    """
+    global _writer
+    if _writer is None or _writer_pid != os.getpid() or not _writer.is_alive():
+        return
+    _queue.put(_STOP)
+    _writer.join(timeout)
+    _writer = None
+
+
+atexit.register(shutdown_logs)
+
+
 def create_log(origin: str, log_text: str) -> None:
     """
     Registra un log en una carpeta segura del sistema para el día actual.
     En Windows se usa %APPDATA%/FacturacionAwaa/logs
     En Linux/macOS se usa ~/.local/share/facturacion_awaa/logs
 
+    La línea se encola y la escribe un hilo en segundo plano, por lo que la
+    llamada no toca el disco. Los logs pendientes se escriben al salir del programa.
+
     Args:
         origin (str): `Opcional` Nombre del origen del log.
         log_text (str): Texto que se escribirá en el log.
@@ -20,21 +178,8 @@ def create_log(origin: str, log_text: str) -> None:
 
     dt_now = datetime.now()
 
-    # Ruta segura para logs
-    if os.name == "nt":
-        base_dir = os.getenv("APPDATA", Path.home())
-        logs_dir = Path(base_dir) / "FacturacionAwaa" / "logs"
-    else:
-        logs_dir = Path.home() / ".local" / "share" / "facturacion_awaa" / "logs"
-
-    logs_dir.mkdir(parents=True, exist_ok=True)
-
-    log_filename = f"log_{dt_now.day}_{dt_now.month}_{dt_now.year}.log"
-    log_path = logs_dir / log_filename
-
     text = f"{dt_now.hour}:{dt_now.minute}:{dt_now.second} | "
     text += log_text if not origin else f"[{origin}] - {log_text}"
     text += "\n"
 
-    with open(log_path, "a", encoding="utf-8") as log_file:
-        log_file.write(text)
\ No newline at end of file
+    _get_queue().put(((dt_now.day, dt_now.month, dt_now.year), text))
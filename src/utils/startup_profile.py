@@ -0,0 +1,153 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+_PROBE_PREFIX = "STARTUP_PROBE "
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """
+    Interpreta la salida de `python -X importtime`.
+
+    Returns:
+        entries (list[tuple[str, int, int, int]]): Tuplas (módulo, self_us, cumulative_us, nivel).
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_part, cumulative_part, raw_name = line.split("|", 2)
+            self_us = int(self_part.split(":", 1)[1])
+            cumulative_us = int(cumulative_part)
+        except ValueError:
+            continue
+        stripped = raw_name.lstrip(" ")
+        level = (len(raw_name) - len(stripped) - 1) // 2
+        entries.append((stripped.strip(), self_us, cumulative_us, level))
+    return entries
+
+
+def install_first_paint_probe(window, marks: dict, t0: float) -> None:
+    """
+    Mide el tiempo hasta el primer `paint` de `window`, imprime los tiempos de
+    arranque como JSON en stdout y cierra la aplicación.
+
+    Args:
+        window (QWidget): Ventana principal.
+        marks (dict[str, float]): Marcas de tiempo (`perf_counter`) tomadas en `main.py`.
+        t0 (float): `perf_counter` al inicio de `main.py`.
+    """
+    from PyQt6.QtCore import QObject, QEvent, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    class _FirstPaintFilter(QObject):
+        def __init__(self):
+            super().__init__(window)
+            self._done = False
+
+        def eventFilter(self, obj, event):
+            if not self._done and event.type() == QEvent.Type.Paint:
+                self._done = True
+                marks["first_paint"] = time.perf_counter()
+                QTimer.singleShot(0, self._report)
+            return False
+
+        def _report(self):
+            result = {name: round((value - t0) * 1000, 2) for name, value in marks.items()}
+            print(_PROBE_PREFIX + json.dumps(result), flush=True)
+            QApplication.instance().quit()
+
+    window._first_paint_filter = _FirstPaintFilter()
+    window.installEventFilter(window._first_paint_filter)
+    window.update()
+
+
+def probe_startup(main_path: str, importtime: bool = False, timeout: int = 120) -> tuple[dict | None, str]:
+    """
+    Arranca la app en un proceso hijo con `--startup-probe` y retorna sus tiempos de arranque.
+
+    Args:
+        main_path (str): Ruta de `main.py`.
+        importtime (bool): `Opcional` Ejecutar con `-X importtime`. Default: False
+        timeout (int): `Opcional` Segundos máximos de espera. Default: 120
+
+    Returns:
+        result (tuple[dict | None, str]): Tiempos en ms desde el inicio de `main.py`
+        (None si no se pudieron medir) y el stderr del proceso hijo.
+
+    Raises:
+        subprocess.TimeoutExpired: Si la app no terminó de arrancar en `timeout` segundos.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += [main_path, "--startup-probe"]
+    completed = subprocess.run(
+        command, capture_output=True, text=True, timeout=timeout, cwd=os.path.dirname(main_path)
+    )
+
+    timings = None
+    for line in completed.stdout.splitlines():
+        if line.startswith(_PROBE_PREFIX):
+            timings = json.loads(line[len(_PROBE_PREFIX):])
+    if timings is None:
+        print(completed.stdout)
+    return timings, completed.stderr
+
+
+def run_startup_profile(main_path: str, output_path: str = None, top: int = 15) -> int:
+    """
+    Ejecuta la app en un proceso hijo con `-X importtime` y muestra:
+    - El tiempo de importación agrupado por paquete raíz.
+    - Los módulos más costosos (tiempo acumulado).
+    - Los tiempos hasta crear `QApplication`, construir `App` y el primer paint.
+
+    Args:
+        main_path (str): Ruta de `main.py`.
+        output_path (str): `Opcional` Ruta de un JSON donde guardar los resultados.
+        top (int): `Opcional` Cantidad de módulos a mostrar. Default: 15
+
+    Returns:
+        exit_code (int): 0 si la medición terminó correctamente.
+    """
+    try:
+        timings, stderr = probe_startup(main_path, importtime=True)
+    except subprocess.TimeoutExpired:
+        print("La app no terminó de arrancar en 120 segundos.")
+        return 1
+
+    if timings is None:
+        print("No se pudo medir el arranque de la app.")
+        print(stderr[-2000:])
+        return 1
+
+    entries = parse_importtime(stderr)
+    by_package = {}
+    for name, self_us, _, _ in entries:
+        root = name.split(".")[0]
+        by_package[root] = by_package.get(root, 0) + self_us
+    total_import_us = sum(cumulative for _, _, cumulative, level in entries if level == 0)
+
+    print("⏱  Tiempos de arranque (ms desde el inicio de main.py)")
+    for name, value in timings.items():
+        print(f"  {name:<20} {value:>10.2f}")
+
+    print(f"\n📦 Importaciones por paquete (total {total_import_us / 1000:.2f} ms)")
+    for root, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {root:<30} {self_us / 1000:>10.2f}")
+
+    print("\n🔍 Módulos más costosos (acumulado)")
+    for name, _, cumulative, level in sorted(entries, key=lambda item: item[2], reverse=True)[:top]:
+        print(f"  {'  ' * level}{name:<40} {cumulative / 1000:>10.2f}")
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "timings_ms": timings,
+                "import_total_ms": round(total_import_us / 1000, 2),
+                "imports_by_package_ms": {root: round(us / 1000, 2) for root, us in by_package.items()},
+            }, f, indent=4, ensure_ascii=False)
+    return 0
@@ -0,0 +1,241 @@
+from collections import deque
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+import atexit
+import json
+import os
+import threading
+import time
+
+# Máximo de eventos guardados para el trace (los más antiguos se descartan)
+MAX_TRACE_EVENTS = 50_000
+# Duraciones por span que se usan para el resumen p50/p95
+SUMMARY_WINDOW = 500
+# Cantidad de archivos de trace que se conservan en la carpeta de traces
+MAX_TRACE_FILES = 10
+
+_enabled = False
+_output_dir = None
+_lock = threading.Lock()
+_events = deque(maxlen=MAX_TRACE_EVENTS)
+_durations = {}
+_epoch_ns = time.perf_counter_ns()
+
+
+class Span:
+    """
+    Mide la duración de una operación. Se usa como context manager
+    (`with span("App.select_invoice"):`) o, para operaciones que terminan
+    en otro método (por ejemplo, al llegar un signal), llamando a `finish()`.
+
+    Args:
+        name (str): Nombre del span, por ejemplo `App.generate`.
+        args (dict): Datos adicionales que se muestran en el trace.
+    """
+
+    __slots__ = ("name", "args", "_start_ns", "_finished")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+        self._start_ns = time.perf_counter_ns()
+        self._finished = False
+
+    def finish(self, **args) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        if args:
+            self.args.update(args)
+        _record(self.name, self._start_ns, time.perf_counter_ns(), self.args)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.finish()
+
+
+class _NullSpan:
+    """
+    Span que no hace nada. Es el que se retorna cuando el tracing está desactivado.
+    """
+
+    __slots__ = ()
+
+    def finish(self, **args) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _record(name: str, start_ns: int, end_ns: int, args: dict | None) -> None:
+    duration_ns = end_ns - start_ns
+    _events.append((name, start_ns, duration_ns, threading.get_ident(), args))
+    durations = _durations.get(name)
+    if durations is None:
+        with _lock:
+            durations = _durations.setdefault(name, deque(maxlen=SUMMARY_WINDOW))
+    durations.append(duration_ns)
+
+
+def enable_tracing(output_dir: Path) -> None:
+    """
+    Activa el tracing. Al salir del programa se escribe el trace en formato
+    Chrome (`chrome://tracing`, Perfetto) y el resumen p50/p95 en `output_dir`.
+
+    Args:
+        output_dir (Path): Carpeta donde se guardan los traces.
+    """
+    global _enabled, _output_dir
+    if _enabled:
+        return
+    _enabled = True
+    _output_dir = Path(output_dir)
+    atexit.register(write_trace_files)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, **args) -> Span | _NullSpan:
+    """
+    Retorna un span para usar con `with`. Si el tracing está desactivado,
+    retorna un span vacío compartido, sin medir ni guardar nada.
+
+    Args:
+        name (str): Nombre del span.
+        **args: Datos adicionales que se muestran en el trace.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, args)
+
+
+def record_span(name: str, start: float, end: float, **args) -> None:
+    """
+    Registra un span ya medido con `time.perf_counter()`. Sirve para operaciones
+    que ocurren antes de saber si el tracing está activado (como cargar la configuración).
+    """
+    if _enabled:
+        _record(name, int(start * 1e9), int(end * 1e9), args or None)
+
+
+def traced(name: str):
+    """
+    Decorador que mide cada llamada de la función con un span llamado `name`.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _percentile(ordered: list, fraction: float) -> int:
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def get_summary() -> dict:
+    """
+    Retorna el resumen de las últimas `SUMMARY_WINDOW` duraciones de cada span.
+
+    Returns:
+        summary (dict[str, dict]): Por nombre de span: `count`, `p50_ms`, `p95_ms` y `max_ms`.
+    """
+    with _lock:
+        items = [(name, list(durations)) for name, durations in _durations.items()]
+    summary = {}
+    for name, durations in sorted(items):
+        if not durations:
+            continue
+        ordered = sorted(durations)
+        summary[name] = {
+            "count": len(ordered),
+            "p50_ms": round(_percentile(ordered, 0.50) / 1e6, 3),
+            "p95_ms": round(_percentile(ordered, 0.95) / 1e6, 3),
+            "max_ms": round(ordered[-1] / 1e6, 3),
+        }
+    return summary
+
+
+def format_summary() -> str:
+    """
+    Retorna `get_summary()` como una tabla de texto.
+    """
+    lines = [f"{'span':<40} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}"]
+    for name, values in get_summary().items():
+        lines.append(
+            f"{name:<40} {values['count']:>6} {values['p50_ms']:>10.2f} "
+            f"{values['p95_ms']:>10.2f} {values['max_ms']:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def export_chrome_trace(filepath: str) -> None:
+    """
+    Escribe los eventos registrados en formato Chrome trace-event JSON.
+
+    Args:
+        filepath (str): Ruta del archivo JSON.
+    """
+    pid = os.getpid()
+    thread_ids = {}
+    trace_events = []
+    for name, start_ns, duration_ns, thread_ident, args in list(_events):
+        tid = thread_ids.setdefault(thread_ident, len(thread_ids) + 1)
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (start_ns - _epoch_ns) / 1000,
+            "dur": duration_ns / 1000,
+            "pid": pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        trace_events.append(event)
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+def write_trace_files() -> Path | None:
+    """
+    Guarda el trace y el resumen en la carpeta de traces. Se llama automáticamente al salir.
+    Solo se conservan los últimos `MAX_TRACE_FILES` traces.
+
+    Returns:
+        trace_path (Path | None): Ruta del trace escrito, o None si no había nada que guardar.
+    """
+    if not _enabled or not _events:
+        return None
+    _output_dir.mkdir(parents=True, exist_ok=True)
+    trace_path = _output_dir / f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    export_chrome_trace(str(trace_path))
+    with open(_output_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(get_summary(), f, indent=4, ensure_ascii=False)
+
+    traces = sorted(_output_dir.glob("trace_*.json"))
+    for old_trace in traces[:-MAX_TRACE_FILES]:
+        try:
+            old_trace.unlink()
+        except OSError:
+            pass
+    return trace_path
@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+from src.invoice.layout import CompiledLayout, get_layout
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def make_geometry(item_rows: int = 3) -> dict:
+    """
+    Geometría mínima con el formato de `inputs_geometry.json`: encabezado, `item_rows`
+    filas de items, totales y dos formas de pago.
+    """
+    geometry = {
+        "nombre_razon_social": [100, 100, 300, 20, 50, "text", "left"],
+        "numero_rif": [500, 100, 140, 20, 16, "text", "left"],
+    }
+    for row in range(1, item_rows + 1):
+        y = 200 + row * 22
+        geometry[f"item{row}-cantidad"] = [40, y, 50, 20, 6, "text", "center"]
+        geometry[f"item{row}-concepto"] = [100, y, 400, 20, 50, "text", "left"]
+        geometry[f"item{row}-pu"] = [510, y, 100, 20, 12, "text", "right"]
+        geometry[f"item{row}-total"] = [620, y, 120, 20, 14, "text", "right"]
+    geometry.update({
+        "sub_total": [620, 700, 120, 20, 14, "text", "right"],
+        "iva": [560, 722, 40, 20, 4, "text", "center"],
+        "iva_total": [620, 722, 120, 20, 14, "text", "right"],
+        "sub_total_mas_iva": [620, 744, 120, 20, 14, "text", "right"],
+        "total_pagar": [620, 766, 120, 20, 14, "text", "right"],
+        "forma_pago_efectivo": [40, 800, 10, 10, 1, "radio_button"],
+        "forma_pago_debito": [140, 800, 10, 10, 1, "radio_button"],
+    })
+    return geometry
+
+
+@pytest.fixture
+def small_layout() -> CompiledLayout:
+    return CompiledLayout(make_geometry(), 850, 1100)
+
+
+@pytest.fixture
+def repo_layout() -> CompiledLayout:
+    with open(os.path.join(REPO_DIR, "json", "gui_config.json"), "r", encoding="utf-8") as f:
+        gui_data = json.load(f)
+    return get_layout(
+        os.path.join(REPO_DIR, "json", "inputs_geometry.json"),
+        gui_data["invoice_width"],
+        gui_data["invoice_height"],
+    )
@@ -0,0 +1,56 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from src.invoice.archive import COMPACTION_LOCK_NAME, ArchiveIndex, compact_invoices, extract_archived_invoice
+from src.invoice.numbering import try_lock_file, unlock_file
+
+NOW = datetime(2024, 6, 15)
+
+
+def _write_invoices(prints_path, small_layout, names):
+    from src.invoice.renderer import render_invoice
+
+    for i, name in enumerate(names):
+        render_invoice(str(prints_path / name), {"nombre_razon_social": f"Cliente {i}"}, small_layout)
+
+
+def test_compaction_is_skipped_while_another_instance_holds_the_lock(tmp_path):
+    (tmp_path / "factura_20240101_100000_000001.pdf").write_bytes(b"%PDF-")
+    fd = os.open(tmp_path / COMPACTION_LOCK_NAME, os.O_CREAT | os.O_RDWR)
+    assert try_lock_file(fd)
+    try:
+        result = compact_invoices(str(tmp_path), 30, now=NOW)
+    finally:
+        unlock_file(fd)
+    assert result.skipped and result.archived == 0
+    assert (tmp_path / "factura_20240101_100000_000001.pdf").exists()
+
+
+def test_compact_and_extract_round_trip(tmp_path, small_layout):
+    pikepdf = pytest.importorskip("pikepdf")
+    pytest.importorskip("reportlab")
+
+    old = ["factura_20240101_100000_000001.pdf", "factura_20240102_100000_000002.pdf"]
+    recent = "factura_20240610_100000_000003.pdf"
+    _write_invoices(tmp_path, small_layout, old + [recent])
+
+    result = compact_invoices(str(tmp_path), 30, now=NOW)
+    assert not result.skipped and not result.failures
+    assert result.archived == 2
+    assert sorted(os.listdir(tmp_path)) == sorted([".compactacion.lock", "archivo", recent])
+
+    index = ArchiveIndex(str(tmp_path))
+    assert sorted(index.names()) == old
+    archived = index.lookup(old[1])
+    assert os.path.basename(archived.archive_path) == "facturas_2024_01.pdf"
+    assert (archived.page, archived.pages) == (1, 1)
+
+    output = extract_archived_invoice(archived, str(tmp_path / "extraida.pdf"))
+    with pikepdf.open(output) as pdf:
+        assert len(pdf.pages) == 1
+        assert b"Cliente 1" in pdf.pages[0].Contents.read_bytes()
+
+    # Una segunda pasada no vuelve a archivar nada
+    assert compact_invoices(str(tmp_path), 30, now=NOW).archived == 0
@@ -0,0 +1,69 @@
+import os
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from src.invoice import batch
+
+
+@pytest.fixture
+def worker(small_layout, monkeypatch):
+    # Mismo estado que deja `_init_worker`, sin abrir un pool de procesos
+    monkeypatch.setattr(batch, "_worker_layout", small_layout)
+    monkeypatch.setattr(batch, "_worker_allocator", None)
+
+
+def _failing_optimize(filepath, output_path=None, linearize=False):
+    raise RuntimeError("PDF dañado")
+
+
+def test_failed_optimization_publishes_the_unoptimized_pdf(worker, tmp_path, monkeypatch):
+    fake = types.ModuleType("src.invoice.optimize")
+    fake.optimize_pdf = _failing_optimize
+    monkeypatch.setitem(sys.modules, "src.invoice.optimize", fake)
+
+    target = str(tmp_path / "factura.pdf")
+    index, filepath, optimize_result, warning = batch._render_job(3, str(tmp_path), "factura.pdf", {"nombre_razon_social": "Acme"}, optimize=True)
+
+    assert (index, filepath, optimize_result) == (3, target, None)
+    assert "#3" in warning and "PDF dañado" in warning
+    with open(target, "rb") as f:
+        assert f.read(5) == b"%PDF-"
+    # No quedan temporales en la carpeta
+    assert os.listdir(tmp_path) == ["factura.pdf"]
+
+
+def test_render_job_without_optimization_has_no_warning(worker, tmp_path):
+    target = str(tmp_path / "factura.pdf")
+    assert batch._render_job(0, str(tmp_path), "factura.pdf", {"nombre_razon_social": "Acme"}) == (0, target, None, None)
+
+
+def test_failed_invoices_do_not_consume_numbers(worker, tmp_path, monkeypatch):
+    from src.invoice.numbering import InvoiceNumberAllocator, counter_path_for
+
+    allocator = InvoiceNumberAllocator(counter_path_for(str(tmp_path)))
+    monkeypatch.setattr(batch, "_worker_allocator", allocator)
+    published = []
+    for index, fields in enumerate([{"nombre_razon_social": "A"}, {}, {"nombre_razon_social": "B"}]):
+        try:
+            published.append(os.path.basename(batch._render_job(index, str(tmp_path), None, fields)[1]))
+        except Exception:
+            pass
+    assert [name[-10:] for name in published] == ["000001.pdf", "000002.pdf"]
+    assert allocator.peek() == 3
+
+
+def test_print_run_numbers_only_the_drawn_invoices(small_layout, tmp_path):
+    from src.invoice.numbering import InvoiceNumberAllocator, counter_path_for
+    from src.invoice.renderer import render_print_run
+
+    allocator = InvoiceNumberAllocator(counter_path_for(str(tmp_path)))
+    invoices = [{"nombre_razon_social": "A"}, {}, {"nombre_razon_social": "B"}]
+    run = render_print_run(str(tmp_path / "tiraje.pdf"), invoices, small_layout, allocator=allocator,
+                           individual_dir=str(tmp_path))
+    assert run.drawn == 2 and [index for index, _ in run.failures] == [1]
+    assert [path and path[-10:] for path in run.published] == ["000001.pdf", None, "000002.pdf"]
+    assert allocator.peek() == 3
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import pytest
+
+from src.invoice.catalog import Product, ProductCatalog, tokenize
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ProductCatalog(tmp_path / "catalogo.db")
+    yield catalog
+    catalog.close()
+
+
+def test_tokenize():
+    assert tokenize("Cemento Gris 42,5kg") == ["cemento", "gris", "42", "5kg"]
+    assert tokenize("Tubería PVC-3/4") == ["tuberia", "pvc", "3", "4"]
+    assert tokenize("") == []
+
+
+def test_search_by_word_prefixes(catalog):
+    catalog.upsert_products([
+        Product("CEM-42", "Cemento Gris 42,5kg", Decimal("12.50")),
+        Product("CEM-BL", "Cemento Blanco", None),
+        Product("ARE-01", "Arena lavada", Decimal("3")),
+    ])
+    assert len(catalog) == 3
+    assert [p.sku for p in catalog.search("cem")] == ["CEM-BL", "CEM-42"]
+    assert [p.sku for p in catalog.search("gr cem")] == ["CEM-42"]
+    assert [p.sku for p in catalog.search("CEMENTO gris")] == ["CEM-42"]
+    assert [p.sku for p in catalog.search("are-01")] == ["ARE-01"]
+    assert catalog.search("cemento", limit=1)[0].sku in ("CEM-BL", "CEM-42")
+    assert catalog.search("yeso") == []
+    assert catalog.search("  ") == []
+    assert catalog.search("gris")[0].precio == Decimal("12.50")
+
+
+def test_upsert_replaces_tokens(catalog):
+    catalog.upsert_products([Product("X1", "Cabilla 1/2", None)])
+    catalog.upsert_products([Product("X1", "Alambre dulce", Decimal("8"))])
+    assert len(catalog) == 1
+    assert catalog.search("cabilla") == []
+    assert catalog.search("alam")[0].precio == Decimal("8")
+
+
+def test_import_csv(catalog, tmp_path):
+    csv_path = tmp_path / "productos.csv"
+    csv_path.write_text(
+        "Código;Descripción;Precio\n"
+        "B-10;Bloque de arcilla;1.500,00\n"
+        ";Malla truckson;25,5\n"
+        "V-1;;9\n",
+        encoding="utf-8",
+    )
+    assert catalog.import_csv(str(csv_path)) == 2
+    bloque, = catalog.search("bloque")
+    assert (bloque.sku, bloque.precio) == ("B-10", Decimal("1500.00"))
+    # Sin código se usa la descripción
+    assert catalog.search("malla")[0].sku == "Malla truckson"
+
+
+def test_import_csv_requires_a_description_column(catalog, tmp_path):
+    csv_path = tmp_path / "productos.csv"
+    csv_path.write_text("sku,precio\nA,1\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        catalog.import_csv(str(csv_path))
@@ -0,0 +1,61 @@
+from src.invoice.clients import Client, ClientDirectory, normalize_client, normalize_rif
+
+
+def test_normalizers():
+    assert normalize_rif("j-12.345.678-9") == "J123456789"
+    assert normalize_client("  Acme   C.A. ") == "acme c.a."
+
+
+def test_from_fields():
+    client = Client.from_fields({"nombre_razon_social": " Acme ", "numero_rif": "J-1", "telefono": "0414"})
+    assert client.to_fields() == {
+        "nombre_razon_social": "Acme", "numero_rif": "J-1", "domicilio_fiscal": "", "telefono": "0414",
+    }
+    assert Client.from_fields({"telefono": "0414"}) is None
+
+
+def test_prefix_search():
+    directory = ClientDirectory([
+        Client("Acme C.A.", "J-12345678-9"),
+        Client("Acero Sur", "J-98765432-1"),
+        Client("Beta", ""),
+    ])
+    assert [c.nombre_razon_social for c in directory.search_name("ac")] == ["Acero Sur", "Acme C.A."]
+    assert [c.nombre_razon_social for c in directory.search_name("ACME")] == ["Acme C.A."]
+    assert [c.nombre_razon_social for c in directory.search_rif("j1234")] == ["Acme C.A."]
+    assert [c.nombre_razon_social for c in directory.search_rif("J-9")] == ["Acero Sur"]
+    assert directory.search_name("ac", limit=1)[0].nombre_razon_social == "Acero Sur"
+    assert directory.search_name("") == []
+    assert directory.search_rif("-") == []
+
+
+def test_duplicates_keep_the_last_client():
+    directory = ClientDirectory([Client("Acme", "J-1", telefono="1"), Client("ACME C.A.", "j1", telefono="2")])
+    assert len(directory) == 1
+    assert directory.search_rif("J1")[0].telefono == "2"
+
+
+def test_add_updates_a_client_whose_name_changed():
+    directory = ClientDirectory([Client("Beta", "V-1")])
+    directory.add(Client("Beta SA", "V-1"))
+    assert len(directory) == 1
+    assert [c.nombre_razon_social for c in directory.search_name("beta")] == ["Beta SA"]
+
+
+def test_add_merges_a_client_that_gets_a_rif():
+    directory = ClientDirectory([Client("Beta", "")])
+    directory.add(Client("Beta", "V-1", "Caracas"))
+    assert len(directory) == 1
+    assert directory.search_name("be")[0].domicilio_fiscal == "Caracas"
+    assert directory.search_rif("v1")[0].nombre_razon_social == "Beta"
+
+    # Un cliente distinto con RIF distinto sigue siendo otro cliente
+    directory.add(Client("Beta", "V-2"))
+    assert len(directory) == 2
+
+
+def test_add_new_client_is_searchable():
+    directory = ClientDirectory()
+    directory.add(Client("Gamma", "G-2000"))
+    assert directory.search_name("gam")[0].numero_rif == "G-2000"
+    assert directory.search_rif("g2")[0].nombre_razon_social == "Gamma"
@@ -0,0 +1,61 @@
+import json
+
+from src.invoice.drafts import JOURNAL_FILENAME, SNAPSHOT_FILENAME, DraftJournal, load_draft
+
+
+def test_record_and_replay(tmp_path):
+    journal = DraftJournal(tmp_path)
+    assert journal.restored is None
+    journal.record({"nombre_razon_social": "Acme", "numero_rif": "J-1"})
+    journal.record({"numero_rif": "J-12"}, payment="debito")
+    journal.record({"nombre_razon_social": ""})
+    journal.close()
+
+    assert load_draft(tmp_path) == {"campos": {"numero_rif": "J-12"}, "forma_pago": "debito"}
+    assert DraftJournal(tmp_path).restored == load_draft(tmp_path)
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal = DraftJournal(tmp_path)
+    journal.record({"telefono": "0414"})
+    journal.close()
+    with open(tmp_path / JOURNAL_FILENAME, "a", encoding="utf-8") as f:
+        f.write('{"campos":{"telefono":"99')
+
+    assert load_draft(tmp_path) == {"campos": {"telefono": "0414"}, "forma_pago": None}
+
+    # Al reabrir, la línea incompleta se descarta y los cambios nuevos se leen bien
+    journal = DraftJournal(tmp_path)
+    journal.record({"telefono": "0412"})
+    journal.close()
+    assert load_draft(tmp_path)["campos"] == {"telefono": "0412"}
+
+
+def test_compaction_keeps_the_state(tmp_path):
+    journal = DraftJournal(tmp_path, compact_bytes=200)
+    for i in range(50):
+        journal.record({f"item{i % 5 + 1}-concepto": f"Producto {i}"})
+        journal.flush()
+    journal.close()
+
+    assert (tmp_path / SNAPSHOT_FILENAME).exists()
+    assert (tmp_path / JOURNAL_FILENAME).stat().st_size <= 200
+    assert load_draft(tmp_path)["campos"] == {
+        f"item{row}-concepto": f"Producto {45 + row - 1}" for row in range(1, 6)
+    }
+
+
+def test_clear_removes_the_draft(tmp_path):
+    journal = DraftJournal(tmp_path, compact_bytes=10)
+    journal.record({"telefono": "0414"})
+    journal.flush()
+    journal.clear()
+    journal.close()
+    assert load_draft(tmp_path) is None
+    assert not (tmp_path / SNAPSHOT_FILENAME).exists()
+
+
+def test_invalid_snapshot_is_ignored(tmp_path):
+    (tmp_path / SNAPSHOT_FILENAME).write_text("[1, 2", encoding="utf-8")
+    (tmp_path / JOURNAL_FILENAME).write_text(json.dumps({"campos": {"telefono": "1"}}) + "\n", encoding="utf-8")
+    assert load_draft(tmp_path) == {"campos": {"telefono": "1"}, "forma_pago": None}
@@ -0,0 +1,69 @@
+import pytest
+
+from src.invoice.form import InvoiceForm
+from src.invoice.layout import CompiledLayout
+from tests.conftest import make_geometry
+
+
+@pytest.fixture
+def form(small_layout):
+    return InvoiceForm(small_layout)
+
+
+def test_new_form_is_empty(form):
+    snapshot = form.snapshot()
+    assert snapshot.is_empty()
+    assert form.payments == ("efectivo", "debito")
+    assert "forma_pago_efectivo" not in form
+    assert snapshot.to_dict() == {"campos": {}, "forma_pago": None}
+
+
+def test_snapshot_is_an_immutable_copy(form):
+    form.set("nombre_razon_social", "Acme")
+    snapshot = form.snapshot()
+    form.set("nombre_razon_social", "Otro")
+
+    assert snapshot.get("nombre_razon_social") == "Acme"
+    assert not snapshot.is_empty()
+    assert snapshot.version < form.version
+    with pytest.raises(AttributeError):
+        snapshot.payment = "debito"
+
+
+def test_payment_alone_is_not_empty_and_appears_in_the_fields(form):
+    assert form.set_payment("debito")
+    assert not form.set_payment("cheque")
+    snapshot = form.snapshot()
+    assert not snapshot.is_empty()
+    fields = snapshot.to_fields()
+    assert fields["forma_pago_debito"] is True and "forma_pago_efectivo" not in fields
+
+
+def test_set_and_reset_report_changes(form):
+    version = form.version
+    assert form.set("numero_rif", "J-1")
+    assert not form.set("numero_rif", "J-1")
+    assert not form.set("no_existe", "x")
+    assert form.version == version + 1
+    assert form.reset("numero_rif")
+    assert form.snapshot().is_empty()
+
+
+def test_load_restores_a_saved_snapshot(form, small_layout):
+    form.set("item1-concepto", "Cemento")
+    form.set_payment("efectivo")
+    saved = form.snapshot().to_dict()
+
+    other = InvoiceForm(small_layout)
+    assert other.load({**saved, "campos": {**saved["campos"], "no_existe": "x"}}) == ["item1-concepto"]
+    assert other.snapshot().to_fields() == form.snapshot().to_fields()
+
+
+def test_relayout_keeps_the_values_of_the_remaining_keys(form):
+    form.set("nombre_razon_social", "Acme")
+    form.set("item3-concepto", "Arena")
+    form.relayout(CompiledLayout(make_geometry(item_rows=2), 850, 1100))
+
+    assert form.get("nombre_razon_social") == "Acme"
+    assert "item3-concepto" not in form
+    assert form.snapshot().get("item3-concepto") is None
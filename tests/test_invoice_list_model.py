@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from PyQt6.QtCore import Qt
+
+from src.gui.invoice_list_model import InvoiceListModel, parse_invoice_sort_key
+
+
+def _name(day: int) -> str:
+    return f"factura_202401{day:02d}_100000_{day:06d}.pdf"
+
+
+def _rows(model) -> list[str]:
+    return [model.name_at(row) for row in range(model.rowCount())]
+
+
+@pytest.fixture
+def model():
+    model = InvoiceListModel(batch_size=3)
+    model.reset_names([_name(day) for day in range(1, 9)] + ["otro.pdf"])
+    return model
+
+
+def test_parse_invoice_sort_key():
+    assert parse_invoice_sort_key("factura_20240131_235959_000001.pdf") == 20240131235959
+    assert parse_invoice_sort_key("otro.pdf") == 0
+
+
+def test_rows_are_fetched_in_batches_newest_first(model):
+    assert model.total_count() == 9
+    assert model.rowCount() == 3 and model.canFetchMore()
+    assert _rows(model) == [_name(8), _name(7), _name(6)]
+
+    model.fetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 9 and not model.canFetchMore()
+    # Los nombres sin fecha quedan al final
+    assert _rows(model)[-1] == "otro.pdf"
+    model.fetchMore()
+    assert model.rowCount() == 9
+
+
+def test_sort_ascending_reverses_and_restarts_the_batches(model):
+    model.fetchMore()
+    model.sort(0, Qt.SortOrder.AscendingOrder)
+    assert model.rowCount() == 3
+    assert _rows(model) == ["otro.pdf", _name(1), _name(2)]
+
+
+def test_added_names_outside_the_loaded_rows_wait_for_fetch_more(model):
+    model.add_names([_name(9), _name(4) + ".bis", _name(9)])
+    # La nueva factura más reciente se muestra enseguida; la vieja, al cargar su bloque
+    assert model.rowCount() == 4
+    assert model.total_count() == 11
+    assert model.name_at(0) == _name(9)
+
+    assert model.row_of(_name(4) + ".bis") == 5
+    assert model.rowCount() >= 6
+
+
+def test_remove_names(model):
+    model.remove_names([_name(8), _name(1), "no_existe.pdf"])
+    assert model.total_count() == 7
+    assert model.rowCount() == 2
+    assert _rows(model) == [_name(7), _name(6)]
+    assert model.row_of(_name(1)) == -1
@@ -0,0 +1,64 @@
+import json
+
+from src.invoice.layout import CompiledLayout, ITEM_COLUMNS, diff_layouts, get_layout
+
+from .conftest import make_geometry
+
+
+def test_compile_fields_and_item_rows(small_layout):
+    assert [field.key for field in small_layout.fields][:2] == ["nombre_razon_social", "numero_rif"]
+    assert len(small_layout.item_rows) == 3
+    assert [spec.key for spec in small_layout.item_rows[0]] == [f"item1-{column}" for column in ITEM_COLUMNS]
+
+    payment = small_layout.by_key["forma_pago_efectivo"]
+    assert payment.is_check and payment.is_payment
+    assert not small_layout.by_key["sub_total"].is_check
+
+
+def test_compile_pdf_coordinates_follow_alignment(small_layout):
+    scale_x = small_layout.width_pt / 850
+    left = small_layout.by_key["item1-concepto"]
+    right = small_layout.by_key["item1-total"]
+    center = small_layout.by_key["item1-cantidad"]
+    assert left.pdf_x == (100 + 2) * scale_x
+    assert right.pdf_x == (620 + 120 - 2) * scale_x
+    assert center.pdf_x == (40 + 50 / 2) * scale_x
+
+
+def test_unknown_alignment_falls_back_to_left():
+    layout = CompiledLayout({"campo": [0, 0, 10, 10, 5, "text", "justify"]}, 850, 1100)
+    assert layout.by_key["campo"].alignment == "left"
+
+
+def test_repo_geometry_compiles(repo_layout):
+    assert "nombre_razon_social" in repo_layout.by_key
+    assert repo_layout.item_rows
+
+
+def test_diff_layouts():
+    old = CompiledLayout(make_geometry(), 850, 1100)
+    geometry = make_geometry()
+    geometry["telefono"] = [100, 130, 120, 20, 13, "text", "left"]
+    geometry["numero_rif"][0] += 10
+    del geometry["iva"]
+    new = CompiledLayout(geometry, 850, 1100)
+
+    added, changed, removed = diff_layouts(old, new)
+    assert [field.key for field in added] == ["telefono"]
+    assert [field.key for field in changed] == ["numero_rif"]
+    assert removed == ["iva"]
+
+    added, changed, removed = diff_layouts(None, new)
+    assert len(added) == len(new.fields) and changed == [] and removed == []
+
+
+def test_get_layout_is_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / "inputs_geometry.json"
+    path.write_text(json.dumps(make_geometry()), encoding="utf-8")
+    first = get_layout(str(path), 850, 1100)
+    assert get_layout(str(path), 850, 1100) is first
+
+    path.write_text(json.dumps(make_geometry(item_rows=5)), encoding="utf-8")
+    second = get_layout(str(path), 850, 1100)
+    assert second is not first
+    assert len(second.item_rows) == 5
@@ -0,0 +1,51 @@
+import pytest
+
+from src.utils import log
+
+
+@pytest.fixture
+def logs_dir(tmp_path, monkeypatch):
+    # Un hilo de escritura nuevo que escribe en tmp_path
+    log.shutdown_logs()
+    monkeypatch.setattr(log, "get_logs_dir", lambda: tmp_path)
+    yield tmp_path
+    log.shutdown_logs()
+
+
+def test_flush_writes_the_queued_lines(logs_dir):
+    log.create_log("App", "primera")
+    log.create_log("", "segunda")
+    log.flush_logs()
+
+    (path,) = logs_dir.glob("log_*.log")
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[0].endswith("| [App] - primera")
+    assert lines[1].endswith("| segunda")
+
+
+def test_rotation_keeps_the_configured_backups(logs_dir, monkeypatch):
+    monkeypatch.setattr(log, "MAX_LOG_BYTES", 100)
+    monkeypatch.setattr(log, "LOG_BACKUP_COUNT", 2)
+    for i in range(10):
+        log.create_log("App", f"{i:02d} " + "x" * 40)
+    log.flush_logs()
+
+    (path,) = logs_dir.glob("log_*.log")
+    assert sorted(p.name[len(path.name):] for p in logs_dir.iterdir()) == ["", ".1", ".2"]
+    assert all(p.stat().st_size <= 100 for p in logs_dir.iterdir())
+    # Cada línea ocupa un archivo: el actual tiene la última y los rotados las anteriores
+    assert "09 " in path.read_text(encoding="utf-8")
+    assert "08 " in (logs_dir / f"{path.name}.1").read_text(encoding="utf-8")
+    assert "07 " in (logs_dir / f"{path.name}.2").read_text(encoding="utf-8")
+
+
+def test_shutdown_writes_pending_lines(logs_dir):
+    log.create_log("App", "al salir")
+    log.shutdown_logs()
+    (path,) = logs_dir.glob("log_*.log")
+    assert "al salir" in path.read_text(encoding="utf-8")
+
+
+def test_empty_text_raises():
+    with pytest.raises(ValueError):
+        log.create_log("App", "")
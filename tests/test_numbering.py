@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import pytest
+
+from src.invoice.archive import ARCHIVE_DIR_NAME, ARCHIVE_INDEX_NAME
+from src.invoice.numbering import (
+    InvoiceNumberAllocator,
+    build_invoice_filename,
+    counter_path_for,
+    publish_file,
+    publish_invoice,
+    temp_path_for,
+)
+
+
+def _write(path, content: bytes = b"%PDF") -> str:
+    with open(path, "wb") as f:
+        f.write(content)
+    return str(path)
+
+
+def test_allocate_is_sequential_and_persisted(tmp_path):
+    allocator = InvoiceNumberAllocator(counter_path_for(tmp_path))
+    assert allocator.peek() == 1
+    assert list(allocator.allocate()) == [1]
+    assert list(allocator.allocate(3)) == [2, 3, 4]
+    assert InvoiceNumberAllocator(counter_path_for(tmp_path)).peek() == 5
+
+
+def test_concurrent_allocations_never_repeat(tmp_path):
+    numbers = []
+    lock = threading.Lock()
+
+    def worker():
+        # Un contador por hilo, como instancias distintas de la app
+        allocator = InvoiceNumberAllocator(counter_path_for(tmp_path))
+        for _ in range(20):
+            number = allocator.allocate()[0]
+            with lock:
+                numbers.append(number)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(numbers) == list(range(1, 81))
+
+
+def test_missing_counter_is_rebuilt_from_the_folder(tmp_path):
+    _write(tmp_path / "factura_20240101_101010_000041.pdf")
+    _write(tmp_path / "factura_20240102_101010_000007.pdf")
+    os.makedirs(tmp_path / ARCHIVE_DIR_NAME)
+    with open(tmp_path / ARCHIVE_DIR_NAME / ARCHIVE_INDEX_NAME, "w", encoding="utf-8") as f:
+        json.dump({"factura_20230101_101010_000099.pdf": ["facturas_2023_01.pdf", 0, 1]}, f)
+
+    allocator = InvoiceNumberAllocator(counter_path_for(tmp_path))
+    assert allocator.allocate()[0] == 100
+
+
+def test_corrupt_counter_is_rebuilt_from_the_folder(tmp_path):
+    _write(tmp_path / "factura_20240101_101010_000012.pdf")
+    counter_path = counter_path_for(tmp_path)
+    _write(counter_path, b"{\"siguiente\": ")
+    assert InvoiceNumberAllocator(counter_path).allocate()[0] == 13
+
+
+def test_unreadable_counter_raises(tmp_path):
+    counter_path = counter_path_for(tmp_path)
+    os.makedirs(counter_path)
+    with pytest.raises(OSError):
+        InvoiceNumberAllocator(counter_path).allocate()
+
+
+def test_lock_timeout(tmp_path):
+    holder = InvoiceNumberAllocator(counter_path_for(tmp_path))
+    waiter = InvoiceNumberAllocator(counter_path_for(tmp_path), lock_timeout=0.05)
+    holder._acquire_file_lock()
+    try:
+        with pytest.raises(TimeoutError):
+            waiter.allocate()
+    finally:
+        holder._release_file_lock()
+    assert waiter.allocate()[0] == 1
+
+
+def test_build_invoice_filename():
+    assert build_invoice_filename(42, datetime(2024, 5, 6, 7, 8, 9)) == "factura_20240506_070809_000042.pdf"
+
+
+def test_publish_file_never_overwrites(tmp_path):
+    final_path = _write(tmp_path / "factura.pdf", b"original")
+    tmp = _write(temp_path_for(str(tmp_path)), b"nueva")
+    with pytest.raises(FileExistsError):
+        publish_file(tmp, final_path)
+    assert open(final_path, "rb").read() == b"original"
+    assert os.path.exists(tmp)
+
+    other = str(tmp_path / "otra.pdf")
+    publish_file(tmp, other)
+    assert open(other, "rb").read() == b"nueva"
+    assert not os.path.exists(tmp)
+
+
+def test_publish_file_with_missing_temp_creates_nothing(tmp_path):
+    final_path = str(tmp_path / "factura.pdf")
+    with pytest.raises(FileNotFoundError):
+        publish_file(str(tmp_path / ".factura_x.part"), final_path)
+    assert not os.path.exists(final_path)
+
+
+def test_publish_invoice_retries_with_a_new_number(tmp_path):
+    when = datetime(2024, 5, 6, 7, 8, 9)
+    taken = _write(tmp_path / build_invoice_filename(1, when))
+    allocator = InvoiceNumberAllocator(counter_path_for(tmp_path))
+    tmp = _write(temp_path_for(str(tmp_path)))
+
+    published = publish_invoice(tmp, taken, allocator, when=when)
+    assert published == str(tmp_path / build_invoice_filename(2, when))
+    assert os.path.exists(published)
+
+    tmp = _write(temp_path_for(str(tmp_path)))
+    with pytest.raises(FileExistsError):
+        publish_invoice(tmp, taken)
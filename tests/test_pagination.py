@@ -0,0 +1,71 @@
+import pytest
+
+from src.invoice.renderer import CHECK_MARK, EmptyInvoiceError, plan_invoice, plan_invoice_pages
+
+
+def _values(plan) -> list[str]:
+    texts, _ = plan
+    return [text for _, _, _, text in texts]
+
+
+def test_plan_invoice_texts_and_payment_check(small_layout):
+    texts, check = plan_invoice({"nombre_razon_social": "  Acme  ", "forma_pago_debito": True}, small_layout)
+    assert [text for _, _, _, text in texts] == ["Acme"]
+    payment = small_layout.by_key["forma_pago_debito"]
+    assert check == (payment.check_x, payment.check_y)
+    assert CHECK_MARK not in [text for _, _, _, text in texts]
+
+
+def test_plan_invoice_empty_raises(small_layout):
+    with pytest.raises(EmptyInvoiceError):
+        plan_invoice({"nombre_razon_social": "  ", "forma_pago_debito": False}, small_layout)
+
+
+def test_items_that_fit_use_a_single_page(small_layout):
+    items = [{"cantidad": "2", "concepto": "Cemento", "pu": "10,00"}]
+    plans = plan_invoice_pages({"nombre_razon_social": "Acme", "items": items}, small_layout)
+    assert len(plans) == 1
+    values = _values(plans[0])
+    assert "Cemento" in values
+    # Sin sub_total escrito se usa la suma de los items
+    assert "20,00" in values
+
+
+def test_items_overflow_into_continuation_pages(small_layout):
+    items = [{"cantidad": "1", "concepto": f"P{i}", "pu": "100,00", "total": "100,00"} for i in range(1, 6)]
+    fields = {"nombre_razon_social": "Acme", "total_pagar": "500,00", "forma_pago_efectivo": True, "items": items}
+    plans = plan_invoice_pages(fields, small_layout)
+
+    # 3 filas por página: 3 items, luego "vienen" + 2 items
+    assert len(plans) == 2
+    first, last = plans
+    assert [v for v in _values(first) if v.startswith("P")] == ["P1", "P2", "P3"]
+    assert "Van 300,00" in _values(first)
+    assert "500,00" not in _values(first) and first[1] is None
+
+    assert "Vienen de la página 1" in _values(last)
+    assert "300,00" in _values(last)
+    assert [v for v in _values(last) if v.startswith("P")] == ["P4", "P5"]
+    assert "500,00" in _values(last) and last[1] is not None
+    # El encabezado se repite en cada página
+    assert all("Acme" in _values(plan) for plan in plans)
+
+
+def test_flat_item_keys_beyond_the_template_are_paginated(small_layout):
+    fields = {"nombre_razon_social": "Acme"}
+    for row in range(1, 6):
+        fields[f"item{row}-concepto"] = f"P{row}"
+        fields[f"item{row}-total"] = "10,00"
+    plans = plan_invoice_pages(fields, small_layout)
+    assert len(plans) == 2
+    assert [v for v in _values(plans[1]) if v.startswith("P")] == ["P4", "P5"]
+
+
+def test_flat_item_keys_that_fit_match_plan_invoice(small_layout):
+    fields = {"nombre_razon_social": "Acme", "item2-concepto": "Cemento", "item2-total": "5,00"}
+    assert plan_invoice_pages(fields, small_layout) == [plan_invoice(fields, small_layout)]
+
+
+def test_empty_invoice_with_empty_items_raises(small_layout):
+    with pytest.raises(EmptyInvoiceError):
+        plan_invoice_pages({"items": []}, small_layout)
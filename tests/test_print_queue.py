@@ -0,0 +1,108 @@
+import json
+import sys
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from PyQt6.QtCore import QCoreApplication
+
+from src.gui.print_queue import FAILED, SENT, PrintJob, PrintQueue, _SpoolRunnable, build_spooler_args
+
+# `lp` de prueba: anota los archivos de cada llamada y falla las primeras `fallos` veces
+FAKE_LP = """
+import json, sys
+state_path, log_path = sys.argv[1], sys.argv[2]
+with open(state_path) as f:
+    state = json.load(f)
+state["llamadas"] += 1
+with open(state_path, "w") as f:
+    json.dump(state, f)
+with open(log_path, "a") as f:
+    f.write(json.dumps(sys.argv[3:]) + "\\n")
+if state["llamadas"] <= state["fallos"]:
+    sys.stderr.write("lp: printer not ready\\n")
+    sys.exit(1)
+print("request id is PDF-%d (%d file(s))" % (state["llamadas"], len(sys.argv) - 3))
+"""
+
+
+@pytest.fixture(scope="module")
+def qt_app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def fake_lp(tmp_path):
+    script = tmp_path / "lp.py"
+    script.write_text(FAKE_LP, encoding="utf-8")
+    state_path = tmp_path / "state.json"
+    log_path = tmp_path / "log.jsonl"
+
+    def make(failures: int = 0) -> list[str]:
+        state_path.write_text(json.dumps({"llamadas": 0, "fallos": failures}), encoding="utf-8")
+        return [sys.executable, str(script), str(state_path), str(log_path)]
+
+    def calls() -> list[list[str]]:
+        if not log_path.exists():
+            return []
+        return [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+
+    make.calls = calls
+    return make
+
+
+def test_build_spooler_args_files_placeholder():
+    assert build_spooler_args(["lp", "-d", "EPSON"], ["a.pdf", "b.pdf"]) == ["lp", "-d", "EPSON", "a.pdf", "b.pdf"]
+    assert build_spooler_args(["open", "-a", "Preview", "{files}"], ["a.pdf"]) == ["open", "-a", "Preview", "a.pdf"]
+
+
+def test_queue_sends_batches_of_twenty(qt_app, fake_lp):
+    files = [f"factura_{i:03d}.pdf" for i in range(45)]
+    queue = PrintQueue(fake_lp(), batch_size=20, retry_delay=0)
+    updates = []
+    queue.job_updated.connect(updates.append)
+
+    jobs = queue.enqueue(files)
+    assert [len(job.files) for job in jobs] == [20, 20, 5]
+    assert queue.wait_for_done(30000)
+    QCoreApplication.processEvents()
+
+    # Un trabajo tras otro, en orden, con todos los archivos de cada lote en una sola llamada
+    assert fake_lp.calls() == [files[:20], files[20:40], files[40:]]
+    finished = [job for job in updates if job.status == SENT]
+    assert [job.job_id for job in finished] == [job.job_id for job in jobs]
+    assert finished[0].output == "request id is PDF-1 (20 file(s))"
+    assert queue.pending_jobs() == 0
+
+
+def test_job_is_retried_after_non_zero_exit(qt_app, fake_lp):
+    job = PrintJob(1, ["a.pdf", "b.pdf"])
+    _SpoolRunnable(job, fake_lp(failures=2), max_retries=2, retry_delay=0, timeout=30).run()
+
+    assert job.status == SENT
+    assert job.attempts == 3
+    assert job.error == ""
+    assert len(fake_lp.calls()) == 3
+
+
+def test_job_fails_after_max_retries(qt_app, fake_lp):
+    job = PrintJob(1, ["a.pdf"])
+    updates = []
+    runnable = _SpoolRunnable(job, fake_lp(failures=99), max_retries=2, retry_delay=0, timeout=30)
+    runnable.signals.updated.connect(updates.append)
+    runnable.run()
+
+    assert job.status == FAILED
+    assert job.attempts == 3
+    assert job.error == "lp: printer not ready"
+    assert updates[-1].status == FAILED
+    assert len(fake_lp.calls()) == 3
+
+
+def test_missing_command_fails_without_retrying(qt_app, tmp_path):
+    job = PrintJob(1, ["a.pdf"])
+    _SpoolRunnable(job, [str(tmp_path / "no_existe")], max_retries=2, retry_delay=0, timeout=30).run()
+
+    assert job.status == FAILED
+    assert job.attempts == 1
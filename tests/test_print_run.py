@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from src.invoice.renderer import EmptyInvoiceError, render_print_run
+
+
+def _page_count(filepath) -> int:
+    with open(filepath, "rb") as f:
+        return f.read().count(b"/Type /Page\n")
+
+
+def _invoice(name: str, item_count: int) -> dict:
+    items = [{"cantidad": "1", "concepto": f"P{i}", "pu": "10,00"} for i in range(1, item_count + 1)]
+    return {"nombre_razon_social": name, "items": items}
+
+
+def test_print_run_adds_continuation_pages(small_layout, tmp_path):
+    filepath = str(tmp_path / "tiraje.pdf")
+    # 3 filas por página: 5 items ocupan 2 páginas
+    run = render_print_run(filepath, [_invoice("A", 1), _invoice("B", 5), {}], small_layout)
+
+    assert (run.pages, run.drawn) == (3, 2)
+    assert [index for index, _ in run.failures] == [2]
+    assert run.published == []
+    assert _page_count(filepath) == 3
+
+
+def test_individual_file_failure_keeps_the_invoice_in_the_print_run(small_layout, tmp_path):
+    existing = tmp_path / "b.pdf"
+    existing.write_bytes(b"ya existe")
+    individual = [str(tmp_path / "a.pdf"), str(existing)]
+
+    run = render_print_run(str(tmp_path / "tiraje.pdf"), [_invoice("A", 1), _invoice("B", 1)],
+                           small_layout, individual_paths=individual)
+
+    assert run.drawn == 2 and run.pages == 2
+    assert run.published == [individual[0], None]
+    assert [index for index, _ in run.failures] == [1]
+    # El archivo existente no se sobrescribe y no quedan temporales
+    assert existing.read_bytes() == b"ya existe"
+    assert sorted(os.listdir(tmp_path)) == ["a.pdf", "b.pdf", "tiraje.pdf"]
+
+
+def test_print_run_without_drawable_invoices_writes_nothing(small_layout, tmp_path):
+    with pytest.raises(EmptyInvoiceError):
+        render_print_run(str(tmp_path / "tiraje.pdf"), [{}, {"items": []}], small_layout)
+    assert not (tmp_path / "tiraje.pdf").exists()
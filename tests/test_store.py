@@ -0,0 +1,48 @@
+import pytest
+
+from src.invoice.store import InvoiceStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InvoiceStore(tmp_path / "facturas.db")
+    yield store
+    store.close()
+
+
+def _record(store, prints_path, filename, **fields):
+    store.record_invoice(str(prints_path / filename), fields)
+
+
+def test_search_by_client_rif_and_date(store, tmp_path):
+    prints = tmp_path / "facturas"
+    _record(store, prints, "a.pdf", nombre_razon_social="Ferretería  Acme", numero_rif="J-12345678-9",
+            fecha_ano="24", fecha_mes="3", fecha_dia="7")
+    _record(store, prints, "b.pdf", nombre_razon_social="Bodega Central", numero_rif="V-87654321",
+            fecha_ano="2024", fecha_mes="11", fecha_dia="2")
+
+    assert store.search("ferretería acme", str(prints)) == ["a.pdf"]
+    assert store.search("  BODEGA ", str(prints)) == ["b.pdf"]
+    assert store.search("j12345", str(prints)) == ["a.pdf"]
+    assert store.search("V-8765", str(prints)) == ["b.pdf"]
+    assert store.search("2024-03", str(prints)) == ["a.pdf"]
+    assert sorted(store.search("2024", str(prints))) == ["a.pdf", "b.pdf"]
+    assert store.search("", str(prints)) == []
+    assert store.search("Zapatería", str(prints)) == []
+
+
+def test_search_is_limited_to_the_prints_folder(store, tmp_path):
+    _record(store, tmp_path / "uno", "a.pdf", nombre_razon_social="Acme")
+    _record(store, tmp_path / "dos", "b.pdf", nombre_razon_social="Acme")
+    assert store.search("acme", str(tmp_path / "dos")) == ["b.pdf"]
+
+
+def test_recording_again_replaces_and_remove_deletes(store, tmp_path):
+    prints = tmp_path / "facturas"
+    _record(store, prints, "a.pdf", nombre_razon_social="Acme")
+    _record(store, prints, "a.pdf", nombre_razon_social="Bodega")
+    assert store.search("acme", str(prints)) == []
+    assert store.search("bodega", str(prints)) == ["a.pdf"]
+
+    store.remove_invoice(str(prints), "a.pdf")
+    assert store.search("bodega", str(prints)) == []
@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+import pytest
+
+from src.invoice.totals import TotalsEngine, TotalsGraph, format_amount, parse_amount
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1.234", Decimal("1234")),
+    ("1.500", Decimal("1500")),
+    ("-1.500", Decimal("-1500")),
+    ("Bs 2.000", Decimal("2000")),
+    ("1.234.567", Decimal("1234567")),
+    ("1.234,56", Decimal("1234.56")),
+    ("1,234.56", Decimal("1234.56")),
+    ("1,5", Decimal("1.5")),
+    ("12.5", Decimal("12.5")),
+    ("1.2345", Decimal("1.2345")),
+    ("0.500", Decimal("0.5")),
+    ("16%", Decimal("16")),
+])
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == expected
+
+
+@pytest.mark.parametrize("text", [None, "", "  ", "Bs", "abc", "nan", True, False, float("inf")])
+def test_parse_amount_empty_or_invalid(text):
+    assert parse_amount(text) is None
+
+
+def test_parse_amount_numbers():
+    assert parse_amount(3) == Decimal("3")
+    assert parse_amount(2.5) == Decimal("2.5")
+    assert parse_amount(Decimal("1.10")) == Decimal("1.10")
+
+
+def test_format_amount_round_trip():
+    assert format_amount(Decimal("1234.565")) == "1.234,57"
+    assert parse_amount(format_amount(Decimal("1500"))) == Decimal("1500")
+    assert format_amount(None) == ""
+
+
+def _full_recompute(values: dict, keys) -> dict:
+    return TotalsGraph(keys).compute_many([values])[0]
+
+
+def test_graph_order_and_affected(small_layout):
+    graph = TotalsGraph(small_layout.by_key)
+    assert graph.order.index("item1-total") < graph.order.index("sub_total") < graph.order.index("iva_total")
+    assert graph.affected("item2-pu") == ["item2-total", "sub_total", "iva_total", "sub_total_mas_iva"]
+    assert graph.affected("nombre_razon_social") == []
+
+
+def test_compute_many_fills_empty_totals_only(small_layout):
+    invoices = [
+        {"item1-cantidad": "2", "item1-pu": "10,00", "item2-cantidad": "1", "item2-pu": "5,50", "iva": "16"},
+        {"item1-cantidad": "1", "item1-pu": "3", "sub_total": "100,00", "iva": "16"},
+    ]
+    first, second = TotalsGraph(small_layout.by_key).compute_many(invoices)
+    assert first["item1-total"] == "20,00"
+    assert first["sub_total"] == "25,50"
+    assert first["iva_total"] == "4,08"
+    assert first["sub_total_mas_iva"] == "29,58"
+    # Un total escrito a mano se respeta y se propaga
+    assert second["sub_total"] == "100,00"
+    assert second["iva_total"] == "16,00"
+    assert invoices[0].get("sub_total") is None
+
+
+def test_engine_updates_only_affected_totals(small_layout):
+    engine = TotalsEngine(small_layout.by_key)
+    assert engine.set("item1-cantidad", "2") == {}
+    assert engine.set("item1-pu", "1.500") == {
+        "item1-total": "3.000,00", "sub_total": "3.000,00", "sub_total_mas_iva": "3.000,00",
+    }
+    assert engine.set("iva", "16") == {"iva_total": "480,00", "sub_total_mas_iva": "3.480,00"}
+    assert engine.set("nombre_razon_social", "Acme") == {}
+
+
+def test_engine_incremental_sum_matches_full_recompute(small_layout):
+    engine = TotalsEngine(small_layout.by_key)
+    values = {"iva": "16"}
+    engine.set("iva", "16")
+    edits = [
+        ("item1-cantidad", "3"), ("item1-pu", "2,50"), ("item2-cantidad", "1"), ("item2-pu", "100"),
+        ("item1-pu", "4"), ("item3-total", "7,25"), ("item2-cantidad", ""), ("item3-total", ""),
+    ]
+    for key, text in edits:
+        values[key] = text
+        engine.set(key, text)
+        expected = _full_recompute(values, small_layout.by_key)
+        for node in ("sub_total", "iva_total", "sub_total_mas_iva"):
+            assert format_amount(engine.value(node)) == expected.get(node, "")
+
+
+def test_engine_load_restores_sum_state(small_layout):
+    engine = TotalsEngine(small_layout.by_key)
+    engine.load({"item1-total": "10,00", "item2-total": "5,00", "sub_total": "15,00"})
+    assert engine.set("item2-total", "1,00") == {"sub_total": "11,00", "sub_total_mas_iva": "11,00"}
@@ -0,0 +1,64 @@
+import json
+from collections import deque
+
+import pytest
+
+from src.utils import trace
+
+
+@pytest.fixture
+def tracing(tmp_path, monkeypatch):
+    # Estado propio, sin registrar `write_trace_files` en atexit como `enable_tracing`
+    monkeypatch.setattr(trace, "_enabled", True)
+    monkeypatch.setattr(trace, "_output_dir", tmp_path)
+    monkeypatch.setattr(trace, "_events", deque(maxlen=trace.MAX_TRACE_EVENTS))
+    monkeypatch.setattr(trace, "_durations", {})
+    return tmp_path
+
+
+def test_disabled_tracing_records_nothing(monkeypatch):
+    monkeypatch.setattr(trace, "_enabled", False)
+    assert trace.span("App.test") is trace._NULL_SPAN
+    assert trace.write_trace_files() is None
+
+
+def test_summary_json_has_percentiles_per_span(tracing):
+    # 1 ms, 2 ms, ..., 100 ms
+    for ms in range(1, 101):
+        trace.record_span("App.select_invoice", 0.0, ms / 1000)
+    with trace.span("Worker.run", file="a.pdf"):
+        pass
+
+    trace_path = trace.write_trace_files()
+
+    with open(tracing / "summary.json", "r", encoding="utf-8") as f:
+        summary = json.load(f)
+    assert sorted(summary) == ["App.select_invoice", "Worker.run"]
+    select = summary["App.select_invoice"]
+    assert select["count"] == 100
+    assert select["p50_ms"] == pytest.approx(50, abs=0.01)
+    assert select["p95_ms"] == pytest.approx(95, abs=0.01)
+    assert select["max_ms"] == pytest.approx(100, abs=0.01)
+    assert summary["Worker.run"]["count"] == 1
+
+    with open(trace_path, "r", encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    assert len(events) == 101
+    assert events[-1]["name"] == "Worker.run" and events[-1]["args"] == {"file": "a.pdf"}
+
+
+def test_span_records_the_exception_type(tracing):
+    with pytest.raises(KeyError):
+        with trace.span("App.generate"):
+            raise KeyError("x")
+    assert trace._events[-1][4] == {"error": "KeyError"}
+
+
+def test_only_the_latest_trace_files_are_kept(tracing, monkeypatch):
+    monkeypatch.setattr(trace, "MAX_TRACE_FILES", 2)
+    for name in ("trace_20240101_000000.json", "trace_20240102_000000.json"):
+        (tracing / name).write_text("{}")
+    trace.record_span("App.test", 0.0, 0.001)
+
+    trace_path = trace.write_trace_files()
+    assert sorted(p.name for p in tracing.glob("trace_*.json")) == ["trace_20240102_000000.json", trace_path.name]